@@ -0,0 +1,39 @@
+"""create enrichment jobs table
+
+Revision ID: 003_enrichment_jobs
+Revises: d536a01aa9f2
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_enrichment_jobs'
+down_revision = 'd536a01aa9f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Durable queue for deferred AI enrichment of responses
+    op.create_table('enrichment_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('response_id', sa.Integer(), nullable=False),
+        sa.Column('is_first_response', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('enqueued_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['response_id'], ['responses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_enrichment_jobs_id', 'enrichment_jobs', ['id'])
+    op.create_index('ix_enrichment_jobs_status_id', 'enrichment_jobs', ['status', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_enrichment_jobs_status_id', table_name='enrichment_jobs')
+    op.drop_index('ix_enrichment_jobs_id', table_name='enrichment_jobs')
+    op.drop_table('enrichment_jobs')
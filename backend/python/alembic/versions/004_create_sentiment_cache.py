@@ -0,0 +1,31 @@
+"""create sentiment cache table
+
+Revision ID: 004_sentiment_cache
+Revises: 003_enrichment_jobs
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_sentiment_cache'
+down_revision = '003_enrichment_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Persistent tier of the sentiment cache, shared across workers
+    op.create_table('sentiment_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('sentiment', sa.String(length=50), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('sentiment_cache')
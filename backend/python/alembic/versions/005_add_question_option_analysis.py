@@ -0,0 +1,25 @@
+"""add precomputed option analysis to questions
+
+Revision ID: 005_option_analysis
+Revises: 004_sentiment_cache
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_option_analysis'
+down_revision = '004_sentiment_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sentiment and quality per option, computed once when the question is created
+    op.add_column('questions', sa.Column('option_analysis', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column('questions', 'option_analysis')
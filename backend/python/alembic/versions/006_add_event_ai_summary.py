@@ -0,0 +1,28 @@
+"""add AI summary to events
+
+Revision ID: 006_event_ai_summary
+Revises: 005_option_analysis
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_event_ai_summary'
+down_revision = '005_option_analysis'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Map-reduce summary of all responses, stored once when the event is completed
+    op.add_column('events', sa.Column('ai_summary', sa.Text(), nullable=True))
+    op.add_column('events', sa.Column('ai_summary_response_count', sa.Integer(), nullable=True))
+    op.add_column('events', sa.Column('ai_summary_generated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('events', 'ai_summary_generated_at')
+    op.drop_column('events', 'ai_summary_response_count')
+    op.drop_column('events', 'ai_summary')
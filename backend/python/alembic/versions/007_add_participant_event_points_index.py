@@ -0,0 +1,24 @@
+"""add (event_id, points DESC) index for ranking on read
+
+Revision ID: 007_event_points_index
+Revises: 006_event_ai_summary
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_event_points_index'
+down_revision = '006_event_ai_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves leaderboard pages and window-function ranks in index order per event
+    op.create_index('ix_participants_event_points', 'participants', ['event_id', sa.text('points DESC')])
+
+
+def downgrade():
+    op.drop_index('ix_participants_event_points', table_name='participants')
@@ -0,0 +1,51 @@
+"""add badge counters to participants and question count to events
+
+Revision ID: 008_badge_counters
+Revises: 007_event_points_index
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_badge_counters'
+down_revision = '007_event_points_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Counters read by badge checks instead of COUNT(*) over responses/questions
+    op.add_column('participants', sa.Column('answered_questions_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('participants', sa.Column('high_quality_responses_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('participants', sa.Column('positive_responses_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('events', sa.Column('questions_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the source tables
+    op.execute("""
+        UPDATE participants SET
+            answered_questions_count = (
+                SELECT COUNT(DISTINCT question_id) FROM responses WHERE responses.participant_id = participants.id
+            ),
+            high_quality_responses_count = (
+                SELECT COUNT(*) FROM responses
+                WHERE responses.participant_id = participants.id AND responses.quality_score >= 0.7
+            ),
+            positive_responses_count = (
+                SELECT COUNT(*) FROM responses
+                WHERE responses.participant_id = participants.id AND responses.sentiment = 'positive'
+            )
+    """)
+    op.execute("""
+        UPDATE events SET questions_count = (
+            SELECT COUNT(*) FROM questions WHERE questions.event_id = events.id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_column('events', 'questions_count')
+    op.drop_column('participants', 'positive_responses_count')
+    op.drop_column('participants', 'high_quality_responses_count')
+    op.drop_column('participants', 'answered_questions_count')
@@ -0,0 +1,23 @@
+"""add (event_id, user_id) index for participation lookups
+
+Revision ID: 009_event_user_index
+Revises: 008_badge_counters
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_event_user_index'
+down_revision = '008_badge_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One user's row in one event: duplicate-join checks and incremental streaks
+    op.create_index('ix_participants_event_user', 'participants', ['event_id', 'user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_participants_event_user', table_name='participants')
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of unrelated endpoints while Gemini calls are in flight
+
+Fires N concurrent sentiment analyses against a fake Gemini model with a fixed
+round-trip latency, and meanwhile probes GET /api/health from a separate thread.
+Runs twice: once with the old blocking call (generate_content inside the event
+loop) and once with the async path, then prints p50/p95/p99 for each.
+
+Usage:
+    python benchmarks/bench_gemini_concurrency.py [--calls 50] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-dummy-key")
+# Measure N separate calls in flight: no micro-batching, no result cache
+os.environ.setdefault("GEMINI_SENTIMENT_BATCH_SIZE", "1")
+os.environ.setdefault("SENTIMENT_CACHE_SIZE", "0")
+
+from services.gemini_service import GeminiService  # noqa: E402
+
+
+class FakeResponse:
+    """Minimal stand-in for the SDK response object"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Fake model with a fixed round-trip latency"""
+
+    PAYLOAD = json.dumps({"sentiment": "positive", "score": 0.8, "confidence": 0.9})
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        return FakeResponse(self.PAYLOAD)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self.latency)
+        return FakeResponse(self.PAYLOAD)
+
+
+class BlockingGeminiService(GeminiService):
+    """Reproduces the old behaviour: synchronous SDK call inside the event loop"""
+
+    async def _generate_content(self, prompt: str, operation: str, **kwargs):
+        return self.model.generate_content(prompt)
+
+
+async def asgi_get(app, path: str) -> int:
+    """Issue a GET directly against an ASGI app and return the status code"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    body_sent = False
+    status = {}
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code", 0)
+
+
+def probe(app, loop, stop: threading.Event, interval: float, latencies: list):
+    """Submit health checks to the server loop and time them from outside it"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        future = asyncio.run_coroutine_threadsafe(asgi_get(app, "/api/health"), loop)
+        future.result()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_scenario(app, service: GeminiService, calls: int, interval: float) -> dict:
+    loop = asyncio.get_running_loop()
+    latencies = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe, args=(app, loop, stop, interval, latencies), daemon=True)
+
+    start = time.perf_counter()
+    prober.start()
+    await asyncio.gather(*(service.analyze_sentiment(f"Excelente charla #{i}") for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    # Yield so that a probe stuck behind the last blocking call can finish
+    await asyncio.sleep(interval * 2)
+    stop.set()
+    await asyncio.to_thread(prober.join)
+
+    return {
+        "samples": len(latencies),
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+        "sentiment_wall_time": elapsed,
+    }
+
+
+async def main(args):
+    import builtins
+    from main import app
+
+    # Silence the per-call logging of the service while benchmarking
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        results = {}
+        model = FakeGeminiModel(args.latency)
+        results["blocking"] = await run_scenario(
+            app, BlockingGeminiService(model=model), args.calls, args.interval
+        )
+        results["async"] = await run_scenario(
+            app, GeminiService(model=model), args.calls, args.interval
+        )
+    finally:
+        builtins.print = real_print
+
+    concurrency = GeminiService(model=model).scheduler.max_concurrency
+    print(f"{args.calls} sentiment calls, {args.latency * 1000:.0f} ms fake Gemini latency, "
+          f"GEMINI_MAX_CONCURRENCY={concurrency}")
+    print(f"{'mode':<10}{'samples':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'AI wall s':>11}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['samples']:>9}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}"
+              f"{r['max']:>10.1f}{r['sentiment_wall_time']:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50, help="concurrent sentiment calls")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Gemini latency in seconds")
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between health probes")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tail latency of Gemini calls with and without hedged requests
+
+Starts the local stand-in (benchmarks/gemini_standin.py) in-process with a
+share of pathologically slow calls, then sends the same sentiment workload
+through GeminiService twice: plain, and with GEMINI_HEDGE_ENABLED (a second
+request once a call outlives the observed p90). Reports p50/p95/p99, the
+extra requests hedging cost, and per-model latency, tokens and win rates.
+
+Models can be routed and hedged separately, and the stand-in can give each
+its own latency, e.g. hedging flash with flash-lite:
+
+    python benchmarks/bench_hedging.py --hedge-model gemini-2.5-flash-lite \\
+        --model-latency gemini-2.5-flash-lite=0.15
+
+Usage:
+    python benchmarks/bench_hedging.py [--calls 300] [--concurrency 8] [--latency 0.2]
+                                       [--tail-rate 0.05] [--tail-latency 2]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import gemini_standin
+
+TEXTS = [
+    "Excelente charla, muy clara",
+    "No entendí la parte de despliegue",
+    "Estuvo bien, algunos temas ya los conocía",
+    "Genial la demo en vivo",
+]
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args, hedge: bool) -> tuple:
+    """Send the workload through a fresh GeminiService; return (latencies, stats)"""
+    import builtins
+    from services.gemini_service import GeminiService
+
+    os.environ["GEMINI_HEDGE_ENABLED"] = "true" if hedge else "false"
+    service = GeminiService()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def call(index: int, record: bool):
+        async with semaphore:
+            start = time.perf_counter()
+            await service.analyze_sentiment(f"{TEXTS[index % len(TEXTS)]} ({index})")
+            if record:
+                latencies.append(time.perf_counter() - start)
+
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        # Warm up the latency window that hedge delays and timeouts are derived from
+        await asyncio.gather(*(call(-i - 1, record=False) for i in range(args.warmup)))
+        await asyncio.gather(*(call(i, record=True) for i in range(args.calls)))
+    finally:
+        builtins.print = real_print
+    return latencies, service.get_stats()
+
+
+async def main(args):
+    server_args = gemini_standin.build_parser().parse_args([
+        "--port", str(args.port), "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--tail-rate", str(args.tail_rate), "--tail-latency", str(args.tail_latency), "--seed", "1",
+        *[option for value in args.model_latency or [] for option in ("--model-latency", value)],
+    ])
+    server = gemini_standin.create_server(server_args)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        "GEMINI_BACKEND": "standin",
+        "GEMINI_STANDIN_URL": f"http://127.0.0.1:{args.port}",
+        "GEMINI_SENTIMENT_BATCH_SIZE": "1",
+        "SENTIMENT_CACHE_SIZE": "0",
+        "SENTIMENT_CLASSIFIER_ENABLED": "false",
+        "GEMINI_MAX_CONCURRENCY": str(args.concurrency * 2),
+        # Let slow calls finish so the plain run shows the real tail instead of timeouts
+        "GEMINI_TIMEOUT_MIN_SECONDS": str(args.tail_latency * 3),
+        "GEMINI_TIMEOUT_MAX_SECONDS": str(args.tail_latency * 3),
+    })
+    if args.sentiment_model:
+        os.environ["GEMINI_SENTIMENT_MODEL"] = args.sentiment_model
+    if args.hedge_model:
+        os.environ["GEMINI_HEDGE_MODEL"] = args.hedge_model
+
+    print(f"{args.calls} sentiment calls, concurrency {args.concurrency}, stand-in latency "
+          f"{args.latency:g}±{args.jitter:g}s with {args.tail_rate:.0%} of calls at {args.tail_latency:g}s\n")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'requests':>10}{'hedges':>8}")
+
+    try:
+        for hedge in (False, True):
+            latencies, stats = await run(args, hedge)
+            by_model = stats["models"]["by_model"]
+            requests = sum(model["requests"] for model in by_model.values())
+            print(f"{'hedged' if hedge else 'plain':<10}"
+                  f"{statistics.median(latencies) * 1000:>10.0f}{percentile(latencies, 95) * 1000:>10.0f}"
+                  f"{percentile(latencies, 99) * 1000:>10.0f}{max(latencies) * 1000:>10.0f}"
+                  f"{requests:>10}{stats['hedging']['sent']:>8}")
+            for name, model in by_model.items():
+                print(f"{'':<10}{name}: {model['calls']} calls, p50 {model['p50_ms']} ms, p99 {model['p99_ms']} ms, "
+                      f"tokens {model['input_tokens']}+{model['output_tokens']}, "
+                      f"won {model['wins']}/{model['races']} races")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300, help="measured sentiment calls per mode")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured calls that seed the latency window")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in mean latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--tail-rate", type=float, default=0.05, help="share of pathologically slow calls")
+    parser.add_argument("--tail-latency", type=float, default=2.0)
+    parser.add_argument("--model-latency", action="append", metavar="MODEL=SECONDS",
+                        help="stand-in mean latency for one model (repeatable)")
+    parser.add_argument("--sentiment-model", help="route sentiment to this model (GEMINI_SENTIMENT_MODEL)")
+    parser.add_argument("--hedge-model", help="send hedges to this model (GEMINI_HEDGE_MODEL)")
+    parser.add_argument("--port", type=int, default=8766)
+    asyncio.run(main(parser.parse_args()))
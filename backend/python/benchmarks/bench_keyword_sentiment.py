@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled keyword sentiment matcher vs the previous substring scan
+
+The previous fallback rebuilt both keyword lists and ran one `in` substring
+check per keyword on every call, so its cost grows with the number of
+keywords; the compiled matcher scans each text once. Times keyword counting
+with the shipped lists and with lists padded by `--extra-keywords` synthetic
+terms, then the full fallback (including building the response objects), and
+lists texts where old and new disagree, which are mostly substring false
+positives such as "no" inside "bueno".
+
+Usage:
+    python benchmarks/bench_keyword_sentiment.py [--texts 5000] [--runs 5] [--extra-keywords 200] [--seed 1]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from schemas import SentimentAnalysisResponse
+from services.keyword_sentiment import NEGATIVE_KEYWORDS, POSITIVE_KEYWORDS, KeywordSentimentMatcher, keyword_sentiment
+
+FRAGMENTS = [
+    "Excelente charla", "muy buena la demo", "el ponente fue claro", "me encanta este formato",
+    "no entendí la parte de Kubernetes", "un poco aburrido al final", "bueno, pero largo",
+    "súper útil para mi trabajo", "difícil de seguir", "la sala estaba llena", "definitivamente vuelvo",
+    "nada que agregar", "economía de datos", "fue increible", "el audio era malo", "Sí, totalmente",
+]
+
+
+def legacy_fallback(text: str) -> SentimentAnalysisResponse:
+    """The fallback as it was before the compiled matcher"""
+    positive_words = [
+        'excelente', 'genial', 'bueno', 'útil', 'claro', 'interesante',
+        'me encanta', 'definitivamente', 'sí', 'perfecto', 'increíble',
+        'fantástico', 'maravilloso', 'great', 'excellent', 'amazing'
+    ]
+    negative_words = [
+        'confuso', 'difícil', 'no entendí', 'malo', 'aburrido', 'no',
+        'complicado', 'terrible', 'horrible', 'bad', 'difficult', 'boring'
+    ]
+
+    text_lower = text.lower()
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    negative_count = sum(1 for word in negative_words if word in text_lower)
+
+    if positive_count > negative_count:
+        sentiment = "positive"
+        score = min(0.7, 0.3 + (positive_count * 0.1))
+    elif negative_count > positive_count:
+        sentiment = "negative"
+        score = max(-0.7, -0.3 - (negative_count * 0.1))
+    else:
+        sentiment = "neutral"
+        score = 0.0
+
+    return SentimentAnalysisResponse(sentiment=sentiment, score=score, confidence=0.6, source="fallback")
+
+
+def legacy_counts(text: str, positive_words: list, negative_words: list) -> tuple:
+    """Keyword counting step of the previous fallback"""
+    text_lower = text.lower()
+    return (
+        sum(1 for word in positive_words if word in text_lower),
+        sum(1 for word in negative_words if word in text_lower),
+    )
+
+
+def best_of(runs: int, fn) -> float:
+    """Median wall time of `runs` calls"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    texts = [", ".join(rng.sample(FRAGMENTS, rng.randint(1, 4))) for _ in range(args.texts)]
+    print(f"{len(texts)} texts, median of {args.runs} runs")
+
+    padding = [f"termino{i}" for i in range(args.extra_keywords)]
+    for label, positive, negative in (
+        ("shipped keywords", list(POSITIVE_KEYWORDS), list(NEGATIVE_KEYWORDS)),
+        (f"+{args.extra_keywords} keywords", list(POSITIVE_KEYWORDS) + padding, list(NEGATIVE_KEYWORDS)),
+    ):
+        matcher = KeywordSentimentMatcher(positive, negative)
+        legacy = best_of(args.runs, lambda: [legacy_counts(text, positive, negative) for text in texts])
+        single = best_of(args.runs, lambda: [matcher.count(text) for text in texts])
+        batch = best_of(args.runs, lambda: matcher.count_batch(texts))
+
+        print(f"\nkeyword counting, {label} ({len(positive) + len(negative)})")
+        print(f"{'implementation':<22}{'total ms':>10}{'µs/text':>10}{'speedup':>10}")
+        for name, seconds in (("legacy substring scan", legacy), ("compiled, per text", single), ("compiled, batch", batch)):
+            print(f"{name:<22}{seconds * 1000:>10.1f}{seconds / len(texts) * 1e6:>10.2f}{legacy / seconds:>9.1f}x")
+
+    legacy = best_of(args.runs, lambda: [legacy_fallback(text) for text in texts])
+    batch = best_of(args.runs, lambda: keyword_sentiment.analyze_batch(texts))
+    print(f"\nfull fallback with response objects: legacy {legacy * 1000:.1f} ms, "
+          f"compiled batch {batch * 1000:.1f} ms ({legacy / batch:.1f}x)")
+
+    disagreements = {
+        text: (legacy_fallback(text).sentiment, keyword_sentiment.analyze(text).sentiment)
+        for text in texts
+    }
+    disagreements = {text: pair for text, pair in disagreements.items() if pair[0] != pair[1]}
+    print(f"\n{len(disagreements)} distinct texts labeled differently, e.g.:")
+    for text, (old, new) in list(disagreements.items())[:5]:
+        print(f"  {old:>8} -> {new:<8} {text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=5000, help="texts scored per run")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--extra-keywords", type=int, default=200, help="synthetic keywords added for the scaling run")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())
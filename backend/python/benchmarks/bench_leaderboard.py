@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ranking cost per answer, full recalculation vs incremental leaderboard
+
+For each event size, seeds one event with that many participants in a
+throwaway SQLite database (unless DATABASE_URL is already set) and replays the
+same stream of point awards three ways:
+
+  full         gamification_service.recalculate_rankings after every answer
+               (loads the event and rewrites rank_position, the old behaviour)
+  incremental  in-memory leaderboard, changed positions written in one bulk
+               UPDATE every --flush-every answers (LEADERBOARD_FLUSH_SECONDS)
+  write-through  in-memory leaderboard, changed positions written after every
+               answer (what scripts without the background writer get)
+
+Each answer also commits the participant's new points, as the API does. The
+stored rank_position values are checked against the board afterwards.
+
+Usage:
+    python benchmarks/bench_leaderboard.py [--sizes 100 1000 10000] [--answers 300] [--flush-every 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_leaderboard.db"
+# Flushes are driven by the benchmark, not the timer
+os.environ["LEADERBOARD_FLUSH_SECONDS"] = "3600"
+
+
+def seed(participants: int, seed_value: int) -> tuple:
+    """Create an event with participants holding random points; return (event id, participant ids)"""
+    import models
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(seed_value)
+    db = SessionLocal()
+    try:
+        event = models.Event(title=f"Bench Night ({participants})", event_date=datetime.now(), status="completed")
+        db.add(event)
+        db.commit()
+        db.add_all([
+            models.Participant(
+                event_id=event.id, user_id=f"bench-{i}", name=f"Bench {i}", email=f"bench{i}@example.com",
+                points=rng.randrange(0, 500)
+            )
+            for i in range(participants)
+        ])
+        db.commit()
+        ids = [pid for (pid,) in db.query(models.Participant.id).filter(models.Participant.event_id == event.id)]
+        return event.id, ids
+    finally:
+        db.close()
+
+
+async def replay(mode: str, participants: int, args) -> dict:
+    """Award the same points stream on a fresh event; return timings"""
+    import models
+    from database import SessionLocal
+    from services.gamification_service import gamification_service
+    from services.leaderboard import LeaderboardService
+
+    event_id, ids = seed(participants, args.seed)
+    rng = random.Random(args.seed)
+    awards = [(rng.choice(ids), rng.choice((10, 15, 25, 40, 60))) for _ in range(args.answers)]
+
+    service = LeaderboardService()
+    if mode == "incremental":
+        await service.start()
+
+    db = SessionLocal()
+    latencies = []
+    start = time.perf_counter()
+    try:
+        for index, (participant_id, points) in enumerate(awards, start=1):
+            answer_start = time.perf_counter()
+            participant = db.get(models.Participant, participant_id)
+            participant.points += points
+            db.commit()
+            if mode == "full":
+                await gamification_service.recalculate_rankings(db, event_id)
+            else:
+                service.update(db, participant)
+                if mode == "incremental" and index % args.flush_every == 0:
+                    await service.flush()
+            latencies.append(time.perf_counter() - answer_start)
+        await service.stop()
+        elapsed = time.perf_counter() - start
+
+        # Stored positions must match a ranking by points (ties by id)
+        rows = db.query(models.Participant.id, models.Participant.points, models.Participant.rank_position).filter(
+            models.Participant.event_id == event_id
+        ).all()
+        expected = {pid: position for position, (_, pid) in enumerate(sorted((-p, pid) for pid, p, _ in rows), start=1)}
+        mismatches = sum(1 for pid, _, rank in rows if rank != expected[pid]) if mode != "full" else 0
+    finally:
+        db.close()
+
+    return {
+        "per_answer_ms": elapsed / args.answers * 1000,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "rows_written": service.rows_written if mode != "full" else None,
+        "mismatches": mismatches,
+    }
+
+
+def rank_lookup_us(participants: int, lookups: int = 20000) -> float:
+    """Average in-memory rank lookup on a board of this size"""
+    from services.leaderboard import EventLeaderboard
+
+    rng = random.Random(1)
+    board = EventLeaderboard((pid, rng.randrange(0, 500)) for pid in range(participants))
+    targets = [rng.randrange(participants) for _ in range(lookups)]
+    start = time.perf_counter()
+    for pid in targets:
+        board.rank(pid)
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+async def main(args):
+    import builtins
+
+    print(f"{args.answers} answers per run, incremental flush every {args.flush_every} answers\n")
+    print(f"{'participants':>12}  {'mode':<14}{'ms/answer':>10}{'p50 ms':>9}{'max ms':>9}{'rows written':>14}  check")
+    real_print = builtins.print
+    for size in args.sizes:
+        for mode in ("full", "incremental", "write-through"):
+            builtins.print = lambda *a, **k: None
+            try:
+                result = await replay(mode, size, args)
+            finally:
+                builtins.print = real_print
+            rows = "" if result["rows_written"] is None else str(result["rows_written"])
+            check = "-" if mode == "full" else ("ok" if not result["mismatches"] else f"{result['mismatches']} wrong")
+            print(f"{size:>12}  {mode:<14}{result['per_answer_ms']:>10.2f}{result['p50_ms']:>9.2f}"
+                  f"{result['max_ms']:>9.2f}{rows:>14}  {check}")
+        print(f"{'':>12}  rank lookup on the board: {rank_lookup_us(size):.2f} µs\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="participants per event")
+    parser.add_argument("--answers", type=int, default=300, help="point awards replayed per run")
+    parser.add_argument("--flush-every", type=int, default=50, help="answers between incremental flushes")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time-to-first-token of streamed question generation
+
+Runs question generation against a local fake streaming model that emits the
+question JSON in small chunks with a fixed delay between them. Compares the
+wait before the host sees anything with the plain (non-streaming) call and
+checks that the stream ends with a valid GenerateQuestionResponse.
+
+Usage:
+    python benchmarks/bench_question_stream.py [--runs 5] [--chunks 40] [--chunk-delay 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-dummy-key")
+
+from services.gemini_service import GeminiService  # noqa: E402
+from schemas import GenerateQuestionResponse  # noqa: E402
+
+
+class FakeChunk:
+    """Minimal stand-in for a streamed SDK response chunk"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """Async iterator over chunks, like the SDK's AsyncGenerateContentResponse"""
+
+    def __init__(self, pieces: list, delay: float):
+        self.pieces = pieces
+        self.delay = delay
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for piece in self.pieces:
+            await asyncio.sleep(self.delay)
+            yield FakeChunk(piece)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.pieces)
+
+
+class FakeStreamingModel:
+    """Fake model that produces its output in `chunks` pieces, `delay` seconds apart"""
+
+    PAYLOAD = json.dumps({
+        "text": "¿Qué desafío encontraron al llevar modelos de IA a producción?",
+        "question_type": "open",
+        "options": None,
+        "reasoning": "Invita a compartir experiencias concretas del público",
+    }, ensure_ascii=False)
+
+    def __init__(self, chunks: int, delay: float):
+        size = max(1, len(self.PAYLOAD) // chunks)
+        self.pieces = [self.PAYLOAD[i:i + size] for i in range(0, len(self.PAYLOAD), size)]
+        self.delay = delay
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        response = FakeStream(self.pieces, self.delay)
+        if not stream:
+            await asyncio.sleep(self.delay * len(self.pieces))
+        return response
+
+
+async def main(args):
+    import builtins
+
+    service = GeminiService(model=FakeStreamingModel(args.chunks, args.chunk_delay))
+    plain, first_token, streamed = [], [], []
+
+    # Silence the per-call logging of the service while benchmarking
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            await service.generate_question(context="Tech Night: IA en producción")
+            plain.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            first = None
+            final = None
+            async for kind, payload in service.generate_question_stream(context="Tech Night: IA en producción"):
+                if kind == "token" and first is None:
+                    first = time.perf_counter() - start
+                elif kind == "question":
+                    final = payload
+            streamed.append(time.perf_counter() - start)
+            first_token.append(first)
+
+            assert isinstance(final, GenerateQuestionResponse) and final.reasoning != "Fallback question"
+    finally:
+        builtins.print = real_print
+
+    print(f"{args.runs} runs, {len(service.model.pieces)} chunks, {args.chunk_delay * 1000:.0f} ms between chunks")
+    print(f"{'mode':<24}{'median ms':>12}{'max ms':>10}")
+    for label, values in (
+        ("plain (full response)", plain),
+        ("stream first token", first_token),
+        ("stream final question", streamed),
+    ):
+        print(f"{label:<24}{statistics.median(values) * 1000:>12.1f}{max(values) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="generations per mode")
+    parser.add_argument("--chunks", type=int, default=40, help="chunks the fake model splits its output into")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="seconds between chunks")
+    asyncio.run(main(parser.parse_args()))
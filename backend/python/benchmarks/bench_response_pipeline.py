@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end latency of POST /api/responses, offline
+
+Seeds an event with participants in a throwaway SQLite database (unless
+DATABASE_URL is already set) and submits one free-text response per
+participant through the ASGI app, `--concurrency` at a time. Gemini is served
+by whatever GEMINI_BACKEND selects; use the local stand-in or a replay
+cassette so runs cost no quota and are repeatable:
+
+    python benchmarks/gemini_standin.py --latency 0.8 --seed 1 &
+    GEMINI_BACKEND=standin python benchmarks/bench_response_pipeline.py
+
+    export GEMINI_CASSETTE_PATH=pipeline.json GEMINI_SENTIMENT_BATCH_SIZE=1
+    GEMINI_BACKEND=record python benchmarks/bench_response_pipeline.py
+    GEMINI_BACKEND=replay python benchmarks/bench_response_pipeline.py
+
+(Replay matches exact prompts, so disable micro-batching when recording:
+batch composition depends on timing.)
+
+Each in-flight submission holds a database connection while it waits on
+Gemini, so keep --concurrency within the SQLAlchemy pool (5 + 10 overflow by
+default); beyond that, requests queue on pool checkout.
+
+Usage:
+    python benchmarks/bench_response_pipeline.py [--participants 200] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_pipeline.db"
+os.environ.setdefault("QUESTION_POOL_SIZE", "0")
+
+ANSWERS = [
+    "Excelente charla, muy clara y con ejemplos útiles",
+    "Me pareció interesante pero un poco lenta al principio",
+    "No entendí la parte de despliegue, fue confusa",
+    "Genial la demo en vivo, me encantó",
+    "Estuvo bien, algunos temas ya los conocía",
+]
+
+
+async def asgi_post(app, path: str, payload: dict) -> tuple:
+    """POST JSON directly to an ASGI app; return (status, headers)"""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    body_sent = False
+    result = {}
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = {key.decode(): value.decode() for key, value in message["headers"]}
+
+    await app(scope, receive, send)
+    return result.get("status", 0), result.get("headers", {})
+
+
+def seed(participants: int) -> tuple:
+    """Create an event, one open question and the participants"""
+    import models
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        event = models.Event(title="Bench Night: IA en producción", event_date=datetime.now(), status="live")
+        db.add(event)
+        db.commit()
+        question = models.Question(event_id=event.id, text="¿Qué te pareció la charla?", question_type="open", order=1)
+        db.add(question)
+        event.questions_count = 1
+        db.add_all([
+            models.Participant(event_id=event.id, user_id=f"bench-{i}", name=f"Bench {i}", email=f"bench{i}@example.com")
+            for i in range(participants)
+        ])
+        db.commit()
+        participant_ids = [p.id for p in db.query(models.Participant).filter(models.Participant.event_id == event.id)]
+        return question.id, participant_ids
+    finally:
+        db.close()
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main(args):
+    import builtins
+    from database import SessionLocal
+    from main import app
+    from services.gamification_service import gamification_service
+    from services.gemini_service import get_gemini_service
+    from services.stage_timing import response_pipeline_metrics
+
+    question_id, participant_ids = seed(args.participants)
+    db = SessionLocal()
+    await gamification_service.seed_badges(db)
+    db.close()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, statuses = [], {}
+
+    async def submit(index: int, participant_id: int):
+        async with semaphore:
+            start = time.perf_counter()
+            status, _ = await asgi_post(app, "/api/responses", {
+                "question_id": question_id,
+                "participant_id": participant_id,
+                "text": f"{ANSWERS[index % len(ANSWERS)]} ({index})",
+            })
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    # Silence the per-call logging of the service while benchmarking
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(submit(i, pid) for i, pid in enumerate(participant_ids)))
+        elapsed = time.perf_counter() - start
+    finally:
+        builtins.print = real_print
+
+    gemini = get_gemini_service().get_stats()
+    print(f"{len(participant_ids)} responses, concurrency {args.concurrency}, "
+          f"backend {gemini['backend']['name']}, statuses {statuses}")
+    print(f"throughput {len(latencies) / elapsed:.1f} req/s, "
+          f"p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {percentile(latencies, 95) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, stage in response_pipeline_metrics.get_stats()["stages"].items():
+        print(f"{name:<12}{stage['p50_ms']:>10.1f}{stage['p95_ms']:>10.1f}{stage['max_ms']:>10.1f}")
+    print(f"fallbacks {gemini['sentiment_batching']['batch_failures']} batch failures, "
+          f"breaker {gemini['circuit_breaker']['state']}, backend stats {gemini['backend']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=200, help="responses to submit (one per participant)")
+    parser.add_argument("--concurrency", type=int, default=10, help="submissions in flight at once")
+    asyncio.run(main(parser.parse_args()))
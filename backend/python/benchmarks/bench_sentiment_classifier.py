@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local sentiment classifier vs Gemini labels
+
+Trains the classifier on part of the labeled responses (from the database, or
+a JSONL file of {"text": ..., "sentiment": ...} lines) and, on the held-out
+rest, reports for each confidence threshold the share of texts it would answer
+without calling Gemini and how often those answers agree with Gemini's label.
+Escalated texts keep Gemini's label, so the blended agreement is what the
+tiered pipeline would store. Also reports per-text prediction latency.
+
+Usage:
+    python benchmarks/bench_sentiment_classifier.py [--jsonl labels.jsonl] [--holdout 0.2]
+                                                    [--thresholds 0.6 0.7 0.8 0.9 0.95]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.sentiment_classifier import NaiveBayesSentimentClassifier, load_labeled_responses, split_holdout
+
+
+def load_samples(jsonl_path: str = None) -> list:
+    """(text, sentiment) pairs from a JSONL file or the database"""
+    if jsonl_path:
+        with open(jsonl_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return [(row["text"], row["sentiment"]) for row in rows]
+
+    from database import SessionLocal
+    if SessionLocal is None:
+        sys.exit("DATABASE_URL is not set; pass --jsonl instead")
+    db = SessionLocal()
+    try:
+        return load_labeled_responses(db)
+    finally:
+        db.close()
+
+
+def main(args):
+    samples = load_samples(args.jsonl)
+    train_set, test_set = split_holdout(samples, args.holdout, seed=args.seed)
+    if not train_set or not test_set:
+        sys.exit(f"Not enough labeled samples ({len(samples)}) for a {args.holdout:g} holdout")
+
+    start = time.perf_counter()
+    model = NaiveBayesSentimentClassifier().train(train_set)
+    train_seconds = time.perf_counter() - start
+
+    predictions, latencies = [], []
+    for text, _ in test_set:
+        start = time.perf_counter()
+        predictions.append(model.predict(text))
+        latencies.append(time.perf_counter() - start)
+
+    print(f"{len(train_set)} training / {len(test_set)} holdout samples, "
+          f"{len(model.vocabulary)} features, trained in {train_seconds * 1000:.0f} ms")
+    print(f"predict p50 {statistics.median(latencies) * 1e6:.0f} µs, "
+          f"p95 {sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1e6:.0f} µs")
+
+    overall = sum(p.sentiment == label for p, (_, label) in zip(predictions, test_set)) / len(test_set)
+    print(f"agreement with Gemini on every text (no threshold): {overall:.1%}\n")
+
+    print(f"{'threshold':>10}{'calls avoided':>15}{'agreement (served)':>20}{'agreement (blended)':>21}")
+    for threshold in args.thresholds:
+        served = [
+            (p, label) for p, (text, label) in zip(predictions, test_set)
+            if p.confidence >= threshold and model.known_tokens(text) > 0
+        ]
+        agree = sum(p.sentiment == label for p, label in served)
+        served_agreement = f"{agree / len(served):.1%}" if served else "-"
+        # Escalated texts get Gemini's own label, so only served disagreements count
+        blended = (len(test_set) - len(served) + agree) / len(test_set)
+        print(f"{threshold:>10.2f}{len(served) / len(test_set):>15.1%}{served_agreement:>20}{blended:>21.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jsonl", help="labeled samples file instead of the database")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of samples used for evaluation")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9, 0.95])
+    parser.add_argument("--seed", type=int, default=42, help="train/holdout split seed")
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold import time of the app and scripts
+
+Imports each target module in a fresh interpreter with `python -X importtime`,
+repeated a few times, and reports the median wall time, the cumulative import
+time of the module itself, and the heaviest imports underneath it. Runs without
+GEMINI_API_KEY so it also checks that importing never requires the key.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 10] [--modules main seed_data]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_once(module: str) -> tuple:
+    """Import a module in a fresh interpreter; return (wall seconds, {module: cumulative us})"""
+    env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return elapsed, cumulative
+
+
+def main(args):
+    print(f"{args.runs} cold imports per module (GEMINI_API_KEY unset)")
+    for module in args.modules:
+        walls = []
+        runs = []
+        for _ in range(args.runs):
+            wall, cumulative = import_once(module)
+            walls.append(wall)
+            runs.append(cumulative)
+
+        # Median cumulative time per imported module across runs
+        names = set().union(*runs)
+        medians = {name: statistics.median(run.get(name, 0) for run in runs) for name in names}
+
+        print()
+        print(f"{module}: wall {statistics.median(walls) * 1000:.0f} ms, "
+              f"import {medians.get(module, 0) / 1000:.0f} ms")
+        heaviest = sorted(
+            (name for name in names if name != module and "." not in name),
+            key=lambda name: medians[name],
+            reverse=True,
+        )[:args.top]
+        for name in heaviest:
+            print(f"    {medians[name] / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="heaviest top-level packages to list")
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=["main", "seed_data", "reset_db", "services.gemini_service"],
+        help="modules to import",
+    )
+    main(parser.parse_args())
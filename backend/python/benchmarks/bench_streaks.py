@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark: consecutive-event streaks, per-user walk vs one window query vs incremental join
+
+Seeds --events completed events and --users users who each attend an event with
+probability --attendance (runs of attendance are made sticky with --stickiness
+so long streaks exist), in a throwaway SQLite database unless DATABASE_URL is
+already set. Then computes every streak three ways:
+
+  per-user     one query per user loading their participations in event order
+               and walking them in Python (what a naive job would do)
+  window       streak_service.refresh: one gaps-and-islands window query over
+               all participations, changed rows written in one bulk UPDATE
+  incremental  streak_service.streak_on_join for --joins users joining the next
+               event (cold per-user cache: one lookup each) and then the one
+               after it (warm cache: no query)
+
+All results are checked against a reference computed in memory. SQLite runs
+in process, so the per-user queries pay no network round trip; point
+DATABASE_URL at PostgreSQL to see that cost.
+
+Usage:
+    python benchmarks/bench_streaks.py [--users 5000] [--events 300] [--attendance 0.3] [--joins 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Make the backend modules importable when run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_streaks.db"
+
+
+def seed(args) -> tuple:
+    """Create events and participations; return (event ids in order, expected streak per (user, event))"""
+    import models
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(engine)
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        start = datetime(2024, 1, 1)
+        db.execute(models.Event.__table__.insert(), [
+            {"title": f"Bench Night {i}", "event_date": start + timedelta(days=7 * i), "status": "completed"}
+            for i in range(args.events)
+        ])
+        db.commit()
+        event_ids = [eid for (eid,) in db.query(models.Event.id).order_by(models.Event.event_date, models.Event.id)]
+
+        rows, expected = [], {}
+        for user in range(args.users):
+            user_id = f"bench-{user}"
+            attending, streak = rng.random() < args.attendance, 0
+            for event_id in event_ids:
+                # Sticky attendance: mostly keep doing what you did last time
+                if rng.random() > args.stickiness:
+                    attending = rng.random() < args.attendance
+                if attending:
+                    streak += 1
+                    expected[(user_id, event_id)] = streak
+                    rows.append({
+                        "event_id": event_id, "user_id": user_id, "name": f"Bench {user}",
+                        "email": f"bench{user}@example.com", "points": 0, "streak": 0,
+                        "responses_count": 0, "quality_score": 0.0, "sentiment_score": 0.0,
+                    })
+                else:
+                    streak = 0
+        for offset in range(0, len(rows), 20000):
+            db.execute(models.Participant.__table__.insert(), rows[offset:offset + 20000])
+        db.commit()
+        return event_ids, expected
+    finally:
+        db.close()
+
+
+def per_user_walk(db) -> dict:
+    """Streak of every participation, one query per user"""
+    import models
+
+    seq = {eid: i for i, (eid,) in enumerate(db.query(models.Event.id).order_by(models.Event.event_date, models.Event.id))}
+    streaks = {}
+    for (user_id,) in db.query(models.Participant.user_id).distinct():
+        event_ids = sorted(
+            (eid for (eid,) in db.query(models.Participant.event_id).filter(models.Participant.user_id == user_id)),
+            key=seq.get
+        )
+        previous, streak = None, 0
+        for event_id in event_ids:
+            streak = streak + 1 if previous is not None and seq[event_id] == previous + 1 else 1
+            previous = seq[event_id]
+            streaks[(user_id, event_id)] = streak
+    return streaks
+
+
+def stored_streaks(db) -> dict:
+    import models
+
+    return {(uid, eid): streak for uid, eid, streak in db.query(
+        models.Participant.user_id, models.Participant.event_id, models.Participant.streak
+    )}
+
+
+def main(args):
+    import models
+    from database import SessionLocal
+    from services.streak_service import StreakService
+
+    start = time.perf_counter()
+    event_ids, expected = seed(args)
+    print(f"Seeded {args.users} users, {args.events} events, {len(expected)} participations "
+          f"(longest streak {max(expected.values(), default=0)}) in {time.perf_counter() - start:.1f}s\n")
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        walked = per_user_walk(db)
+        walk_seconds = time.perf_counter() - start
+        print(f"{'per-user':<12}{walk_seconds * 1000:>10.0f} ms  {args.users} queries  "
+              f"{'ok' if walked == expected else 'MISMATCH'}")
+
+        service = StreakService()
+        start = time.perf_counter()
+        changed = service.refresh(db)
+        print(f"{'window':<12}{(time.perf_counter() - start) * 1000:>10.0f} ms  1 query + {changed} rows written  "
+              f"{'ok' if stored_streaks(db) == expected else 'MISMATCH'}")
+        start = time.perf_counter()
+        service.refresh(db)
+        window_seconds = time.perf_counter() - start
+        print(f"{'window':<12}{window_seconds * 1000:>10.0f} ms  1 query, nothing to write (compute only)")
+        print(f"{'':<12}compute speedup vs per-user: {walk_seconds / window_seconds:.1f}x\n")
+
+        # Two more events after the last one; the same users join both
+        last_date = db.get(models.Event, event_ids[-1]).event_date
+        next_events = [
+            models.Event(title=f"Bench Night next {i}", event_date=last_date + timedelta(days=7 * i), status="live")
+            for i in (1, 2)
+        ]
+        db.add_all(next_events)
+        db.commit()
+        rng = random.Random(args.seed)
+        joiners = [f"bench-{u}" for u in rng.sample(range(args.users), min(args.joins, args.users))]
+        last_event_id = event_ids[-1]
+        join_service = StreakService()
+        streaks = {}
+        for label, event in zip(("cold cache", "warm cache"), next_events):
+            start = time.perf_counter()
+            for user_id in joiners:
+                streaks[(user_id, event.id)] = join_service.streak_on_join(db, event, user_id)
+            per_join = (time.perf_counter() - start) / len(joiners) * 1e6
+            print(f"{'join ' + label:<22}{per_join:>8.0f} µs/join  cache hit rate {join_service.cache.get_stats()['hit_rate']}")
+        wrong = sum(
+            1 for user_id in joiners
+            if streaks[(user_id, next_events[0].id)] != expected.get((user_id, last_event_id), 0) + 1
+            or streaks[(user_id, next_events[1].id)] != streaks[(user_id, next_events[0].id)] + 1
+        )
+        print(f"{'':<22}{'ok' if not wrong else f'{wrong} wrong'}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--attendance", type=float, default=0.3, help="probability a user attends an event")
+    parser.add_argument("--stickiness", type=float, default=0.8, help="probability attendance repeats the previous event's")
+    parser.add_argument("--joins", type=int, default=1000, help="users joining the next event in the incremental run")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
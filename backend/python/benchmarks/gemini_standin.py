@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Local Gemini stand-in server for offline load testing
+
+Answers the prompts GeminiService sends (single and batched sentiment,
+question generation) with plausible JSON after a randomized delay, and fails a
+configurable share of calls with 429 or 503. A share of calls can be made
+pathologically slow (--tail-rate/--tail-latency) to exercise hedging, and each
+model can get its own mean latency. Point the backend at it with:
+
+    GEMINI_BACKEND=standin GEMINI_STANDIN_URL=http://127.0.0.1:8765
+
+Usage:
+    python benchmarks/gemini_standin.py [--port 8765] [--latency 0.8] [--jitter 0.3]
+                                        [--rate-limit-rate 0.02] [--error-rate 0.01] [--seed 1]
+                                        [--tail-rate 0.05 --tail-latency 5]
+                                        [--model-latency gemini-2.5-flash-lite=0.4]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SINGLE_TEXT = re.compile(r'^Text to analyze: (".*")\s*$', re.MULTILINE)
+BATCH_LINE = re.compile(r'^\s*(\d+)\. (".*")\s*$', re.MULTILINE)
+
+POSITIVE_WORDS = ("excelente", "genial", "bueno", "buena", "claro", "util", "útil", "me encantó", "interesante", "great")
+NEGATIVE_WORDS = ("malo", "mala", "aburrido", "confuso", "terrible", "no entendí", "lento", "bad")
+
+
+def score_text(text: str) -> dict:
+    """Cheap keyword sentiment so responses look plausible"""
+    lowered = text.lower()
+    positive = sum(word in lowered for word in POSITIVE_WORDS)
+    negative = sum(word in lowered for word in NEGATIVE_WORDS)
+    if positive > negative:
+        return {"sentiment": "positive", "score": min(1.0, 0.4 + 0.2 * positive), "confidence": 0.85}
+    if negative > positive:
+        return {"sentiment": "negative", "score": max(-1.0, -0.4 - 0.2 * negative), "confidence": 0.85}
+    return {"sentiment": "neutral", "score": 0.0, "confidence": 0.7}
+
+
+def answer(prompt: str) -> str:
+    """Build the model output GeminiService expects for a prompt"""
+    if "Texts to analyze:" in prompt:
+        items = []
+        for index, quoted in BATCH_LINE.findall(prompt):
+            items.append({"index": int(index), **score_text(json.loads(quoted))})
+        return json.dumps(items, ensure_ascii=False)
+
+    match = SINGLE_TEXT.search(prompt)
+    if match:
+        return json.dumps(score_text(json.loads(match.group(1))), ensure_ascii=False)
+
+    if "Write one engaging, thought-provoking question" in prompt:
+        return json.dumps({
+            "text": f"¿Qué idea de hoy vas a aplicar primero? (#{random.randint(1, 9999)})",
+            "question_type": "open",
+            "options": None,
+            "reasoning": "Pregunta generada por el stand-in local",
+        }, ensure_ascii=False)
+
+    return json.dumps({"text": "ok"})
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    config: argparse.Namespace = None
+    lock = threading.Lock()
+    counters = {"requests": 0, "rate_limited": 0, "errors": 0, "tail": 0}
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        prompt = payload.get("prompt", "")
+        latency = self.config.model_latency.get(payload.get("model"), self.config.latency)
+
+        with self.lock:
+            self.counters["requests"] += 1
+            roll = random.random()
+            delay = max(0.0, random.gauss(latency, self.config.jitter))
+            if random.random() < self.config.tail_rate:
+                self.counters["tail"] += 1
+                delay = self.config.tail_latency
+
+        time.sleep(delay)
+
+        if roll < self.config.rate_limit_rate:
+            self._count("rate_limited")
+            return self._send(429, {"error": "Resource has been exhausted"})
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._count("errors")
+            return self._send(503, {"error": "Service unavailable"})
+
+        self._send(200, {"text": answer(prompt)})
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def do_GET(self):
+        self._send(200, dict(self.counters))
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+
+def parse_model_latency(values: list) -> dict:
+    """["model=seconds", ...] -> {model: seconds}"""
+    latencies = {}
+    for value in values or []:
+        model, _, seconds = value.partition("=")
+        latencies[model] = float(seconds)
+    return latencies
+
+
+def create_server(args) -> ThreadingHTTPServer:
+    """Build the stand-in server (also used in-process by benchmarks)"""
+    random.seed(args.seed)
+    if not isinstance(args.model_latency, dict):
+        args.model_latency = parse_model_latency(args.model_latency)
+    StandInHandler.config = args
+    return ThreadingHTTPServer(("127.0.0.1", args.port), StandInHandler)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.8, help="mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.3, help="standard deviation of the latency")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with 503")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="share of calls that take --tail-latency")
+    parser.add_argument("--tail-latency", type=float, default=5.0, help="latency of tail calls in seconds")
+    parser.add_argument("--model-latency", action="append", metavar="MODEL=SECONDS",
+                        help="mean latency for one model (repeatable)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    return parser
+
+
+def main(args):
+    server = create_server(args)
+    print(f"🧪 Gemini stand-in on http://127.0.0.1:{args.port} "
+          f"(latency {args.latency:g}±{args.jitter:g}s, 429 rate {args.rate_limit_rate:g}, "
+          f"503 rate {args.error_rate:g}, tail {args.tail_rate:g} at {args.tail_latency:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(build_parser().parse_args())
@@ -39,7 +39,7 @@ app.add_middleware(
 )
 
 # Import routers
-from routes import events, participants, questions, responses, messages, nybblers
+from routes import events, participants, questions, responses, messages, nybblers, metrics
 
 # Include routers
 app.include_router(events.router)
@@ -48,9 +48,14 @@ app.include_router(questions.router)
 app.include_router(responses.router)
 app.include_router(messages.router)
 app.include_router(nybblers.router)
+app.include_router(metrics.router)
 
 # Initialize badges on startup
 from services.gamification_service import gamification_service
+from services.enrichment_service import enrichment_service
+from services.question_pool import question_pool_service
+from services.event_summary import event_summary_service
+from services.leaderboard import leaderboard_service
 from database import SessionLocal
 
 @app.on_event("startup")
@@ -63,6 +68,30 @@ async def startup_event():
         print("✅ Badges seeded successfully")
     except Exception as e:
         print(f"⚠️  Error seeding badges: {e}")
+    
+    try:
+        await enrichment_service.start()
+    except Exception as e:
+        print(f"⚠️  Error starting enrichment workers: {e}")
+    
+    try:
+        await leaderboard_service.start()
+    except Exception as e:
+        print(f"⚠️  Error loading leaderboards: {e}")
+    
+    try:
+        await question_pool_service.start()
+    except Exception as e:
+        print(f"⚠️  Error starting question pool producer: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers"""
+    await enrichment_service.stop()
+    await question_pool_service.stop()
+    await event_summary_service.stop()
+    await leaderboard_service.stop()
 
 
 # Response models
@@ -123,6 +152,45 @@ async def health_check_db():
     }
 
 
+class AIHealthResponse(BaseModel):
+    """
+    Gemini AI health check response model
+    """
+    status: str
+    circuit_breaker: dict
+    timestamp: datetime
+
+
+@app.get("/api/health/ai", tags=["Health"], operation_id="apiHealthAiGet", response_model=AIHealthResponse)
+async def health_check_ai():
+    """
+    Gemini AI health check endpoint
+
+    Reports the Gemini circuit breaker state. While the breaker is open, AI
+    calls short-circuit to the keyword fallback and status is "degraded".
+    Status is "unconfigured" when GEMINI_API_KEY is not set.
+
+    Returns:
+        AIHealthResponse: Breaker state, trip counts and current call deadlines
+    """
+    from services.gemini_service import get_gemini_service
+    
+    try:
+        breaker = get_gemini_service().breaker.get_stats()
+    except ValueError:
+        return {
+            "status": "unconfigured",
+            "circuit_breaker": {},
+            "timestamp": datetime.utcnow()
+        }
+    
+    return {
+        "status": "ok" if breaker["state"] == "closed" else "degraded",
+        "circuit_breaker": breaker,
+        "timestamp": datetime.utcnow()
+    }
+
+
 @app.get("/api/openapi.yaml", include_in_schema=False)
 async def get_openapi_yaml():
     """
@@ -30,6 +30,14 @@ class Event(Base):
     # Google Calendar integration (mock)
     google_calendar_id = Column(String(300), nullable=True)
     
+    # Maintained when questions are added or deleted (completion badges)
+    questions_count = Column(Integer, nullable=False, default=0)
+    
+    # AI summary of all responses, generated once when the event is completed
+    ai_summary = Column(Text, nullable=True)
+    ai_summary_response_count = Column(Integer, nullable=True)  # Responses the summary covers
+    ai_summary_generated_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Relations
     participants = relationship("Participant", back_populates="event", cascade="all, delete-orphan")
     questions = relationship("Question", back_populates="event", cascade="all, delete-orphan")
@@ -63,6 +71,11 @@ class Participant(Base):
     
     # Stats
     responses_count = Column(Integer, nullable=False, default=0)
+    
+    # Badge counters, updated in the same transaction as the responses they count
+    answered_questions_count = Column(Integer, nullable=False, default=0)
+    high_quality_responses_count = Column(Integer, nullable=False, default=0)  # quality_score >= 0.7
+    positive_responses_count = Column(Integer, nullable=False, default=0)
     quality_score = Column(Float, nullable=False, default=0.0)  # AI-calculated quality
     sentiment_score = Column(Float, nullable=False, default=0.0)  # Positive/Negative/Neutral
     
@@ -79,6 +92,10 @@ class Participant(Base):
         Index('ix_participants_event_id', 'event_id'),
         Index('ix_participants_user_id', 'user_id'),
         Index('ix_participants_points', 'points'),
+        # Leaderboards: RANK() OVER (PARTITION BY event_id ORDER BY points DESC)
+        Index('ix_participants_event_points', event_id, points.desc()),
+        # A user's participation in an event (join checks, streak lookups)
+        Index('ix_participants_event_user', 'event_id', 'user_id'),
     )
 
 
@@ -98,6 +115,7 @@ class Question(Base):
     
     # Options for multiple choice / quick options
     options = Column(JSON, nullable=True)  # ["Option 1", "Option 2", ...]
+    option_analysis = Column(JSON, nullable=True)  # {"Option 1": {"sentiment", "score", "confidence", "quality_score"}, ...}
     
     # AI-generated or manual
     is_ai_generated = Column(Boolean, nullable=False, default=False)
@@ -235,6 +253,45 @@ class ParticipantBadge(Base):
     )
 
 
+class EnrichmentJob(Base):
+    """
+    Pending AI enrichment (sentiment + quality) for a response stored in deferred mode.
+    Used as a durable queue when ENRICHMENT_QUEUE_BACKEND=postgres.
+    """
+    __tablename__ = "enrichment_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    response_id = Column(Integer, ForeignKey('responses.id', ondelete='CASCADE'), nullable=False)
+    is_first_response = Column(Boolean, nullable=False, default=False)
+    
+    # Processing state
+    status = Column(String(20), nullable=False, default='pending')  # pending, running, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    
+    # Timestamps
+    enqueued_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('ix_enrichment_jobs_status_id', 'status', 'id'),
+    )
+
+
+class SentimentCacheEntry(Base):
+    """
+    Persistent sentiment cache tier (SENTIMENT_CACHE_BACKEND=postgres).
+    Keyed by the SHA-256 of the normalized response text.
+    """
+    __tablename__ = "sentiment_cache"
+    
+    key = Column(String(64), primary_key=True)
+    sentiment = Column(String(50), nullable=False)
+    score = Column(Float, nullable=False)
+    confidence = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
 # Keep Example model for backward compatibility (can be removed later)
 class Example(Base):
     """
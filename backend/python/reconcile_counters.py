@@ -0,0 +1,53 @@
+"""
+Verify the incrementally maintained badge counters against the source tables
+
+Participant counters (answered questions, high-quality responses, positive
+responses) and event question counts are updated on every write path in the
+same transaction as the rows they count. This job recomputes them from
+`responses` and `questions` with set-wise queries and reports any drift (e.g.
+rows changed with raw SQL); with --fix it rewrites them in one UPDATE per table.
+
+Usage:
+    python reconcile_counters.py [--event-id 3] [--fix]
+"""
+import argparse
+from database import SessionLocal
+from services.gamification_service import gamification_service
+
+
+def reconcile(args) -> int:
+    db = SessionLocal()
+    try:
+        drift = gamification_service.find_counter_drift(db, args.event_id)
+        for item in drift[:args.show]:
+            print(f"   ✗ {item['table']} #{item['id']} {item['column']}: stored {item['stored']}, actual {item['actual']}")
+        if len(drift) > args.show:
+            print(f"   … and {len(drift) - args.show} more")
+
+        if not drift:
+            print("✅ All counters match")
+            return 0
+        if not args.fix:
+            print(f"⚠️  {len(drift)} counters drifted (run with --fix to correct them)")
+            return 1
+
+        participants = gamification_service.refresh_all_participant_counters(db, args.event_id)
+        events = gamification_service.refresh_event_question_counts(db, args.event_id)
+        db.commit()
+        print(f"✅ Fixed {len(drift)} counters (recomputed {participants} participants and {events} events)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--event-id", type=int, default=None, help="only this event and its participants")
+    parser.add_argument("--fix", action="store_true", help="rewrite drifted counters from the source tables")
+    parser.add_argument("--show", type=int, default=20, help="drifted counters to list")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Badge counter reconciliation")
+    print("=" * 50)
+    raise SystemExit(reconcile(args))
@@ -0,0 +1,36 @@
+"""
+Recompute every participant's consecutive-event streak
+
+Streaks are set incrementally when participants join and settled for an
+event's attendees when it is completed. Run this after importing historical
+participations or rescheduling/cancelling past events: one gaps-and-islands
+window query recomputes all streaks and only the changed rows are written.
+
+Usage:
+    python refresh_streaks.py [--event-id 3]
+"""
+import argparse
+import time
+from database import SessionLocal
+from services.streak_service import streak_service
+
+
+def refresh(args):
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        changed = streak_service.refresh(db, args.event_id)
+        print(f"✅ Updated {changed} streaks in {time.perf_counter() - start:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--event-id", type=int, default=None, help="only the users who attended this event")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Streak refresh")
+    print("=" * 50)
+    refresh(args)
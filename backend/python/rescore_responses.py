@@ -0,0 +1,167 @@
+"""
+Re-score historical responses after a prompt or model change
+
+Walks the responses table in id order (keyset pagination, one chunk at a time),
+scores each chunk concurrently through the normal analysis path (so free-text
+answers share batched Gemini prompts at background priority under the
+GEMINI_REQUESTS_PER_MINUTE budget), writes the chunk back with one bulk
+UPDATE and records the last id in a checkpoint file. An interrupted run
+resumes from the checkpoint. Participant quality/sentiment averages and badge
+counters are recomputed set-wise at the end.
+
+Responses that only got the keyword fallback (breaker open, Gemini
+unconfigured...) keep their stored scores instead of being overwritten with a
+worse result; the count is reported so the run can be repeated later.
+
+Usage:
+    python rescore_responses.py [--event-id 3] [--chunk-size 200] [--requests-per-minute 60]
+                                [--checkpoint rescore_checkpoint.json] [--fresh] [--restart]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from sqlalchemy import select, update
+from database import SessionLocal
+from models import Question, Response
+
+
+def load_checkpoint(path: str, event_id) -> tuple:
+    """(last rescored response id, responses rescored) from a previous run of the same scope"""
+    if not os.path.exists(path):
+        return 0, 0
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("event_id") != event_id:
+        raise SystemExit(
+            f"❌ Checkpoint {path} belongs to event_id={checkpoint.get('event_id')}; "
+            f"use --restart or another --checkpoint"
+        )
+    print(f"↪️  Resuming after response #{checkpoint['last_id']} ({checkpoint['rescored']} already rescored)")
+    return checkpoint["last_id"], checkpoint["rescored"]
+
+
+def save_checkpoint(path: str, event_id, last_id: int, rescored: int):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"event_id": event_id, "last_id": last_id, "rescored": rescored, "saved_at": time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+def fetch_chunk(db, after_id: int, chunk_size: int, event_id=None) -> list:
+    """Next `chunk_size` responses with id > after_id"""
+    query = select(
+        Response.id, Response.question_id, Response.text, Response.rating, Response.is_quick_option
+    ).where(Response.id > after_id)
+    if event_id is not None:
+        query = query.where(Response.question_id.in_(select(Question.id).where(Question.event_id == event_id)))
+    return db.execute(query.order_by(Response.id).limit(chunk_size)).all()
+
+
+async def rescore(args):
+    # Read by GeminiService when it is first created below
+    if args.requests_per_minute is not None:
+        os.environ["GEMINI_REQUESTS_PER_MINUTE"] = str(args.requests_per_minute)
+    if args.fresh:
+        # Cached and classifier results come from the old prompts/model
+        os.environ["SENTIMENT_CACHE_SIZE"] = "0"
+        os.environ["SENTIMENT_CLASSIFIER_ENABLED"] = "false"
+
+    from services.gamification_service import gamification_service
+    from services.gemini_service import PRIORITY_BACKGROUND, get_gemini_service
+    from services.response_analysis import analyze_response
+
+    if SessionLocal is None:
+        print("❌ DATABASE_URL is not set")
+        return
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    last_id, rescored = load_checkpoint(args.checkpoint, args.event_id)
+
+    gemini_service = get_gemini_service()
+    questions = {}
+    skipped = 0
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        while True:
+            rows = fetch_chunk(db, last_id, args.chunk_size, args.event_id)
+            if not rows:
+                break
+
+            missing = {row.question_id for row in rows} - questions.keys()
+            if missing:
+                questions.update({q.id: q for q in db.query(Question).filter(Question.id.in_(missing))})
+
+            results = await asyncio.gather(*(
+                analyze_response(
+                    question=questions[row.question_id],
+                    text=row.text,
+                    rating=row.rating,
+                    is_quick_option=row.is_quick_option,
+                    priority=PRIORITY_BACKGROUND
+                )
+                for row in rows
+            ))
+
+            updates = [
+                {
+                    "id": row.id,
+                    "sentiment": sentiment.sentiment,
+                    "sentiment_score": sentiment.score,
+                    "quality_score": quality_score,
+                }
+                for row, (sentiment, quality_score) in zip(rows, results)
+                if sentiment.source != "fallback"
+            ]
+            if updates:
+                db.execute(update(Response), updates)
+                db.commit()
+
+            last_id = rows[-1].id
+            rescored += len(updates)
+            fallbacks = len(rows) - len(updates)
+            skipped += fallbacks
+            save_checkpoint(args.checkpoint, args.event_id, last_id, rescored)
+
+            elapsed = time.perf_counter() - start
+            print(f"   ✓ Rescored up to #{last_id} ({rescored} total, {fallbacks} fallbacks left as stored in chunk, "
+                  f"{(rescored + skipped) / elapsed:.1f}/s)")
+
+        updated = gamification_service.refresh_all_participant_scores(db, args.event_id)
+        gamification_service.refresh_all_participant_counters(db, args.event_id)
+        db.commit()
+        print(f"✅ Rescored {rescored} responses and refreshed {updated} participants")
+        if skipped:
+            print(f"⚠️  {skipped} responses only got the keyword fallback and kept their stored scores; "
+                  f"run again once Gemini is available to rescore them")
+        if os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+    finally:
+        db.close()
+
+    stats = gemini_service.get_stats()
+    print(f"📊 Gemini: {stats['sentiment_batching']['batches_sent']} batches, "
+          f"cache hit rate {stats['sentiment_cache']['hit_rate']}, "
+          f"classifier served {stats['sentiment_classifier']['served']}, "
+          f"rate-limited retries {stats['scheduler']['rate_limited_retries']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--event-id", type=int, default=None, help="only responses of this event")
+    parser.add_argument("--chunk-size", type=int, default=200, help="responses fetched, scored and updated per step")
+    parser.add_argument("--requests-per-minute", type=int, default=None,
+                        help="Gemini request budget for this run (default: GEMINI_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--checkpoint", default="rescore_checkpoint.json")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore the sentiment cache and local classifier (results from the old prompts)")
+    parser.add_argument("--restart", action="store_true", help="discard the checkpoint and start from the first response")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Response re-scoring")
+    print("=" * 50)
+    asyncio.run(rescore(args))
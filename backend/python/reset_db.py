@@ -15,6 +15,7 @@ def reset_database():
         # Drop tables in correct order (respecting foreign keys)
         tables_to_drop = [
             'participant_badges',
+            'enrichment_jobs',
             'responses',
             'messages',
             'questions',
@@ -28,6 +28,9 @@ def reset_participant_responses(participant_id: int = None, event_id: int = 1):
                 UPDATE participants 
                 SET points = 0, 
                     responses_count = 0,
+                    answered_questions_count = 0,
+                    high_quality_responses_count = 0,
+                    positive_responses_count = 0,
                     quality_score = 0.0,
                     sentiment_score = 0.0
                 WHERE id = {participant_id}
@@ -47,6 +50,9 @@ def reset_participant_responses(participant_id: int = None, event_id: int = 1):
                 UPDATE participants 
                 SET points = 0, 
                     responses_count = 0,
+                    answered_questions_count = 0,
+                    high_quality_responses_count = 0,
+                    positive_responses_count = 0,
                     quality_score = 0.0,
                     sentiment_score = 0.0
                 WHERE event_id = {event_id}
@@ -4,14 +4,18 @@ Event-related API endpoints
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, func
-from typing import List
+from typing import List, Optional
 from database import get_db
-from models import Event, Participant
+from models import Event, Question, Response
 from schemas import (
     CreateEventDto, UpdateEventDto, EventResponse,
-    EventStatsResponse, RankingResponse, ParticipantResponse
+    EventStatsResponse, EventSummaryResponse, RankingResponse, ParticipantResponse
 )
+from services.event_summary import event_summary_service
+from services.gamification_service import gamification_service
+from services.leaderboard import leaderboard_service
 from services.mock_apis import google_calendar_service, slack_service
+from services.streak_service import streak_service
 
 router = APIRouter(prefix="/api/events", tags=["Events"])
 
@@ -76,6 +80,7 @@ async def create_event(
     db.add(event)
     db.commit()
     db.refresh(event)
+    streak_service.invalidate_event_order()
     
     # Create Google Calendar event (mock)
     calendar_event = await google_calendar_service.create_event(
@@ -114,6 +119,8 @@ async def update_event(
     
     db.commit()
     db.refresh(event)
+    if "event_date" in update_data or "status" in update_data:
+        streak_service.invalidate_event_order()
     
     event_dict = EventResponse.from_orm(event).dict()
     event_dict["participant_count"] = len(event.participants)
@@ -138,6 +145,8 @@ async def delete_event(
     
     db.delete(event)
     db.commit()
+    leaderboard_service.invalidate(event_id)
+    streak_service.invalidate_event_order()
 
 
 @router.get("/{event_id}/stats", response_model=EventStatsResponse)
@@ -174,15 +183,14 @@ async def get_event_stats(
         completion_rate = (total_responses / (total_questions * total_participants)) * 100
     
     # Get top participants
-    top_participants = db.query(Participant).filter(
-        Participant.event_id == event_id
-    ).order_by(desc(Participant.points)).limit(10).all()
+    top_participants = gamification_service.get_leaderboard(db, event_id, limit=10)
     
     top_rankings = []
-    for i, p in enumerate(top_participants, start=1):
+    for position, p in top_participants:
         participant_response = ParticipantResponse.from_orm(p)
+        participant_response.rank_position = position
         ranking = RankingResponse(
-            position=i,
+            position=position,
             participant=participant_response,
             badges=[pb.badge.icon for pb in p.badges]
         )
@@ -203,23 +211,39 @@ async def get_event_stats(
 async def get_event_rankings(
     event_id: int,
     limit: int = 10,
+    offset: int = 0,
+    ties: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get event rankings/leaderboard"""
+    """
+    Get event rankings/leaderboard
+    
+    Positions are computed on read with a window function over the event.
+    `ties` picks how equal scores are positioned: `row_number` (distinct
+    positions, earlier joiner first), `rank` (1, 2, 2, 4) or `dense` (1, 2, 2, 3);
+    the default is RANKING_TIES. Page deep leaderboards with `offset`/`limit`.
+    """
     event = db.query(Event).filter(Event.id == event_id).first()
     
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    participants = db.query(Participant).filter(
-        Participant.event_id == event_id
-    ).order_by(desc(Participant.points)).limit(limit).all()
+    if ties is not None and ties not in gamification_service.TIE_FUNCTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ties must be one of: {', '.join(gamification_service.TIE_FUNCTIONS)}"
+        )
+    if limit < 1 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be positive and offset non-negative")
+    
+    participants = gamification_service.get_leaderboard(db, event_id, limit=limit, offset=offset, ties=ties)
     
     rankings = []
-    for i, p in enumerate(participants, start=1):
+    for position, p in participants:
         participant_response = ParticipantResponse.from_orm(p)
+        participant_response.rank_position = position
         ranking = RankingResponse(
-            position=i,
+            position=position,
             participant=participant_response,
             badges=[pb.badge.icon for pb in p.badges]
         )
@@ -265,6 +289,15 @@ async def complete_event(
     event.status = "completed"
     db.commit()
     
+    # Settle the streaks of everyone who attended, then award the badges that
+    # depend on the event being over (streaks, completion)
+    streak_service.refresh(db, event_id)
+    await gamification_service.award_event_badges(db, event_id)
+    
+    # Summarize all responses in the background; the summary is stored once
+    if event.ai_summary is None:
+        event_summary_service.schedule(event_id)
+    
     # Send thank you emails (mock)
     from services.mock_apis import email_service
     for participant in event.participants:
@@ -278,6 +311,48 @@ async def complete_event(
     return {"message": "Event completed", "status": "completed"}
 
 
-
-
-
+@router.get("/{event_id}/summary", response_model=EventSummaryResponse)
+async def get_event_summary(
+    event_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the AI summary of a completed event's responses
+    
+    Served from the event once generated. A completed event with no stored
+    summary and no job running (e.g. lost to a restart) starts one; a failed
+    job is retried by completing the event again.
+    """
+    event = db.query(Event).filter(Event.id == event_id).first()
+    
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    if event.ai_summary is not None:
+        return EventSummaryResponse(
+            event_id=event_id,
+            status="ready",
+            summary=event.ai_summary,
+            response_count=event.ai_summary_response_count,
+            generated_at=event.ai_summary_generated_at
+        )
+    
+    if event.status != "completed":
+        return EventSummaryResponse(event_id=event_id, status="not_completed")
+    
+    status = event_summary_service.status(event_id)
+    if status == "failed":
+        return EventSummaryResponse(
+            event_id=event_id,
+            status="failed",
+            error=event_summary_service.last_error(event_id)
+        )
+    if status is None:
+        has_responses = db.query(Response.id).join(Question).filter(
+            Question.event_id == event_id
+        ).first() is not None
+        if not has_responses:
+            return EventSummaryResponse(event_id=event_id, status="no_responses")
+        event_summary_service.schedule(event_id)
+    
+    return EventSummaryResponse(event_id=event_id, status="generating")
@@ -0,0 +1,86 @@
+"""
+Runtime metrics endpoints
+"""
+from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from services.ai_metrics import ai_metrics
+from services.badge_catalog import badge_catalog
+from services.enrichment_service import enrichment_service
+from services.event_summary import event_summary_service
+from services.gemini_service import get_gemini_service
+from services.leaderboard import leaderboard_service
+from services.question_pool import question_pool_service
+from services.stage_timing import response_pipeline_metrics
+from services.streak_service import streak_service
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """Get runtime metrics for background processing and AI services"""
+    try:
+        gemini = get_gemini_service().get_stats()
+    except ValueError as e:
+        gemini = {"error": str(e)}
+    
+    return {
+        "ai": ai_metrics.get_stats(),
+        "badges": badge_catalog.get_stats(),
+        "enrichment": enrichment_service.get_stats(),
+        "event_summaries": event_summary_service.get_stats(),
+        "gemini": gemini,
+        "leaderboard": leaderboard_service.get_stats(),
+        "question_pool": question_pool_service.get_stats(),
+        "response_pipeline": response_pipeline_metrics.get_stats(),
+        "streaks": streak_service.get_stats(),
+        "timestamp": datetime.utcnow()
+    }
+
+
+@router.get("/ai")
+async def get_ai_metrics():
+    """Get AI call latency histograms, tokens, errors and result sources by operation"""
+    return ai_metrics.get_stats()
+
+
+@router.get("/ai/events")
+async def get_ai_event_metrics():
+    """Get AI calls, tokens and latency totals of each recently active event"""
+    return ai_metrics.get_events_summary()
+
+
+@router.get("/ai/events/{event_id}")
+async def get_ai_event_metric(event_id: int):
+    """Get AI metrics by operation for one event"""
+    stats = ai_metrics.get_event_stats(event_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No AI metrics recorded for this event")
+    return stats
+
+
+@router.get("/enrichment")
+async def get_enrichment_metrics():
+    """Get deferred AI enrichment queue depth and lag"""
+    return enrichment_service.get_stats()
+
+
+@router.get("/gemini/scheduler")
+async def get_gemini_scheduler_metrics():
+    """Get Gemini scheduler queue depth, wait times by priority and quota usage"""
+    try:
+        return get_gemini_service().scheduler.get_stats()
+    except ValueError as e:
+        return {"status": "unconfigured", "error": str(e)}
+
+
+@router.get("/question-pool")
+async def get_question_pool_metrics():
+    """Get pre-generated question pool hit rate and refill latency"""
+    return question_pool_service.get_stats()
+
+
+@router.get("/responses")
+async def get_response_pipeline_metrics():
+    """Get per-stage latency (p50/p95/max) of response submission"""
+    return response_pipeline_metrics.get_stats()
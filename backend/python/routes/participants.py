@@ -12,7 +12,10 @@ from schemas import (
     CreateParticipantDto, ParticipantResponse,
     ParticipantStatsResponse, BadgeResponse, ParticipantBadgeResponse
 )
+from services.gamification_service import gamification_service
+from services.leaderboard import leaderboard_service
 from services.mock_apis import people_force_service
+from services.streak_service import streak_service
 
 router = APIRouter(prefix="/api/participants", tags=["Participants"])
 
@@ -52,7 +55,7 @@ async def join_event(
         email=participant_data.email,
         avatar_url=participant_data.avatar_url or (nybbler.avatar_url if nybbler else None),
         points=0,
-        streak=0,
+        streak=streak_service.streak_on_join(db, event, participant_data.user_id),
         responses_count=0,
         quality_score=0.0,
         sentiment_score=0.0,
@@ -63,10 +66,14 @@ async def join_event(
     db.commit()
     db.refresh(participant)
     
+    await gamification_service.update_rankings(db, participant)
+    
     # Ensure initial messages exist
     await _ensure_initial_messages(db, participant_data.event_id)
     
-    return ParticipantResponse.from_orm(participant)
+    response = ParticipantResponse.from_orm(participant)
+    response.rank_position = gamification_service.get_rank(db, participant)
+    return response
 
 
 async def _ensure_initial_messages(db: Session, event_id: int):
@@ -131,7 +138,9 @@ async def get_participant(
     if not participant:
         raise HTTPException(status_code=404, detail="Participant not found")
     
-    return ParticipantResponse.from_orm(participant)
+    response = ParticipantResponse.from_orm(participant)
+    response.rank_position = gamification_service.get_rank(db, participant)
+    return response
 
 
 @router.get("/{participant_id}/stats", response_model=ParticipantStatsResponse)
@@ -166,11 +175,12 @@ async def get_participant_stats(
             if badge_response not in all_badges:
                 all_badges.append(badge_response)
     
-    # Rank history (simplified - just current ranks)
+    # Rank history: current position in every event, computed in one window query
+    positions = gamification_service.get_positions(db, all_participations)
     rank_history = [
         {
             "event_id": p.event_id,
-            "rank": p.rank_position,
+            "rank": positions.get(p.id),
             "points": p.points
         }
         for p in all_participations
@@ -227,13 +237,21 @@ async def reset_participant_responses(
     # Reset participant stats
     participant.points = 0
     participant.responses_count = 0
+    participant.answered_questions_count = 0
+    participant.high_quality_responses_count = 0
+    participant.positive_responses_count = 0
     participant.quality_score = 0.0
     participant.sentiment_score = 0.0
+    # Cleared like every reset; incremental and full store the new position below, window never does
     participant.rank_position = None
     
     db.commit()
     db.refresh(participant)
     
+    # The in-memory board still believes the old position is stored: reload it from the database
+    leaderboard_service.invalidate(participant.event_id)
+    await gamification_service.update_rankings(db, participant)
+    
     return {
         "message": "Participant responses reset successfully",
         "participant_id": participant_id,
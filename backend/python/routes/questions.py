@@ -2,13 +2,19 @@
 Question-related API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
+import json
 from database import get_db
 from models import Question, Event
 from schemas import CreateQuestionDto, QuestionResponse, GenerateQuestionRequest, GenerateQuestionResponse
-from services.gemini_service import gemini_service
+from services.ai_metrics import set_event
+from services.gamification_service import gamification_service
+from services.gemini_service import fallback_question, get_gemini_service
+from services.question_pool import question_pool_service
+from services.response_analysis import OPTION_QUESTION_TYPES, analyze_question_options
 
 router = APIRouter(prefix="/api/questions", tags=["Questions"])
 
@@ -53,21 +59,36 @@ async def create_question(
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    set_event(event.id)
+    
+    # Score each fixed option once so answers never need a Gemini call
+    option_analysis = None
+    if question_data.question_type in OPTION_QUESTION_TYPES and question_data.options:
+        option_analysis = await analyze_question_options(
+            question_text=question_data.text,
+            options=question_data.options
+        )
+    
     question = Question(
         event_id=question_data.event_id,
         text=question_data.text,
         question_type=question_data.question_type,
         order=question_data.order,
         options=question_data.options,
+        option_analysis=option_analysis,
         is_ai_generated=question_data.is_ai_generated,
         ai_context=question_data.ai_context,
         asked_at=datetime.now()
     )
     
     db.add(question)
+    event.questions_count = Event.questions_count + 1
     db.commit()
     db.refresh(question)
     
+    # Pooled suggestions were generated without this question
+    question_pool_service.invalidate(question.event_id)
+    
     return QuestionResponse.from_orm(question)
 
 
@@ -76,22 +97,89 @@ async def generate_question_with_ai(
     request: GenerateQuestionRequest,
     db: Session = Depends(get_db)
 ):
-    """Generate a question using Gemini AI"""
+    """
+    Generate a question using Gemini AI
+    
+    Served from the event's pre-generated pool when possible; a repeated request
+    with the same inputs returns the cached question unless `force_fresh` is set.
+    """
     # Check if event exists
     event = db.query(Event).filter(Event.id == request.event_id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    set_event(event.id)
+    
+    pooled = question_pool_service.take(
+        event=event,
+        context=request.context,
+        previous_questions=request.previous_questions
+    )
+    if pooled:
+        return pooled
+    
+    try:
+        gemini_service = get_gemini_service()
+    except ValueError as e:
+        print(f"⚠️  Serving fallback question: {e}")
+        return fallback_question()
+    
     # Generate question with AI
     generated = await gemini_service.generate_question(
         context=request.context or event.title,
         previous_questions=request.previous_questions,
-        question_type="open"
+        question_type="open",
+        force_fresh=request.force_fresh
     )
     
     return generated
 
 
+@router.post("/generate/stream")
+async def generate_question_with_ai_stream(
+    request: GenerateQuestionRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate a fresh question using Gemini, streamed over Server-Sent Events
+    
+    Emits `token` events with raw model output as it arrives, then a single
+    `question` event carrying the validated GenerateQuestionResponse.
+    """
+    # Check if event exists
+    event = db.query(Event).filter(Event.id == request.event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    async def event_stream():
+        # The body is iterated after this handler returns, so attribute it here
+        set_event(event.id)
+        try:
+            gemini_service = get_gemini_service()
+        except ValueError as e:
+            print(f"⚠️  Serving fallback question: {e}")
+            yield f"event: question\ndata: {json.dumps(fallback_question().dict(), ensure_ascii=False)}\n\n"
+            return
+        stream = gemini_service.generate_question_stream(
+            context=request.context or event.title,
+            previous_questions=request.previous_questions,
+            question_type="open"
+        )
+        try:
+            async for kind, payload in stream:
+                data = {"text": payload} if kind == "token" else payload.dict()
+                yield f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        finally:
+            # A client that disconnects closes this generator; free Gemini's slots now, not at GC
+            await stream.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.delete("/{question_id}", status_code=204)
 async def delete_question(
     question_id: int,
@@ -103,8 +191,16 @@ async def delete_question(
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     
+    event_id = question.event_id
+    question.event.questions_count = Event.questions_count - 1
     db.delete(question)
+    db.flush()
+    
+    # The question's responses are deleted with it
+    gamification_service.refresh_all_participant_counters(db, event_id)
     db.commit()
+    
+    question_pool_service.invalidate(event_id)
 
 
 
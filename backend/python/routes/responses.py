@@ -2,16 +2,22 @@
 Response-related API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi import Response as HTTPResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
+from sqlalchemy import case, desc, func
+from typing import List, Tuple
 from datetime import datetime
-from database import get_db
+import asyncio
+from database import SessionLocal, get_db
 from models import Response, Question, Participant
 from schemas import CreateResponseDto, ResponseResponse
-from services.gemini_service import gemini_service
 from services.gamification_service import gamification_service
+from services.ai_metrics import set_event
+from services.badge_catalog import TRIGGER_POINTS_CHANGED, TRIGGER_RESPONSE_CREATED
+from services.enrichment_service import enrichment_service
+from services.response_analysis import analyze_response, has_precomputed_analysis
 from services.mock_apis import slack_service
+from services.stage_timing import StageTimer, response_pipeline_metrics
 
 router = APIRouter(prefix="/api/responses", tags=["Responses"])
 
@@ -60,112 +66,230 @@ async def get_response(
     return ResponseResponse(**response_dict)
 
 
+def _response_checks(question_id: int, participant_id: int) -> Tuple[bool, bool]:
+    """
+    Duplicate check and first-response check in a single query
+    
+    Runs in a worker thread with its own session so it can overlap AI scoring.
+    
+    Returns:
+        Tuple of (participant already responded, nobody has responded yet)
+    """
+    db = SessionLocal()
+    try:
+        total, own = db.query(
+            func.count(Response.id),
+            func.coalesce(func.sum(case((Response.participant_id == participant_id, 1), else_=0)), 0)
+        ).filter(Response.question_id == question_id).one()
+        return own > 0, total == 0
+    finally:
+        db.close()
+
+
 @router.post("", response_model=ResponseResponse, status_code=201)
 async def create_response(
     response_data: CreateResponseDto,
+    http_response: HTTPResponse,
     db: Session = Depends(get_db)
 ):
-    """Create a new response to a question"""
-    # Check if question exists
-    question = db.query(Question).filter(Question.id == response_data.question_id).first()
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
-    
-    # Check if participant exists
-    participant = db.query(Participant).filter(Participant.id == response_data.participant_id).first()
-    if not participant:
-        raise HTTPException(status_code=404, detail="Participant not found")
-    
-    # Check if participant already responded to this question
-    existing = db.query(Response).filter(
-        Response.question_id == response_data.question_id,
-        Response.participant_id == response_data.participant_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Participant already responded to this question")
-    
-    # Analyze sentiment with Gemini AI
-    sentiment_analysis = await gemini_service.analyze_sentiment(response_data.text)
-    
-    # Calculate quality score
-    quality_score = await gemini_service.calculate_quality_score(
-        text=response_data.text,
-        question_text=question.text
-    )
+    """
+    Create a new response to a question
     
-    # Check if this is the first response
-    is_first_response = db.query(Response).filter(
-        Response.question_id == response_data.question_id
-    ).count() == 0
+    The duplicate/first-response checks and AI scoring run concurrently; a
+    per-stage latency breakdown is returned in the Server-Timing header.
+    """
+    timer = StageTimer()
     
-    # Calculate points
-    points_awarded = gamification_service.calculate_response_points(
-        text=response_data.text,
-        is_quick_option=response_data.is_quick_option,
-        quality_score=quality_score,
-        sentiment=sentiment_analysis.sentiment,
-        response_time_seconds=None,
-        is_first_response=is_first_response
-    )
+    with timer.stage("validate"):
+        # Check if question exists
+        question = db.query(Question).filter(Question.id == response_data.question_id).first()
+        if not question:
+            raise HTTPException(status_code=404, detail="Question not found")
+        
+        # Check if participant exists
+        participant = db.query(Participant).filter(Participant.id == response_data.participant_id).first()
+        if not participant:
+            raise HTTPException(status_code=404, detail="Participant not found")
     
-    # Create response
-    response = Response(
-        question_id=response_data.question_id,
-        participant_id=response_data.participant_id,
+    # AI calls made for this answer (now or in the background) count toward its event
+    set_event(question.event_id)
+    
+    # Quick options and ratings are scored from precomputed values, so only
+    # free-text answers need deferring
+    precomputed = has_precomputed_analysis(
+        question=question,
         text=response_data.text,
         rating=response_data.rating,
-        sentiment=sentiment_analysis.sentiment,
-        sentiment_score=sentiment_analysis.score,
-        quality_score=quality_score,
-        is_quick_option=response_data.is_quick_option,
-        points_awarded=points_awarded
+        is_quick_option=response_data.is_quick_option
     )
+    deferred = enrichment_service.is_deferred and not precomputed
     
-    db.add(response)
-    db.commit()
-    db.refresh(response)
+    # Start AI scoring (Gemini for free text) alongside the database checks
+    analysis = None
+    if not deferred:
+        analysis = asyncio.create_task(timer.measure("analysis", analyze_response(
+            question=question,
+            text=response_data.text,
+            rating=response_data.rating,
+            is_quick_option=response_data.is_quick_option
+        )))
     
-    # Update participant points
-    await gamification_service.update_participant_points(
-        db=db,
-        participant=participant,
-        points=points_awarded
-    )
+    try:
+        already_responded, is_first_response = await timer.measure("checks", asyncio.to_thread(
+            _response_checks,
+            response_data.question_id,
+            response_data.participant_id
+        ))
+        if already_responded:
+            raise HTTPException(status_code=400, detail="Participant already responded to this question")
+    except BaseException:
+        if analysis is not None:
+            analysis.cancel()
+        raise
     
-    # Update participant stats
-    if sentiment_analysis.score != 0:
-        # Update running average of sentiment
-        total_responses = participant.responses_count
-        participant.sentiment_score = (
-            (participant.sentiment_score * (total_responses - 1)) + sentiment_analysis.score
-        ) / total_responses
+    if deferred:
+        result = await _create_response_deferred(db, response_data, participant, is_first_response, timer)
+        response_pipeline_metrics.record(timer)
+        http_response.headers["Server-Timing"] = timer.server_timing()
+        return result
+    
+    sentiment_analysis, quality_score = await analysis
+    
+    with timer.stage("persist"):
+        # Calculate points
+        points_awarded = gamification_service.calculate_response_points(
+            text=response_data.text,
+            is_quick_option=response_data.is_quick_option,
+            quality_score=quality_score,
+            sentiment=sentiment_analysis.sentiment,
+            response_time_seconds=None,
+            is_first_response=is_first_response
+        )
         
-        participant.quality_score = (
-            (participant.quality_score * (total_responses - 1)) + quality_score
-        ) / total_responses
-    
-    participant.last_activity_at = datetime.now()
-    db.commit()
-    
-    # Check and award badges
-    new_badges = await gamification_service.check_and_award_badges(
-        db=db,
-        participant=participant,
-        response=response
-    )
+        # Create response
+        response = Response(
+            question_id=response_data.question_id,
+            participant_id=response_data.participant_id,
+            text=response_data.text,
+            rating=response_data.rating,
+            sentiment=sentiment_analysis.sentiment,
+            sentiment_score=sentiment_analysis.score,
+            quality_score=quality_score,
+            is_quick_option=response_data.is_quick_option,
+            points_awarded=points_awarded
+        )
+        
+        db.add(response)
+        gamification_service.count_response(participant, response)
+        db.commit()
+        db.refresh(response)
+        
+        # Update participant points
+        await gamification_service.update_participant_points(
+            db=db,
+            participant=participant,
+            points=points_awarded
+        )
+        
+        # Update participant stats
+        if sentiment_analysis.score != 0:
+            # Update running average of sentiment
+            total_responses = participant.responses_count
+            participant.sentiment_score = (
+                (participant.sentiment_score * (total_responses - 1)) + sentiment_analysis.score
+            ) / total_responses
+            
+            participant.quality_score = (
+                (participant.quality_score * (total_responses - 1)) + quality_score
+            ) / total_responses
+        
+        participant.last_activity_at = datetime.now()
+        db.commit()
     
-    # If high quality response, notify on Slack (mock)
-    if quality_score >= 0.7 and len(response_data.text) > 50:
-        await slack_service.notify_new_response(
-            participant_name=participant.name,
-            response_text=response_data.text
+    with timer.stage("badges"):
+        # Check and award badges
+        new_badges = await gamification_service.check_and_award_badges(
+            db=db,
+            participant=participant,
+            response=response,
+            triggers=(TRIGGER_RESPONSE_CREATED, TRIGGER_POINTS_CHANGED)
         )
+        
+        # If high quality response, notify on Slack (mock)
+        if quality_score >= 0.7 and len(response_data.text) > 50:
+            await slack_service.notify_new_response(
+                participant_name=participant.name,
+                response_text=response_data.text
+            )
     
     # Prepare response
     response_dict = ResponseResponse.from_orm(response).dict()
     response_dict["participant_name"] = participant.name
     
+    response_pipeline_metrics.record(timer)
+    http_response.headers["Server-Timing"] = timer.server_timing()
+    
+    return ResponseResponse(**response_dict)
+
+
+async def _create_response_deferred(
+    db: Session,
+    response_data: CreateResponseDto,
+    participant: Participant,
+    is_first_response: bool,
+    timer: StageTimer
+) -> ResponseResponse:
+    """Store a response with provisional points and queue its AI enrichment"""
+    with timer.stage("persist"):
+        # Provisional points: no quality or sentiment bonus until the analysis arrives
+        points_awarded = gamification_service.calculate_response_points(
+            text=response_data.text,
+            is_quick_option=response_data.is_quick_option,
+            quality_score=0.0,
+            sentiment="neutral",
+            response_time_seconds=None,
+            is_first_response=is_first_response
+        )
+        
+        response = Response(
+            question_id=response_data.question_id,
+            participant_id=response_data.participant_id,
+            text=response_data.text,
+            rating=response_data.rating,
+            is_quick_option=response_data.is_quick_option,
+            points_awarded=points_awarded
+        )
+        
+        db.add(response)
+        gamification_service.count_response(participant, response)
+        db.commit()
+        db.refresh(response)
+        
+        participant.last_activity_at = datetime.now()
+        await gamification_service.update_participant_points(
+            db=db,
+            participant=participant,
+            points=points_awarded
+        )
+    
+    with timer.stage("badges"):
+        await gamification_service.check_and_award_badges(
+            db=db,
+            participant=participant,
+            response=response,
+            triggers=(TRIGGER_RESPONSE_CREATED, TRIGGER_POINTS_CHANGED)
+        )
+    
+    with timer.stage("enqueue"):
+        await enrichment_service.enqueue(
+            db=db,
+            response_id=response.id,
+            is_first_response=is_first_response
+        )
+    
+    response_dict = ResponseResponse.from_orm(response).dict()
+    response_dict["participant_name"] = participant.name
+    
     return ResponseResponse(**response_dict)
 
 
@@ -219,6 +219,7 @@ class SentimentAnalysisResponse(BaseModel):
     sentiment: str  # positive, negative, neutral
     score: float  # -1.0 to 1.0
     confidence: float  # 0.0 to 1.0
+    source: str = "gemini"  # gemini, classifier, fallback, option, rating
 
 
 class GenerateQuestionRequest(BaseModel):
@@ -226,6 +227,7 @@ class GenerateQuestionRequest(BaseModel):
     event_id: int
     context: str
     previous_questions: List[str] = []
+    force_fresh: bool = False  # Skip the question cache and always call Gemini
 
 
 class GenerateQuestionResponse(BaseModel):
@@ -249,6 +251,16 @@ class EventStatsResponse(BaseModel):
     top_participants: List[RankingResponse]
 
 
+class EventSummaryResponse(BaseModel):
+    """AI summary of an event's responses"""
+    event_id: int
+    status: str  # ready, generating, failed, no_responses, not_completed
+    summary: Optional[str] = None
+    response_count: Optional[int] = None
+    generated_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
 class ParticipantStatsResponse(BaseModel):
     """Participant statistics"""
     participant_id: int
@@ -133,6 +133,7 @@ async def seed_database():
             db.add(question)
             created_questions.append(question)
         
+        event.questions_count = len(created_questions)
         db.commit()
         print(f"     Created {len(questions_data)} questions")
         
@@ -0,0 +1,205 @@
+"""
+Per-operation and per-event instrumentation of AI calls
+
+GeminiService records every model call here: latency histograms, prompt and
+response tokens, error categories, and where each result came from (Gemini,
+cache, local classifier, question pool, fallback). Everything is labelled by
+operation ("sentiment", "question", ...) and, when the caller set one with
+set_event(), by event, so AI cost and latency can be attributed to a
+specific Tech Night.
+
+The current event lives in a ContextVar, so it follows a request into the
+tasks it creates without threading an argument through every call.
+"""
+import os
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Events the current work is attributed to. Usually one; a micro-batched
+# sentiment prompt carries the event of each text it contains.
+_current_events: ContextVar[Tuple[Optional[int], ...]] = ContextVar("ai_metrics_events", default=(None,))
+
+
+def set_event(event_id: Optional[int]):
+    """Attribute AI calls made from the current context (and tasks it creates) to an event"""
+    _current_events.set((event_id,))
+
+
+def set_events(event_ids: Tuple[Optional[int], ...]):
+    """Attribute a shared call to several events, weighted by how often each appears"""
+    _current_events.set(tuple(event_ids) or (None,))
+
+
+def current_event() -> Optional[int]:
+    """Event of the current context (the first one for a shared call)"""
+    return _current_events.get()[0]
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram (Prometheus style)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None above the last bound)"""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            seen += self.counts[index]
+            if seen >= target:
+                return bound
+        return None
+
+    def get_stats(self) -> dict:
+        buckets, cumulative = {}, 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += count
+            buckets[f"{bound:g}"] = cumulative
+        buckets["+Inf"] = self.count
+
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 3),
+            "avg_ms": round(self.sum / self.count * 1000, 1) if self.count else None,
+            "p50_le_ms": p50 * 1000 if p50 is not None else None,
+            "p95_le_ms": p95 * 1000 if p95 is not None else None,
+            "buckets": buckets,
+        }
+
+
+class OperationMetrics:
+    """Counters of one operation (optionally within one event)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors: Counter = Counter()
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.results: Counter = Counter()
+        self.latency = LatencyHistogram()
+
+    def get_stats(self) -> dict:
+        results = sum(self.results.values())
+        ai_results = self.results["gemini"]
+        return {
+            "calls": self.calls,
+            "errors": sum(self.errors.values()),
+            "errors_by_category": dict(self.errors),
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "results_by_source": dict(self.results),
+            "fallback_rate": round(self.results["fallback"] / results, 3) if results else None,
+            "cache_hit_rate": round(
+                self.results["cache"] / (self.results["cache"] + ai_results), 3
+            ) if self.results["cache"] + ai_results else None,
+            "latency": self.latency.get_stats(),
+        }
+
+
+class AIMetrics:
+    """Registry of AI call metrics by operation and by event"""
+
+    def __init__(self, max_events: int = 200):
+        self.max_events = max_events
+        self.started_at = time.time()
+        self.operations: Dict[str, OperationMetrics] = {}
+        # event_id -> operation -> metrics, least recently used event first
+        self.events: "OrderedDict[int, Dict[str, OperationMetrics]]" = OrderedDict()
+
+    def _targets(self, operation: str) -> list:
+        """(metrics, weight) for the operation overall and for each current event"""
+        targets = [(self.operations.setdefault(operation, OperationMetrics()), 1.0)]
+        events = _current_events.get()
+        for event_id, count in Counter(events).items():
+            if event_id is None:
+                continue
+            if event_id not in self.events:
+                self.events[event_id] = {}
+                while len(self.events) > self.max_events:
+                    self.events.popitem(last=False)
+            self.events.move_to_end(event_id)
+            targets.append((self.events[event_id].setdefault(operation, OperationMetrics()), count / len(events)))
+        return targets
+
+    def record_call(self, operation: str, latency_seconds: float):
+        """A model call (including retries and hedges) answered; a shared call counts for each of its events"""
+        for metrics, _ in self._targets(operation):
+            metrics.calls += 1
+            metrics.latency.observe(latency_seconds)
+
+    def record_error(self, operation: str, category: str):
+        """A model call failed (timeout, rate_limited, unavailable, circuit_open, parse, error)"""
+        for metrics, _ in self._targets(operation):
+            metrics.errors[category] += 1
+
+    def record_tokens(self, operation: str, prompt_tokens: int, response_tokens: int):
+        """Tokens of one model request; shared calls are split across their events"""
+        for metrics, weight in self._targets(operation):
+            metrics.prompt_tokens += round(prompt_tokens * weight)
+            metrics.response_tokens += round(response_tokens * weight)
+
+    def record_result(self, operation: str, source: str):
+        """Where a result handed to the caller came from (gemini, cache, classifier, pool, fallback...)"""
+        for metrics, _ in self._targets(operation):
+            metrics.results[source] += 1
+
+    def get_stats(self) -> dict:
+        """Metrics by operation, plus totals"""
+        operations = {name: metrics.get_stats() for name, metrics in self.operations.items()}
+        return {
+            "since": self.started_at,
+            "operations": operations,
+            "totals": self._totals(operations.values()),
+            "events_tracked": len(self.events),
+        }
+
+    def get_event_stats(self, event_id: int) -> Optional[dict]:
+        """Metrics of one event by operation, or None if nothing was recorded for it"""
+        event = self.events.get(event_id)
+        if event is None:
+            return None
+        operations = {name: metrics.get_stats() for name, metrics in event.items()}
+        return {"event_id": event_id, "operations": operations, "totals": self._totals(operations.values())}
+
+    def get_events_summary(self) -> list:
+        """Totals of every tracked event, most recently active first"""
+        summaries = []
+        for event_id in reversed(self.events):
+            stats = self.get_event_stats(event_id)
+            summaries.append({"event_id": event_id, **stats["totals"]})
+        return summaries
+
+    @staticmethod
+    def _totals(operations) -> dict:
+        totals = {"calls": 0, "errors": 0, "prompt_tokens": 0, "response_tokens": 0, "latency_seconds": 0.0}
+        for stats in operations:
+            totals["calls"] += stats["calls"]
+            totals["errors"] += stats["errors"]
+            totals["prompt_tokens"] += stats["prompt_tokens"]
+            totals["response_tokens"] += stats["response_tokens"]
+            totals["latency_seconds"] += stats["latency"]["sum_seconds"]
+        totals["latency_seconds"] = round(totals["latency_seconds"], 3)
+        return totals
+
+
+ai_metrics = AIMetrics(max_events=int(os.getenv("AI_METRICS_MAX_EVENTS", "200")))
@@ -0,0 +1,120 @@
+"""
+Badge catalog and trigger index for badge evaluation
+
+Badge definitions rarely change, so they are loaded once per process (missing
+definitions are created on first load) and kept in memory until invalidated,
+e.g. by `seed_badges`, or until BADGE_CATALOG_TTL_SECONDS pass so edits made
+by another process are eventually picked up.
+
+Each criterion type is indexed by the triggers that can change its outcome, so
+an evaluation only looks at the badges its trigger can affect: a points change
+never re-counts a participant's responses, and a streak is only checked when
+an event completes.
+"""
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from models import Badge
+
+
+TRIGGER_RESPONSE_CREATED = "response_created"
+TRIGGER_RESPONSE_ANALYZED = "response_analyzed"  # Deferred sentiment/quality arrived
+TRIGGER_POINTS_CHANGED = "points_changed"
+TRIGGER_EVENT_COMPLETED = "event_completed"
+
+# Criteria types each trigger can affect
+TRIGGER_CRITERIA = {
+    TRIGGER_RESPONSE_CREATED: (
+        "first_response", "fast_response", "long_response",
+        "quality_responses", "positive_sentiment", "completion_rate",
+    ),
+    TRIGGER_RESPONSE_ANALYZED: ("quality_responses", "positive_sentiment"),
+    TRIGGER_POINTS_CHANGED: ("total_points",),
+    TRIGGER_EVENT_COMPLETED: ("streak", "completion_rate"),
+}
+
+ALL_TRIGGERS = tuple(TRIGGER_CRITERIA)
+
+
+class BadgeCatalog:
+    """In-memory badge definitions indexed by trigger"""
+
+    def __init__(self):
+        self.ttl_seconds = float(os.getenv("BADGE_CATALOG_TTL_SECONDS", "300"))
+
+        self._badges: Dict[str, Badge] = {}
+        self._by_trigger: Dict[str, List[Badge]] = {}
+        self._loaded_at: Optional[float] = None
+
+        # Metrics
+        self.loads = 0
+        self.invalidations = 0
+
+    def _is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return self.ttl_seconds <= 0 or time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def load(self, db: Session, definitions: List[dict]):
+        """
+        Load every badge, creating missing definitions, and rebuild the trigger index
+
+        Args:
+            db: Database session
+            definitions: Badge definitions that must exist
+        """
+        badges = db.query(Badge).all()
+        existing = {badge.name for badge in badges}
+        missing = [Badge(**definition) for definition in definitions if definition["name"] not in existing]
+        if missing:
+            db.add_all(missing)
+            db.commit()
+            badges = db.query(Badge).all()
+
+        # Detached copies: the catalog outlives the session that loaded it
+        for badge in badges:
+            db.expunge(badge)
+
+        self._badges = {badge.name: badge for badge in badges}
+        self._by_trigger = {
+            trigger: [badge for badge in badges if badge.criteria_type in criteria]
+            for trigger, criteria in TRIGGER_CRITERIA.items()
+        }
+        self._loaded_at = time.monotonic()
+        self.loads += 1
+
+    def ensure_loaded(self, db: Session, definitions: List[dict]):
+        if not self._is_fresh():
+            self.load(db, definitions)
+
+    def invalidate(self):
+        """Drop the catalog; it is reloaded on next use"""
+        self._loaded_at = None
+        self.invalidations += 1
+
+    def get(self, name: str) -> Optional[Badge]:
+        return self._badges.get(name)
+
+    def for_triggers(self, triggers: Iterable[str]) -> List[Badge]:
+        """Badges whose criteria any of the triggers can affect (each once)"""
+        seen, badges = set(), []
+        for trigger in triggers:
+            for badge in self._by_trigger.get(trigger, ()):
+                if badge.id not in seen:
+                    seen.add(badge.id)
+                    badges.append(badge)
+        return badges
+
+    def get_stats(self) -> dict:
+        return {
+            "badges": len(self._badges),
+            "ttl_seconds": self.ttl_seconds,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "rules_by_trigger": {trigger: len(badges) for trigger, badges in self._by_trigger.items()},
+        }
+
+
+# Singleton instance
+badge_catalog = BadgeCatalog()
@@ -0,0 +1,168 @@
+"""
+Circuit breaker with latency-derived timeouts for outbound AI calls
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited because the breaker is open"""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker
+
+    - closed: calls go through; after `failure_threshold` consecutive failures
+      the breaker trips to open
+    - open: calls are rejected immediately until `reset_seconds` have passed
+    - half_open: up to `half_open_max_calls` probe calls are let through; a
+      success closes the breaker, a failure re-opens it. A probe that ends
+      without either (e.g. it was cancelled) must call `release_probe`
+
+    Each call gets a deadline of `timeout_multiplier` x the observed p95
+    latency of its operation, clamped to [min_timeout, max_timeout].
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    MIN_SAMPLES_FOR_TIMEOUT = 10
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        min_timeout: float = 2.0,
+        max_timeout: float = 20.0,
+        timeout_multiplier: float = 3.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self.consecutive_failures = 0
+        self.latency: Dict[str, LatencyTracker] = {}
+
+        # Metrics
+        self.trips = 0
+        self.short_circuited = 0
+        self.failures_by_reason: Dict[str, int] = {}
+        self.last_failure: Optional[str] = None
+        self.last_state_change = time.time()
+
+    @property
+    def state(self) -> str:
+        """Current state (open turns into half_open once the cooldown has passed)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._half_open_in_flight = 0
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected outright"""
+        return self.state == self.OPEN
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed, reserving a probe slot when half-open"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+            self._half_open_in_flight += 1
+            return True
+
+        self.short_circuited += 1
+        return False
+
+    def release_probe(self):
+        """Free a probe slot whose call ended without an outcome (cancelled, retried)"""
+        if self._state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def timeout_for(self, operation: str) -> float:
+        """Per-call deadline derived from the operation's observed p95 latency"""
+        tracker = self.latency.get(operation)
+        if tracker is None or len(tracker.samples) < self.MIN_SAMPLES_FOR_TIMEOUT:
+            return self.max_timeout
+        p95 = tracker.percentile(95)
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_multiplier))
+
+    def record_success(self, operation: str, latency_seconds: float):
+        """Record a successful call"""
+        self.latency.setdefault(operation, LatencyTracker()).add(latency_seconds)
+        self.consecutive_failures = 0
+        if self._state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._transition(self.CLOSED)
+
+    def record_failure(self, reason: str):
+        """Record a failed call (timeout, rate limit, error...)"""
+        self.failures_by_reason[reason] = self.failures_by_reason.get(reason, 0) + 1
+        self.last_failure = reason
+        self.consecutive_failures += 1
+
+        if self._state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            self._trip()
+        elif self._state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._trip()
+
+    def _trip(self):
+        self.trips += 1
+        self._opened_at = time.monotonic()
+        self._transition(self.OPEN)
+        print(f"🔌 Gemini circuit breaker OPEN after {self.consecutive_failures} failures "
+              f"(last: {self.last_failure}); using fallback for {self.reset_seconds:g}s")
+
+    def _transition(self, state: str):
+        if state != self._state:
+            self._state = state
+            self.last_state_change = time.time()
+            if state == self.CLOSED:
+                print("🔌 Gemini circuit breaker CLOSED")
+
+    def get_stats(self) -> dict:
+        """Get breaker state, trip counts and current deadlines"""
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "consecutive_failures": self.consecutive_failures,
+            "short_circuited": self.short_circuited,
+            "failures_by_reason": dict(self.failures_by_reason),
+            "last_failure": self.last_failure,
+            "last_state_change": self.last_state_change,
+            "timeouts_seconds": {
+                operation: round(self.timeout_for(operation), 3) for operation in self.latency
+            },
+            "p95_latency_seconds": {
+                operation: round(tracker.percentile(95), 3) for operation, tracker in self.latency.items()
+            },
+        }
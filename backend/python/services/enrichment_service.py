@@ -0,0 +1,315 @@
+"""
+Enrichment Service for deferred AI analysis of responses
+
+In deferred mode (AI_ENRICHMENT_MODE=deferred) responses are stored right away
+with provisional points and a job is queued here. Background workers then run
+sentiment and quality scoring and re-apply points and badges once the analysis
+arrives.
+"""
+import asyncio
+import itertools
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import EnrichmentJob, Response
+from services.ai_metrics import set_event
+from services.badge_catalog import TRIGGER_POINTS_CHANGED, TRIGGER_RESPONSE_ANALYZED
+from services.gamification_service import gamification_service
+from services.response_analysis import analyze_response
+from services.mock_apis import slack_service
+
+
+class EnrichmentService:
+    """In-process asyncio job queue with an optional Postgres-backed durable queue"""
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self):
+        self.mode = os.getenv("AI_ENRICHMENT_MODE", "inline")  # inline, deferred
+        self.backend = os.getenv("ENRICHMENT_QUEUE_BACKEND", "memory")  # memory, postgres
+        self.worker_count = int(os.getenv("AI_ENRICHMENT_WORKERS", "2"))
+        self.poll_interval = float(os.getenv("ENRICHMENT_POLL_INTERVAL", "1.0"))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers = []
+        self._job_ids = itertools.count(1)
+        self._pending_since = {}  # in-memory job id -> enqueue time
+
+        # Metrics
+        self.enqueued_total = 0
+        self.processed_total = 0
+        self.retried_total = 0
+        self.failed_total = 0
+        self.last_lag_seconds: Optional[float] = None
+        self.max_lag_seconds = 0.0
+        self._lag_sum = 0.0
+
+    @property
+    def is_deferred(self) -> bool:
+        """Whether responses should be acknowledged before AI analysis"""
+        return self.mode == "deferred"
+
+    async def start(self):
+        """Start background workers (no-op in inline mode)"""
+        if not self.is_deferred or self._workers:
+            return
+
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+
+        if self.backend == "postgres":
+            self._requeue_stale_jobs()
+
+        for worker_id in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._worker_loop(worker_id)))
+
+        print(f"✅ Enrichment workers started ({self.worker_count} workers, {self.backend} queue)")
+
+    async def stop(self):
+        """Cancel background workers"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(self, db: Session, response_id: int, is_first_response: bool):
+        """
+        Queue a response for AI enrichment
+
+        Args:
+            db: Database session (used by the Postgres queue)
+            response_id: Response to enrich
+            is_first_response: Whether it was the first answer to its question
+        """
+        if not self._workers:
+            await self.start()
+
+        self.enqueued_total += 1
+
+        if self.backend == "postgres":
+            db.add(EnrichmentJob(response_id=response_id, is_first_response=is_first_response))
+            db.commit()
+            self._wakeup.set()
+            return
+
+        job_id = next(self._job_ids)
+        enqueued_at = time.time()
+        self._pending_since[job_id] = enqueued_at
+        self._queue.put_nowait({
+            "id": job_id,
+            "response_id": response_id,
+            "is_first_response": is_first_response,
+            "enqueued_at": enqueued_at,
+            "attempts": 1,
+        })
+
+    async def enrich_response(self, db: Session, response_id: int, is_first_response: bool):
+        """
+        Run AI analysis for a stored response and re-apply points and badges
+
+        Args:
+            db: Database session
+            response_id: Response to enrich
+            is_first_response: Whether it was the first answer to its question
+        """
+        response = db.query(Response).filter(Response.id == response_id).first()
+        if not response:
+            return  # Deleted (e.g. participant reset) before we got to it
+
+        participant = response.participant
+        set_event(response.question.event_id)
+
+        sentiment_analysis, quality_score = await analyze_response(
+            question=response.question,
+            text=response.text,
+            rating=response.rating,
+            is_quick_option=response.is_quick_option
+        )
+
+        points_awarded = gamification_service.calculate_response_points(
+            text=response.text,
+            is_quick_option=response.is_quick_option,
+            quality_score=quality_score,
+            sentiment=sentiment_analysis.sentiment,
+            response_time_seconds=response.response_time_seconds,
+            is_first_response=is_first_response
+        )
+        points_delta = points_awarded - response.points_awarded
+
+        previous_analysis = (response.quality_score, response.sentiment)
+        response.sentiment = sentiment_analysis.sentiment
+        response.sentiment_score = sentiment_analysis.score
+        response.quality_score = quality_score
+        response.points_awarded = points_awarded
+        gamification_service.count_response(participant, response, previous=previous_analysis)
+        db.flush()
+
+        gamification_service.refresh_participant_scores(db, participant)
+        await gamification_service.adjust_participant_points(
+            db=db,
+            participant=participant,
+            delta=points_delta
+        )
+
+        await gamification_service.check_and_award_badges(
+            db=db,
+            participant=participant,
+            response=response,
+            triggers=(TRIGGER_RESPONSE_ANALYZED, TRIGGER_POINTS_CHANGED)
+        )
+
+        if quality_score >= 0.7 and len(response.text) > 50:
+            await slack_service.notify_new_response(
+                participant_name=participant.name,
+                response_text=response.text
+            )
+
+    async def _worker_loop(self, worker_id: int):
+        """Pull jobs off the queue forever"""
+        while True:
+            if self.backend == "postgres":
+                self._wakeup.clear()
+                job = self._claim_job()
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+            else:
+                job = await self._queue.get()
+                self._pending_since.pop(job["id"], None)
+
+            await self._process(job)
+
+    async def _process(self, job: dict):
+        """Enrich one job and record the outcome"""
+        db = SessionLocal()
+        try:
+            await self.enrich_response(db, job["response_id"], job["is_first_response"])
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Enrichment failed for response {job['response_id']} (attempt {job['attempts']}): {e}")
+            self._record_failure(db, job, e)
+        else:
+            self._record_success(db, job)
+        finally:
+            db.close()
+
+    def _record_success(self, db: Session, job: dict):
+        lag = time.time() - job["enqueued_at"]
+        self.processed_total += 1
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        self._lag_sum += lag
+
+        if self.backend == "postgres":
+            db.query(EnrichmentJob).filter(EnrichmentJob.id == job["id"]).delete()
+            db.commit()
+
+    def _record_failure(self, db: Session, job: dict, error: Exception):
+        retry = job["attempts"] < self.MAX_ATTEMPTS
+        if retry:
+            self.retried_total += 1
+        else:
+            self.failed_total += 1
+
+        if self.backend == "postgres":
+            db.query(EnrichmentJob).filter(EnrichmentJob.id == job["id"]).update({
+                "status": "pending" if retry else "failed",
+                "last_error": str(error)[:1000],
+            })
+            db.commit()
+        elif retry:
+            job["attempts"] += 1
+            self._pending_since[job["id"]] = job["enqueued_at"]
+            self._queue.put_nowait(job)
+
+    def _claim_job(self) -> Optional[dict]:
+        """Lock and mark the oldest pending job as running (Postgres queue)"""
+        db = SessionLocal()
+        try:
+            job = db.query(EnrichmentJob).filter(
+                EnrichmentJob.status == 'pending'
+            ).order_by(EnrichmentJob.id).with_for_update(skip_locked=True).first()
+
+            if not job:
+                db.rollback()
+                return None
+
+            job.status = 'running'
+            job.attempts += 1
+            job.started_at = func.now()
+            db.commit()
+
+            return {
+                "id": job.id,
+                "response_id": job.response_id,
+                "is_first_response": job.is_first_response,
+                "enqueued_at": job.enqueued_at.timestamp(),
+                "attempts": job.attempts,
+            }
+        finally:
+            db.close()
+
+    def _requeue_stale_jobs(self):
+        """Return jobs left 'running' by a crashed process to the queue"""
+        db = SessionLocal()
+        try:
+            requeued = db.query(EnrichmentJob).filter(
+                EnrichmentJob.status == 'running'
+            ).update({"status": "pending"})
+            db.commit()
+            if requeued:
+                print(f"🔄 Requeued {requeued} interrupted enrichment jobs")
+        finally:
+            db.close()
+
+    def get_stats(self) -> dict:
+        """
+        Get queue depth and lag metrics
+
+        Returns:
+            Dict with queue depth, oldest pending lag and processing counters
+        """
+        queue_depth = 0
+        oldest_pending_lag = None
+
+        if self.backend == "postgres" and SessionLocal is not None:
+            db = SessionLocal()
+            try:
+                queue_depth, oldest = db.query(
+                    func.count(EnrichmentJob.id),
+                    func.min(EnrichmentJob.enqueued_at)
+                ).filter(EnrichmentJob.status == 'pending').one()
+                if oldest:
+                    oldest_pending_lag = (datetime.now(timezone.utc) - oldest).total_seconds()
+            finally:
+                db.close()
+        elif self._pending_since:
+            queue_depth = len(self._pending_since)
+            oldest_pending_lag = time.time() - min(self._pending_since.values())
+
+        return {
+            "mode": self.mode,
+            "backend": self.backend,
+            "workers": len(self._workers),
+            "queue_depth": queue_depth,
+            "oldest_pending_lag_seconds": oldest_pending_lag,
+            "enqueued_total": self.enqueued_total,
+            "processed_total": self.processed_total,
+            "retried_total": self.retried_total,
+            "failed_total": self.failed_total,
+            "last_lag_seconds": self.last_lag_seconds,
+            "avg_lag_seconds": self._lag_sum / self.processed_total if self.processed_total else None,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+
+# Singleton instance
+enrichment_service = EnrichmentService()
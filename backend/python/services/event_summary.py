@@ -0,0 +1,222 @@
+"""
+Event Summary Service for AI summaries of completed events
+
+Completing an event schedules a background job that summarizes every response
+of the event map-reduce style: responses are split into chunks that fit the
+prompt budget (EVENT_SUMMARY_CHUNK_TOKENS), the chunks are summarized in
+parallel at background priority (so the shared scheduler keeps them inside the
+Gemini rate budget), and the chunk summaries are merged into one event summary.
+The result is stored on the event once and served from there afterwards.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from database import SessionLocal
+from models import Event, Question, Response
+from services.ai_metrics import set_event
+from services.gemini_service import PRIORITY_BACKGROUND, get_gemini_service
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for prompt budgets (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def chunk_responses(rows: List[Tuple[str, str]], max_tokens: int) -> List[str]:
+    """
+    Pack (question, answer line) rows into prompt-sized chunks
+
+    Answers are grouped under their question; a question split across chunks is
+    repeated at the top of the next one so every chunk stands on its own.
+
+    Args:
+        rows: (question text, answer line) pairs, ordered by question
+        max_tokens: Token budget of one chunk
+
+    Returns:
+        Chunk texts
+    """
+    chunks, lines, size, current_question = [], [], 0, None
+    for question, line in rows:
+        header = f"Pregunta: {question}"
+        cost = estimate_tokens(line) + (estimate_tokens(header) if question != current_question else 0)
+        if lines and size + cost > max_tokens:
+            chunks.append("\n".join(lines))
+            lines, size, current_question = [], 0, None
+            cost = estimate_tokens(line) + estimate_tokens(header)
+        if question != current_question:
+            lines.append(header)
+            current_question = question
+        lines.append(line)
+        size += cost
+    if lines:
+        chunks.append("\n".join(lines))
+    return chunks
+
+
+def group_summaries(summaries: List[str], max_tokens: int) -> List[List[str]]:
+    """Split summaries into groups that each fit one merge prompt (at least two per group)"""
+    groups, group, size = [], [], 0
+    for summary in summaries:
+        cost = estimate_tokens(summary)
+        if len(group) >= 2 and size + cost > max_tokens:
+            groups.append(group)
+            group, size = [], 0
+        group.append(summary)
+        size += cost
+    if group:
+        groups.append(group)
+    return groups
+
+
+class EventSummaryService:
+    """Background map-reduce summaries of completed events"""
+
+    def __init__(self):
+        self.chunk_tokens = int(os.getenv("EVENT_SUMMARY_CHUNK_TOKENS", "8000"))
+
+        self._running: Dict[int, asyncio.Task] = {}
+        self._failed: Dict[int, str] = {}
+
+        # Metrics
+        self.generated = 0
+        self.failures = 0
+        self.chunks_summarized = 0
+        self.merges = 0
+        self.last_seconds: Optional[float] = None
+        self.max_seconds = 0.0
+
+    def schedule(self, event_id: int) -> bool:
+        """
+        Start summarizing an event in the background unless it is already running
+
+        Args:
+            event_id: Completed event to summarize
+
+        Returns:
+            Whether a job is running for the event
+        """
+        if event_id in self._running:
+            return True
+        try:
+            task = asyncio.get_running_loop().create_task(self._generate(event_id))
+        except RuntimeError:
+            return False  # No running loop (e.g. called from a script)
+        self._failed.pop(event_id, None)
+        self._running[event_id] = task
+        task.add_done_callback(lambda _: self._running.pop(event_id, None))
+        return True
+
+    def status(self, event_id: int) -> Optional[str]:
+        """In-process job state of an event: "running", "failed" or None"""
+        if event_id in self._running:
+            return "running"
+        if event_id in self._failed:
+            return "failed"
+        return None
+
+    def last_error(self, event_id: int) -> Optional[str]:
+        return self._failed.get(event_id)
+
+    async def stop(self):
+        """Cancel summaries in progress (they are rescheduled when requested again)"""
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running = {}
+
+    async def _generate(self, event_id: int):
+        """Summarize an event's responses and store the result on the event"""
+        set_event(event_id)
+        start = time.perf_counter()
+        try:
+            title, rows = await asyncio.to_thread(self._load_responses, event_id)
+            if not rows:
+                return
+
+            chunks = chunk_responses(rows, self.chunk_tokens)
+            print(f"📝 Summarizing event {event_id}: {len(rows)} responses in {len(chunks)} chunks")
+            gemini_service = get_gemini_service()
+            summaries = await asyncio.gather(*(
+                gemini_service.summarize_responses(title, chunk, priority=PRIORITY_BACKGROUND)
+                for chunk in chunks
+            ))
+            self.chunks_summarized += len(chunks)
+
+            # Merge until one summary is left, in parallel groups if they don't fit one prompt
+            while len(summaries) > 1:
+                groups = group_summaries(summaries, self.chunk_tokens)
+                summaries = await asyncio.gather(*(
+                    gemini_service.merge_summaries(title, group, priority=PRIORITY_BACKGROUND)
+                    for group in groups
+                ))
+                self.merges += len(groups)
+
+            await asyncio.to_thread(self._store, event_id, summaries[0], len(rows))
+            self.generated += 1
+            print(f"✅ Event {event_id} summary stored")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            self._failed[event_id] = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Event {event_id} summary failed: {type(e).__name__}: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.last_seconds = elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    @staticmethod
+    def _load_responses(event_id: int) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        """Event title and (question, answer line) rows of all its responses"""
+        db = SessionLocal()
+        try:
+            event = db.query(Event).filter(Event.id == event_id).first()
+            if not event:
+                return None, []
+            rows = db.query(
+                Question.text, Response.text, Response.rating, Response.sentiment
+            ).join(Response, Response.question_id == Question.id).filter(
+                Question.event_id == event_id
+            ).order_by(Question.order, Question.id, Response.id).all()
+
+            lines = []
+            for question_text, text, rating, sentiment in rows:
+                answer = f"{rating}/5" if rating is not None else " ".join(text.split())
+                lines.append((question_text, f"- [{sentiment or 'sin analizar'}] {answer}"))
+            return event.title, lines
+        finally:
+            db.close()
+
+    @staticmethod
+    def _store(event_id: int, summary: str, response_count: int):
+        db = SessionLocal()
+        try:
+            event = db.query(Event).filter(Event.id == event_id).first()
+            if event:
+                event.ai_summary = summary
+                event.ai_summary_response_count = response_count
+                event.ai_summary_generated_at = datetime.now(timezone.utc)
+                db.commit()
+        finally:
+            db.close()
+
+    def get_stats(self) -> dict:
+        """Get summary job counters"""
+        return {
+            "chunk_tokens": self.chunk_tokens,
+            "running": len(self._running),
+            "generated": self.generated,
+            "failures": self.failures,
+            "chunks_summarized": self.chunks_summarized,
+            "merges": self.merges,
+            "last_seconds": round(self.last_seconds, 3) if self.last_seconds is not None else None,
+            "max_seconds": round(self.max_seconds, 3),
+        }
+
+
+# Singleton instance
+event_summary_service = EventSummaryService()
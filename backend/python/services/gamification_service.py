@@ -1,16 +1,36 @@
 """
 Gamification Service for points, badges, and rankings
 """
+import os
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
-from models import Participant, Badge, ParticipantBadge, Response
+from sqlalchemy import desc, func, insert, select, update
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import Event, Participant, Badge, ParticipantBadge, Question, Response
 from schemas import BadgeResponse, ParticipantBadgeResponse
+from services.badge_catalog import ALL_TRIGGERS, TRIGGER_EVENT_COMPLETED, badge_catalog
+from services.leaderboard import EventLeaderboard, leaderboard_service
 
 
 class GamificationService:
     """Service for gamification logic"""
     
+    # How participants with equal points are positioned (SQL window function)
+    TIE_FUNCTIONS = {
+        "row_number": func.row_number,  # 1, 2, 3, 4: distinct positions, earlier joiner first
+        "rank": func.rank,              # 1, 2, 2, 4
+        "dense": func.dense_rank,       # 1, 2, 2, 3
+    }
+    
+    def __init__(self):
+        # incremental: in-memory leaderboards, rank_position written in batches
+        # full: re-rank the whole event in the database on every change
+        # window: never store positions; compute them with window functions on read
+        self.ranking_strategy = os.getenv("RANKING_STRATEGY", "incremental")
+        # Applies to every strategy, so stored, in-memory and on-read positions agree
+        self.ranking_ties = os.getenv("RANKING_TIES", "row_number")
+        if self.ranking_ties not in self.TIE_FUNCTIONS:
+            raise ValueError(f"RANKING_TIES must be one of: {', '.join(self.TIE_FUNCTIONS)}")
+    
     # Points configuration
     POINTS_CONFIG = {
         "quick_option": 10,
@@ -23,6 +43,9 @@ class GamificationService:
         "rating_response": 10,
     }
     
+    # Quality score at which a response counts towards quality_responses badges
+    HIGH_QUALITY_THRESHOLD = 0.7
+    
     # Badge criteria
     BADGE_DEFINITIONS = [
         {
@@ -170,17 +193,305 @@ class GamificationService:
         participant.points += points
         participant.responses_count += 1
         
-        # Recalculate ranking for this event
-        await self.recalculate_rankings(db, participant.event_id)
+        db.commit()
+        db.refresh(participant)
+        
+        await self.update_rankings(db, participant)
+        
+        return participant
+    
+    async def adjust_participant_points(
+        self,
+        db: Session,
+        participant: Participant,
+        delta: int
+    ) -> Participant:
+        """
+        Apply a points correction without counting a new response
+        
+        Used when deferred AI enrichment replaces provisional points.
+        
+        Args:
+            db: Database session
+            participant: Participant to update
+            delta: Points to add (may be negative)
+            
+        Returns:
+            Updated participant
+        """
+        if delta:
+            participant.points += delta
         
         db.commit()
         db.refresh(participant)
         
+        if delta:
+            await self.update_rankings(db, participant)
+        
         return participant
     
+    def count_response(
+        self,
+        participant: Participant,
+        response: Response,
+        previous: Optional[Tuple[Optional[float], Optional[str]]] = None
+    ):
+        """
+        Keep a participant's badge counters in step with a new or re-analyzed response
+        
+        Call it before committing the response so both land in the same transaction.
+        
+        Args:
+            participant: Participant who answered (not committed)
+            response: The response with its current quality score and sentiment
+            previous: (quality_score, sentiment) the response was counted with before,
+                      when its analysis changes; None for a new response
+        """
+        old_quality, old_sentiment = previous or (None, None)
+        deltas = {
+            "answered_questions_count": 1 if previous is None else 0,
+            "high_quality_responses_count": self._is_high_quality(response.quality_score) - self._is_high_quality(old_quality),
+            "positive_responses_count": (response.sentiment == "positive") - (old_sentiment == "positive"),
+        }
+        # Increment in SQL (col = col + n) so concurrent enrichment workers don't lose updates
+        for column, delta in deltas.items():
+            if delta:
+                setattr(participant, column, getattr(Participant, column) + delta)
+    
+    def _is_high_quality(self, quality_score: Optional[float]) -> bool:
+        return quality_score is not None and quality_score >= self.HIGH_QUALITY_THRESHOLD
+    
+    def _counter_expressions(self) -> Dict[str, object]:
+        """Participant counters recomputed from the responses table (correlated subqueries)"""
+        own = Response.participant_id == Participant.id
+        return {
+            "answered_questions_count": select(
+                func.count(func.distinct(Response.question_id))
+            ).where(own).scalar_subquery(),
+            "high_quality_responses_count": select(func.count(Response.id)).where(
+                own, Response.quality_score >= self.HIGH_QUALITY_THRESHOLD
+            ).scalar_subquery(),
+            "positive_responses_count": select(func.count(Response.id)).where(
+                own, Response.sentiment == "positive"
+            ).scalar_subquery(),
+        }
+    
+    def refresh_all_participant_counters(self, db: Session, event_id: Optional[int] = None) -> int:
+        """
+        Recompute badge counters for many participants in one UPDATE
+        
+        Args:
+            db: Database session (not committed)
+            event_id: Only participants of this event (None = all participants)
+            
+        Returns:
+            Number of participants updated
+        """
+        statement = update(Participant).values(**self._counter_expressions())
+        if event_id is not None:
+            statement = statement.where(Participant.event_id == event_id)
+        
+        return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+    
+    def refresh_event_question_counts(self, db: Session, event_id: Optional[int] = None) -> int:
+        """
+        Recompute events' question counts in one UPDATE
+        
+        Args:
+            db: Database session (not committed)
+            event_id: Only this event (None = all events)
+            
+        Returns:
+            Number of events updated
+        """
+        statement = update(Event).values(questions_count=self._question_count_expression())
+        if event_id is not None:
+            statement = statement.where(Event.id == event_id)
+        
+        return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+    
+    @staticmethod
+    def _question_count_expression():
+        return select(func.count(Question.id)).where(Question.event_id == Event.id).scalar_subquery()
+    
+    def find_counter_drift(self, db: Session, event_id: Optional[int] = None) -> List[dict]:
+        """
+        Compare stored counters with the source tables
+        
+        Args:
+            db: Database session
+            event_id: Only this event (None = all events)
+            
+        Returns:
+            One dict per participant or event whose counters differ:
+            {"table", "id", "column", "stored", "actual"}
+        """
+        drift = []
+        
+        expected = self._counter_expressions()
+        columns = list(expected)
+        query = select(Participant.id, *(getattr(Participant, c) for c in columns), *expected.values())
+        if event_id is not None:
+            query = query.where(Participant.event_id == event_id)
+        for row in db.execute(query):
+            stored, actual = row[1:1 + len(columns)], row[1 + len(columns):]
+            drift.extend(
+                {"table": "participants", "id": row[0], "column": column, "stored": s, "actual": a}
+                for column, s, a in zip(columns, stored, actual)
+                if s != a
+            )
+        
+        query = select(Event.id, Event.questions_count, self._question_count_expression())
+        if event_id is not None:
+            query = query.where(Event.id == event_id)
+        drift.extend(
+            {"table": "events", "id": eid, "column": "questions_count", "stored": stored, "actual": actual}
+            for eid, stored, actual in db.execute(query)
+            if stored != actual
+        )
+        
+        return drift
+    
+    def refresh_participant_scores(self, db: Session, participant: Participant):
+        """
+        Recompute participant quality/sentiment averages from analyzed responses
+        
+        Args:
+            db: Database session
+            participant: Participant to update (not committed)
+        """
+        avg_quality, avg_sentiment = db.query(
+            func.avg(Response.quality_score),
+            func.avg(Response.sentiment_score)
+        ).filter(
+            Response.participant_id == participant.id,
+            Response.sentiment.isnot(None)
+        ).one()
+        
+        participant.quality_score = float(avg_quality or 0.0)
+        participant.sentiment_score = float(avg_sentiment or 0.0)
+    
+    def refresh_all_participant_scores(self, db: Session, event_id: Optional[int] = None) -> int:
+        """
+        Recompute quality/sentiment averages for many participants in one UPDATE
+        
+        Same averages as refresh_participant_scores, as correlated subqueries.
+        
+        Args:
+            db: Database session (not committed)
+            event_id: Only participants of this event (None = all participants)
+            
+        Returns:
+            Number of participants updated
+        """
+        analyzed = (Response.participant_id == Participant.id) & Response.sentiment.isnot(None)
+        avg_quality = select(func.avg(Response.quality_score)).where(analyzed).scalar_subquery()
+        avg_sentiment = select(func.avg(Response.sentiment_score)).where(analyzed).scalar_subquery()
+    
+        statement = update(Participant).values(
+            quality_score=func.coalesce(avg_quality, 0.0),
+            sentiment_score=func.coalesce(avg_sentiment, 0.0)
+        )
+        if event_id is not None:
+            statement = statement.where(Participant.event_id == event_id)
+    
+        return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+    
+    async def update_rankings(self, db: Session, participant: Participant):
+        """
+        Re-rank an event after a participant's points changed or they joined
+        
+        Args:
+            db: Database session
+            participant: Participant with committed points
+        """
+        if self.ranking_strategy == "full":
+            await self.recalculate_rankings(db, participant.event_id)
+        elif self.ranking_strategy == "incremental":
+            leaderboard_service.update(db, participant)
+        # window: positions are computed on read
+    
+    def get_rank(self, db: Session, participant: Participant) -> Optional[int]:
+        """Current position of a participant in their event"""
+        if self.ranking_strategy == "full":
+            return participant.rank_position
+        if self.ranking_strategy == "window":
+            return self.get_positions(db, [participant]).get(participant.id)
+        return leaderboard_service.rank(db, participant)
+    
+    def _position_column(self, ties: Optional[str] = None):
+        """Window function numbering participants within their event"""
+        ties = ties or self.ranking_ties
+        order_by = [desc(Participant.points)]
+        if ties == "row_number":
+            order_by.append(Participant.id)
+        return self.TIE_FUNCTIONS[ties]().over(
+            partition_by=Participant.event_id,
+            order_by=order_by
+        ).label("position")
+    
+    def get_leaderboard(
+        self,
+        db: Session,
+        event_id: int,
+        limit: int = 10,
+        offset: int = 0,
+        ties: Optional[str] = None
+    ) -> List[Tuple[int, Participant]]:
+        """
+        A page of an event's leaderboard with positions computed on read
+        
+        Args:
+            db: Database session
+            event_id: Event ID
+            limit: Page size
+            offset: Participants to skip
+            ties: "row_number", "rank" or "dense" (default: RANKING_TIES)
+            
+        Returns:
+            (position, participant) pairs, best first
+        """
+        rows = db.query(Participant, self._position_column(ties)).filter(
+            Participant.event_id == event_id
+        ).order_by(
+            desc(Participant.points), Participant.id
+        ).offset(offset).limit(limit).all()
+        return [(position, participant) for participant, position in rows]
+    
+    def get_positions(
+        self,
+        db: Session,
+        participants: List[Participant],
+        ties: Optional[str] = None
+    ) -> Dict[int, int]:
+        """
+        Positions of participants (possibly in different events) in one query
+        
+        Args:
+            db: Database session
+            participants: Participants to rank
+            ties: "row_number", "rank" or "dense" (default: RANKING_TIES)
+            
+        Returns:
+            Participant ID -> position in their event
+        """
+        if not participants:
+            return {}
+        # Rank whole events first; filtering participants before the window would rank only them
+        ranked = select(Participant.id, self._position_column(ties)).where(
+            Participant.event_id.in_({p.event_id for p in participants})
+        ).subquery()
+        rows = db.execute(
+            select(ranked.c.id, ranked.c.position).where(ranked.c.id.in_([p.id for p in participants]))
+        ).all()
+        return {participant_id: position for participant_id, position in rows}
+    
     async def recalculate_rankings(self, db: Session, event_id: int):
         """
-        Recalculate rankings for an event
+        Recalculate rankings for an event from scratch
+        
+        Rewrites every participant's rank_position (ties positioned per
+        RANKING_TIES); the incremental leaderboard is reloaded on its next use.
         
         Args:
             db: Database session
@@ -188,68 +499,99 @@ class GamificationService:
         """
         participants = db.query(Participant).filter(
             Participant.event_id == event_id
-        ).order_by(desc(Participant.points)).all()
+        ).all()
+        positions = EventLeaderboard(
+            ((participant.id, participant.points) for participant in participants),
+            ties=self.ranking_ties
+        ).positions()
         
-        for index, participant in enumerate(participants, start=1):
-            participant.rank_position = index
+        for participant in participants:
+            participant.rank_position = positions[participant.id]
         
         db.commit()
+        leaderboard_service.invalidate(event_id)
     
     async def check_and_award_badges(
         self, 
         db: Session, 
         participant: Participant,
-        response: Optional[Response] = None
+        response: Optional[Response] = None,
+        triggers: Optional[Iterable[str]] = None
     ) -> List[Badge]:
         """
         Check if participant earned any new badges
         
+        Only the badges whose criteria the triggers can affect are evaluated;
+        without triggers every badge is.
+        
         Args:
             db: Database session
             participant: Participant to check
             response: Recent response (if any)
+            triggers: What just happened (TRIGGER_* from services.badge_catalog)
             
         Returns:
             List of newly earned badges
         """
-        awarded_badges = []
-        
-        # Get existing badges for participant
-        existing_badge_names = {
-            pb.badge.name for pb in participant.badges
-        }
+        awards = await self._evaluate_badges(db, [participant], triggers or ALL_TRIGGERS, response)
+        return awards.get(participant.id, [])
+    
+    async def award_event_badges(self, db: Session, event_id: int) -> int:
+        """
+        Evaluate the event_completed badges of every participant of an event
         
-        # Check each badge criteria
-        for badge_def in self.BADGE_DEFINITIONS:
-            if badge_def["name"] in existing_badge_names:
-                continue  # Already has this badge
-            
-            # Get or create badge
-            badge = db.query(Badge).filter(Badge.name == badge_def["name"]).first()
-            if not badge:
-                badge = Badge(**badge_def)
-                db.add(badge)
-                db.commit()
-                db.refresh(badge)
+        Args:
+            db: Database session
+            event_id: Completed event
             
-            # Check criteria
-            earned = await self._check_badge_criteria(
-                db, participant, badge, response
+        Returns:
+            Number of badges awarded
+        """
+        participants = db.query(Participant).filter(Participant.event_id == event_id).all()
+        awards = await self._evaluate_badges(db, participants, (TRIGGER_EVENT_COMPLETED,))
+        return sum(len(badges) for badges in awards.values())
+    
+    async def _evaluate_badges(
+        self,
+        db: Session,
+        participants: List[Participant],
+        triggers: Iterable[str],
+        response: Optional[Response] = None
+    ) -> Dict[int, List[Badge]]:
+        """Evaluate the triggered rules for participants and insert all awards in one statement"""
+        badge_catalog.ensure_loaded(db, self.BADGE_DEFINITIONS)
+        rules = badge_catalog.for_triggers(triggers)
+        if not rules or not participants:
+            return {}
+        
+        # Badges already earned, for all participants at once
+        owned = set(db.execute(
+            select(ParticipantBadge.participant_id, ParticipantBadge.badge_id).where(
+                ParticipantBadge.participant_id.in_([p.id for p in participants]),
+                ParticipantBadge.badge_id.in_([badge.id for badge in rules])
             )
-            
-            if earned:
-                # Award badge
-                participant_badge = ParticipantBadge(
-                    participant_id=participant.id,
-                    badge_id=badge.id
-                )
-                db.add(participant_badge)
-                awarded_badges.append(badge)
-        
-        if awarded_badges:
+        ).all())
+        
+        awards: Dict[int, List[Badge]] = {}
+        for participant in participants:
+            for badge in rules:
+                if (participant.id, badge.id) in owned:
+                    continue  # Already has this badge
+                if await self._check_badge_criteria(db, participant, badge, response):
+                    awards.setdefault(participant.id, []).append(badge)
+        
+        if awards:
+            db.execute(insert(ParticipantBadge.__table__).values([
+                {"participant_id": participant_id, "badge_id": badge.id}
+                for participant_id, badges in awards.items()
+                for badge in badges
+            ]))
             db.commit()
+            for participant in participants:
+                if participant.id in awards:
+                    db.expire(participant, ["badges"])
         
-        return awarded_badges
+        return awards
     
     async def _check_badge_criteria(
         self, 
@@ -258,7 +600,7 @@ class GamificationService:
         badge: Badge,
         response: Optional[Response]
     ) -> bool:
-        """Check if badge criteria is met"""
+        """Check if badge criteria is met (counts come from the participant's counters, not the responses table)"""
         
         if badge.criteria_type == "total_points":
             return participant.points >= badge.criteria_value
@@ -276,18 +618,10 @@ class GamificationService:
             return False
         
         elif badge.criteria_type == "quality_responses":
-            quality_responses = db.query(Response).filter(
-                Response.participant_id == participant.id,
-                Response.quality_score >= 0.7
-            ).count()
-            return quality_responses >= badge.criteria_value
+            return participant.high_quality_responses_count >= badge.criteria_value
         
         elif badge.criteria_type == "positive_sentiment":
-            positive_responses = db.query(Response).filter(
-                Response.participant_id == participant.id,
-                Response.sentiment == "positive"
-            ).count()
-            return positive_responses >= badge.criteria_value
+            return participant.positive_responses_count >= badge.criteria_value
         
         elif badge.criteria_type == "fast_response":
             if response and response.response_time_seconds:
@@ -301,14 +635,10 @@ class GamificationService:
         
         elif badge.criteria_type == "completion_rate":
             # Check if participant answered all questions in event
-            from models import Question
-            total_questions = db.query(Question).filter(
-                Question.event_id == participant.event_id
-            ).count()
-            participant_responses = participant.responses_count
+            total_questions = participant.event.questions_count
             
             if total_questions > 0:
-                completion = (participant_responses / total_questions) * 100
+                completion = (participant.answered_questions_count / total_questions) * 100
                 return completion >= badge.criteria_value
             return False
         
@@ -338,14 +668,9 @@ class GamificationService:
         ).limit(limit).all()
     
     async def seed_badges(self, db: Session):
-        """Seed initial badges into database"""
-        for badge_def in self.BADGE_DEFINITIONS:
-            existing = db.query(Badge).filter(Badge.name == badge_def["name"]).first()
-            if not existing:
-                badge = Badge(**badge_def)
-                db.add(badge)
-        
-        db.commit()
+        """Seed initial badges into database and (re)load the badge catalog"""
+        badge_catalog.invalidate()
+        badge_catalog.load(db, self.BADGE_DEFINITIONS)
 
 
 # Singleton instance
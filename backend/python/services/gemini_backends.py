@@ -0,0 +1,221 @@
+"""
+Model backends for GeminiService
+
+GeminiService only needs an object with `generate_content_async(prompt, stream=False)`
+returning something with a `.text` (and, when streaming, async-iterable chunks
+with a `.text`). GEMINI_BACKEND selects the implementation:
+
+- sdk: the real google.generativeai model (default)
+- standin: a local HTTP stand-in server (benchmarks/gemini_standin.py) with
+  configurable latency and error distributions, for load tests
+- record: the real SDK (or GEMINI_RECORD_BACKEND), saving every response to a cassette file
+- replay: responses previously saved to the cassette, keyed by prompt hash,
+  so the whole pipeline runs offline and deterministically
+
+Every backend is built for one model name (GEMINI_MODEL by default), so
+GeminiService can keep a small pool of them and route operations to
+different models.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+
+class ResourceExhausted(Exception):
+    """Stand-in for the SDK's 429 error (same name, so it is categorized as rate_limited)"""
+
+
+class ServiceUnavailable(Exception):
+    """Stand-in for the SDK's 503 error (categorized as unavailable)"""
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a prompt was never recorded"""
+
+
+def prompt_hash(prompt: str) -> str:
+    """Cassette key of a prompt"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class TextResponse:
+    """Minimal response object; iterating it yields itself as the only chunk"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def _chunks(self):
+        yield self
+
+    def __aiter__(self):
+        return self._chunks()
+
+
+class SdkBackend:
+    """The real Gemini model through google.generativeai"""
+
+    name = "sdk"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable not set")
+
+        # Imported here: the SDK takes most of a second to import
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate_content_async(self, prompt: str, **kwargs):
+        return await self.model.generate_content_async(prompt, **kwargs)
+
+
+class StandInBackend:
+    """Local HTTP stand-in that mimics Gemini's latency and failures"""
+
+    name = "standin"
+
+    # Blocking HTTP calls run here rather than in the default executor, which
+    # has only a few threads on small machines and would cap concurrency
+    _executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="gemini-standin")
+
+    def __init__(self, url: str, model_name: str = DEFAULT_MODEL):
+        self.url = url.rstrip("/")
+        self.model_name = model_name
+
+    def _post(self, prompt: str) -> str:
+        request = urllib.request.Request(
+            f"{self.url}/generate",
+            data=json.dumps({"prompt": prompt, "model": self.model_name}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return json.loads(response.read())["text"]
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise ResourceExhausted(f"Stand-in rate limited ({e.code})")
+            if e.code >= 500:
+                raise ServiceUnavailable(f"Stand-in unavailable ({e.code})")
+            raise
+
+    async def generate_content_async(self, prompt: str, **kwargs):
+        loop = asyncio.get_running_loop()
+        return TextResponse(await loop.run_in_executor(self._executor, self._post, prompt))
+
+
+# Loaded cassettes by path: backends for different models share one file
+_cassettes: Dict[str, dict] = {}
+_cassette_locks: Dict[str, threading.Lock] = {}
+
+
+class CassetteBackend:
+    """
+    Record responses to, or replay them from, a JSON cassette keyed by prompt hash
+
+    Keys don't include the model, so a replay returns whatever model answered
+    the prompt when it was recorded.
+    """
+
+    def __init__(self, path: str, mode: str, inner=None, model_name: str = DEFAULT_MODEL):
+        self.path = path
+        self.mode = mode  # record, replay
+        self.inner = inner
+        self.name = mode
+        self.model_name = model_name
+        if path not in _cassettes:
+            _cassettes[path] = {}
+            _cassette_locks[path] = threading.Lock()
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    _cassettes[path] = json.load(f)
+        self.entries = _cassettes[path]
+        self._lock = _cassette_locks[path]
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    async def generate_content_async(self, prompt: str, **kwargs):
+        key = prompt_hash(prompt)
+        entry = self.entries.get(key)
+
+        if self.mode == "replay":
+            if entry is None:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded response for prompt {key[:12]} in {self.path}")
+            self.hits += 1
+            return TextResponse(entry["text"])
+
+        # Record: always ask the real model (streams are consumed in full)
+        response = await self.inner.generate_content_async(prompt, **kwargs)
+        if kwargs.get("stream"):
+            chunks = [chunk.text async for chunk in response]
+            text = "".join(chunks)
+        else:
+            text = response.text
+
+        self.entries[key] = {"prompt": prompt.strip()[:200], "text": text}
+        self.recorded += 1
+        await asyncio.to_thread(self._save)
+        return TextResponse(text)
+
+    def _save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def get_stats(self) -> dict:
+        return {
+            "path": self.path,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+def create_model_backend(backend: Optional[str] = None, model_name: Optional[str] = None):
+    """
+    Build the model backend selected by GEMINI_BACKEND
+
+    Args:
+        backend: Override for GEMINI_BACKEND (sdk, standin, record, replay)
+        model_name: Gemini model to call (default: GEMINI_MODEL)
+
+    Returns:
+        An object with `generate_content_async(prompt, **kwargs)`
+
+    Raises:
+        ValueError: For an unknown backend, or a missing GEMINI_API_KEY with sdk/record
+    """
+    backend = backend or os.getenv("GEMINI_BACKEND", "sdk")
+    model_name = model_name or os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
+    cassette_path = os.getenv("GEMINI_CASSETTE_PATH", "gemini_cassette.json")
+
+    if backend == "sdk":
+        return SdkBackend(model_name)
+    if backend == "standin":
+        return StandInBackend(os.getenv("GEMINI_STANDIN_URL", "http://127.0.0.1:8765"), model_name)
+    if backend == "record":
+        inner = create_model_backend(os.getenv("GEMINI_RECORD_BACKEND", "sdk"), model_name)
+        return CassetteBackend(cassette_path, mode="record", inner=inner, model_name=model_name)
+    if backend == "replay":
+        return CassetteBackend(cassette_path, mode="replay", model_name=model_name)
+
+    raise ValueError(f"Unknown GEMINI_BACKEND '{backend}' (expected sdk, standin, record or replay)")
@@ -1,123 +1,950 @@
 """
 Gemini AI Service for sentiment analysis, NLU, and question generation
 """
+import asyncio
+import heapq
+import itertools
+import json
 import os
 import re
-from typing import List, Optional, Tuple
-import google.generativeai as genai
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from schemas import SentimentAnalysisResponse, GenerateQuestionResponse
+from services.question_cache import QuestionCache, question_fingerprint
+from services.sentiment_cache import SentimentCache
+from services.sentiment_classifier import SentimentClassifierTier
+from services.keyword_sentiment import keyword_sentiment
+from services.ai_metrics import ai_metrics, current_event, set_events
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, LatencyTracker
+from services.gemini_backends import DEFAULT_MODEL, create_model_backend
+
+
+# Scheduling priorities for outbound Gemini calls (lower runs first)
+PRIORITY_HOST = 0          # Host-facing: question generation, option precompute
+PRIORITY_PARTICIPANT = 1   # Participant path: scoring a submitted response
+PRIORITY_BACKGROUND = 2    # Background: re-scoring, summaries, pool refills
+
+PRIORITY_NAMES = {
+    PRIORITY_HOST: "host",
+    PRIORITY_PARTICIPANT: "participant",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Reasoning of the canned question returned when Gemini is unavailable
+FALLBACK_QUESTION_REASONING = "Fallback question"
+
+# Operations that can be routed to their own model (unset = GEMINI_MODEL)
+OPERATION_MODEL_ENV = {
+    "sentiment": "GEMINI_SENTIMENT_MODEL",
+    "sentiment_batch": "GEMINI_SENTIMENT_MODEL",
+    "question": "GEMINI_QUESTION_MODEL",
+    "question_stream": "GEMINI_QUESTION_MODEL",
+    "summary": "GEMINI_SUMMARY_MODEL",
+}
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Response schemas for structured (schema-constrained JSON) output
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": {"type": "string", "enum": ["positive", "negative", "neutral"]},
+        "score": {"type": "number"},
+        "confidence": {"type": "number"},
+    },
+    "required": ["sentiment", "score", "confidence"],
+}
+
+SENTIMENT_BATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"index": {"type": "integer"}, **SENTIMENT_SCHEMA["properties"]},
+        "required": ["index", "sentiment", "score", "confidence"],
+    },
+}
+
+QUESTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "text": {"type": "string"},
+        "question_type": {"type": "string"},
+        "options": {"type": "array", "items": {"type": "string"}, "nullable": True},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["text", "question_type", "reasoning"],
+}
+
+SENTIMENT_RULES = (
+    "positive = enthusiastic, happy or constructive; negative = critical, unhappy or frustrated; "
+    "neutral = balanced or informational. score from -1.0 (very negative) to 1.0 (very positive); "
+    "confidence from 0.0 to 1.0."
+)
+
+
+def heuristic_quality_score(text: str) -> float:
+    """Quality of a response from its length and word count (0.0 to 1.0), no Gemini call"""
+    # Length bonus
+    length_score = min(1.0, len(text) / 100)
+    
+    # Complexity bonus (simple heuristic)
+    words = text.split()
+    complexity_score = min(1.0, len(words) / 20)
+    
+    # Combined score
+    quality = (length_score * 0.5) + (complexity_score * 0.5)
+    
+    return round(quality, 2)
+
+
+def fallback_question() -> GenerateQuestionResponse:
+    """Canned question served when Gemini is unavailable or not configured"""
+    return GenerateQuestionResponse(
+        text="¿Qué aspecto del evento te resultó más interesante?",
+        question_type="open",
+        options=None,
+        reasoning=FALLBACK_QUESTION_REASONING
+    )
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to a per-minute budget"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self._updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def seconds_until(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+    
+    def drain(self):
+        """Empty the bucket (e.g. after the provider answered 429)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class GeminiScheduler:
+    """
+    Shared admission control for outbound Gemini traffic
+    
+    Callers wait in a priority queue until a concurrency slot is free and both
+    the requests-per-minute and tokens-per-minute budgets allow the call, so
+    bursts are queued instead of failing with 429s. Host-facing calls are
+    always admitted before participant scoring and background work.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        backoff_seconds: float = 1.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.backoff_seconds = backoff_seconds
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.in_flight = 0
+        self._heap: list = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        
+        # Metrics
+        self.granted: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.wait_seconds_total: Dict[str, float] = {name: 0.0 for name in PRIORITY_NAMES.values()}
+        self.wait_seconds_max: Dict[str, float] = {name: 0.0 for name in PRIORITY_NAMES.values()}
+        self.throttled = 0
+        self.rate_limited_retries = 0
+    
+    async def acquire(self, priority: int, tokens: int):
+        """Wait for a slot and budget for a call of roughly `tokens` tokens"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._sequence), future, tokens, time.monotonic()))
+        self._dispatch()
+        
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just as the caller gave up: hand the slot back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+    
+    def try_acquire(self, tokens: int) -> bool:
+        """
+        Take a slot right away if one is free and the budgets allow it
+        
+        Used for optional extra calls (hedges): never waits and never jumps
+        ahead of queued callers.
+        """
+        if any(not entry[2].done() for entry in self._heap):
+            return False
+        if self.in_flight >= self.max_concurrency or self._paused_until > time.monotonic():
+            return False
+        if self.request_bucket and self.request_bucket.seconds_until(1) > 0:
+            return False
+        if self.token_bucket and self.token_bucket.seconds_until(tokens) > 0:
+            return False
+        
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket:
+            self.token_bucket.consume(tokens)
+        self.in_flight += 1
+        return True
+    
+    def release(self):
+        """Free a concurrency slot"""
+        self.in_flight -= 1
+        self._dispatch()
+    
+    def backoff(self, attempt: int):
+        """
+        The provider rate-limited us: empty the request budget and pause
+        admissions with exponential backoff so queued calls wait instead of failing
+        """
+        self.rate_limited_retries += 1
+        if self.request_bucket is not None:
+            self.request_bucket.drain()
+        self._paused_until = max(
+            self._paused_until,
+            time.monotonic() + self.backoff_seconds * (2 ** attempt)
+        )
+    
+    def _dispatch(self):
+        """Admit queued calls in priority order while slots and budget allow"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        while self._heap and self.in_flight < self.max_concurrency:
+            priority, _, future, tokens, enqueued_at = self._heap[0]
+            if future.done():
+                heapq.heappop(self._heap)
+                continue
+            
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.request_bucket.seconds_until(1) if self.request_bucket else 0.0,
+                self.token_bucket.seconds_until(tokens) if self.token_bucket else 0.0,
+            )
+            if wait > 0:
+                self.throttled += 1
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            
+            heapq.heappop(self._heap)
+            if self.request_bucket:
+                self.request_bucket.consume(1)
+            if self.token_bucket:
+                self.token_bucket.consume(tokens)
+            
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            waited = time.monotonic() - enqueued_at
+            self.granted[name] = self.granted.get(name, 0) + 1
+            self.wait_seconds_total[name] = self.wait_seconds_total.get(name, 0.0) + waited
+            self.wait_seconds_max[name] = max(self.wait_seconds_max.get(name, 0.0), waited)
+            
+            self.in_flight += 1
+            future.set_result(None)
+    
+    def get_stats(self) -> dict:
+        """Get queue depth, wait times and budget usage"""
+        queued: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future, _, _ in self._heap:
+            if not future.done():
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                queued[name] = queued.get(name, 0) + 1
+        
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(queued.values()),
+            "queued_by_priority": queued,
+            "granted_by_priority": dict(self.granted),
+            "avg_wait_ms_by_priority": {
+                name: round(self.wait_seconds_total[name] / count * 1000, 1) if count else None
+                for name, count in self.granted.items()
+            },
+            "max_wait_ms_by_priority": {
+                name: round(seconds * 1000, 1) for name, seconds in self.wait_seconds_max.items()
+            },
+            "requests_per_minute": self.request_bucket.capacity if self.request_bucket else None,
+            "requests_available": round(self.request_bucket.tokens, 1) if self.request_bucket else None,
+            "tokens_per_minute": self.token_bucket.capacity if self.token_bucket else None,
+            "tokens_available": round(self.token_bucket.tokens) if self.token_bucket else None,
+            "throttled": self.throttled,
+            "rate_limited_retries": self.rate_limited_retries,
+        }
+
+
+class ModelCallStats:
+    """Latency, token usage and hedge race outcomes of one model"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.calls = 0
+        self.failures = 0
+        self.hedges = 0
+        self.races = 0
+        self.wins = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latency = LatencyTracker()
+    
+    def record(self, latency_seconds: float, input_tokens: int, output_tokens: int, hedge: bool = False):
+        """Record a successful call (requests also counts failed and cancelled ones)"""
+        self.calls += 1
+        self.hedges += hedge
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.latency.add(latency_seconds)
+    
+    def get_stats(self) -> dict:
+        def percentile_ms(pct: float):
+            value = self.latency.percentile(pct)
+            return round(value * 1000, 1) if value is not None else None
+        
+        return {
+            "requests": self.requests,
+            "calls": self.calls,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "races": self.races,
+            "wins": self.wins,
+            "win_rate": round(self.wins / self.races, 3) if self.races else None,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "p50_ms": percentile_ms(50),
+            "p90_ms": percentile_ms(90),
+            "p99_ms": percentile_ms(99),
+        }
+
+
+class SentimentBatcher:
+    """
+    Micro-batches sentiment requests into a single Gemini prompt
+    
+    Callers wait on a future while texts accumulate for a short window (or
+    until the batch is full); the whole batch is then analyzed with one call
+    and the results are fanned back out to the waiting callers.
+    """
+    
+    def __init__(self, service: "GeminiService", max_batch_size: int, window_seconds: float):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        # (text, future, priority, event the text belongs to)
+        self._pending: List[Tuple[str, asyncio.Future, int, Optional[int]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        self._tasks = set()
+        
+        # Metrics
+        self.batches_sent = 0
+        self.items_batched = 0
+        self.batch_failures = 0
+    
+    async def submit(self, text: str, priority: int) -> SentimentAnalysisResponse:
+        """Queue a text for the next batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, priority, current_event()))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Send everything collected so far as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, int, Optional[int]]]):
+        """Analyze a batch and resolve every waiting future"""
+        # Identical answers ("Sí", "Excelente") only need to be analyzed once
+        unique_texts = list(dict.fromkeys(text for text, _, _, _ in batch))
+        # The batch is scheduled as urgently as its most urgent caller
+        priority = min(item_priority for _, _, item_priority, _ in batch)
+        # Its cost is shared by the events of the texts it carries
+        set_events(tuple(event_id for _, _, _, event_id in batch))
+        
+        if len(unique_texts) == 1:
+            results = [await self.service._analyze_sentiment_single(unique_texts[0], priority)]
+        else:
+            try:
+                results = await self.service._analyze_sentiment_batch(unique_texts, priority)
+                self.batches_sent += 1
+                self.items_batched += len(unique_texts)
+            except Exception as e:
+                self.batch_failures += 1
+                if self.service.breaker.is_open:
+                    results = self.service._degraded_sentiment_batch(unique_texts)
+                else:
+                    print(f"⚠️ Gemini batch of {len(unique_texts)} failed ({type(e).__name__}: {e}), retrying items individually")
+                    results = await asyncio.gather(
+                        *(self.service._analyze_sentiment_single(text, priority) for text in unique_texts)
+                    )
+        
+        by_text = dict(zip(unique_texts, results))
+        for text, future, _, _ in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+    
+    def get_stats(self) -> dict:
+        """Get batching counters"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": round(self.window_seconds * 1000),
+            "pending": len(self._pending),
+            "batches_sent": self.batches_sent,
+            "items_batched": self.items_batched,
+            "avg_batch_size": round(self.items_batched / self.batches_sent, 2) if self.batches_sent else None,
+            "batch_failures": self.batch_failures,
+        }
 
 
 class GeminiService:
     """Service for Gemini AI integration"""
     
-    def __init__(self):
-        """Initialize Gemini API"""
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable not set")
+    def __init__(self, model=None):
+        """
+        Initialize Gemini API
+        
+        Args:
+            model: Optional pre-built model (anything exposing generate_content_async),
+                   used instead of the backend selected by GEMINI_BACKEND
+        """
+        # Max Gemini calls in flight at once; extra callers wait for a free slot
+        self.max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+        
+        # Shared per-minute request/token budgets with priority queueing (0 = unlimited)
+        self.scheduler = GeminiScheduler(
+            max_concurrency=self.max_concurrency,
+            requests_per_minute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "0")),
+            tokens_per_minute=int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "0")),
+            backoff_seconds=float(os.getenv("GEMINI_RATE_LIMIT_BACKOFF_SECONDS", "1"))
+        )
+        self.rate_limit_retries = int(os.getenv("GEMINI_RATE_LIMIT_RETRIES", "3"))
+        
+        # Sentiment micro-batching: up to N texts or W milliseconds per prompt (size 1 disables)
+        self.sentiment_batcher = SentimentBatcher(
+            service=self,
+            max_batch_size=int(os.getenv("GEMINI_SENTIMENT_BATCH_SIZE", "20")),
+            window_seconds=int(os.getenv("GEMINI_SENTIMENT_BATCH_WINDOW_MS", "50")) / 1000
+        )
+        
+        # Normalized-text cache of authoritative Gemini results
+        self.sentiment_cache = SentimentCache()
         
-        genai.configure(api_key=api_key)
-        # Using gemini-2.5-flash (latest and fastest model available)
-        # Alternative: gemini-2.5-pro for better quality
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # Memo of generated questions keyed by a fingerprint of their inputs
+        self.question_cache = QuestionCache()
+        
+        # Local classifier answering confident texts before they reach Gemini
+        self.sentiment_classifier = SentimentClassifierTier()
+        
+        # Trips after repeated failures so calls go straight to the fallback;
+        # per-call deadlines follow the observed p95 latency
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5")),
+            reset_seconds=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30")),
+            min_timeout=float(os.getenv("GEMINI_TIMEOUT_MIN_SECONDS", "2")),
+            max_timeout=float(os.getenv("GEMINI_TIMEOUT_MAX_SECONDS", "20")),
+            timeout_multiplier=float(os.getenv("GEMINI_TIMEOUT_P95_MULTIPLIER", "3"))
+        )
+        
+        # Ask for schema-constrained JSON instead of describing the format in the prompt
+        self.structured_output = os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() == "true"
+        # Extra attempts when a reply can't be parsed or validated
+        self.parse_retries = int(os.getenv("GEMINI_PARSE_RETRIES", "1"))
+        self.output_stats: Dict[str, Dict[str, int]] = {}
+        
+        # Real SDK, local stand-in server or record/replay cassette (GEMINI_BACKEND)
+        self.model_name = getattr(model, "model_name", None) or os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
+        self.model = model if model is not None else create_model_backend(model_name=self.model_name)
+        
+        # Model pool: other models by name, and the operations routed to them
+        self.models = {}
+        self.operation_models: Dict[str, str] = {}
+        if model is None:
+            for operation, env_name in OPERATION_MODEL_ENV.items():
+                model_name = os.getenv(env_name)
+                if model_name and model_name != self.model_name:
+                    self.operation_models[operation] = model_name
+                    self._backend_for(model_name)
+        
+        # Hedging: a second request once a call outlives the observed p90
+        self.hedge_enabled = os.getenv("GEMINI_HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_percentile = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "90"))
+        # Model the hedge goes to (unset = same model as the first request)
+        self.hedge_model_name = os.getenv("GEMINI_HEDGE_MODEL") or None
+        if self.hedge_enabled and self.hedge_model_name and model is None:
+            self._backend_for(self.hedge_model_name)
+        self.hedges_sent = 0
+        self.hedges_skipped = 0
+        self.model_stats: Dict[str, ModelCallStats] = {}
+    
+    def _backend_for(self, model_name: str):
+        """Backend of a model in the pool, created on first use"""
+        if model_name == self.model_name:
+            return self.model
+        if model_name not in self.models:
+            self.models[model_name] = create_model_backend(model_name=model_name)
+        return self.models[model_name]
+    
+    def _model_for(self, operation: str) -> Tuple[str, object]:
+        """(model name, backend) an operation is routed to"""
+        model_name = self.operation_models.get(operation, self.model_name)
+        return model_name, self._backend_for(model_name)
+    
+    def _hedge_delay(self, operation: str) -> Optional[float]:
+        """How long to wait before hedging a call, or None to not hedge it"""
+        if not self.hedge_enabled:
+            return None
+        tracker = self.breaker.latency.get(operation)
+        if tracker is None or len(tracker.samples) < CircuitBreaker.MIN_SAMPLES_FOR_TIMEOUT:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+    
+    async def _timed_call(
+        self, model_name: str, backend, prompt: str, kwargs: dict, operation: str, hedge: bool = False
+    ):
+        """Call one model, recording its latency and token usage"""
+        stats = self.model_stats.setdefault(model_name, ModelCallStats())
+        stats.requests += 1
+        start = time.perf_counter()
+        try:
+            response = await backend.generate_content_async(prompt, **kwargs)
+        except Exception:
+            stats.failures += 1
+            raise
+        
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        else:
+            input_tokens = len(prompt) // 4
+            output_tokens = len(getattr(response, "text", "") or "") // 4
+        stats.record(time.perf_counter() - start, input_tokens, output_tokens, hedge)
+        ai_metrics.record_tokens(operation, input_tokens, output_tokens)
+        return response
     
-    async def analyze_sentiment(self, text: str) -> SentimentAnalysisResponse:
+    async def _call_model(self, prompt: str, operation: str, kwargs: dict, estimated_tokens: int):
+        """
+        Call the operation's model, hedging with a second request if it is slow
+        
+        The hedge goes out once the first request has been pending for the
+        operation's observed p90 latency, only if the scheduler has a free slot
+        and budget right now. Whichever request succeeds first wins; the other
+        is cancelled.
+        """
+        model_name, backend = self._model_for(operation)
+        delay = self._hedge_delay(operation)
+        if delay is None:
+            return await self._timed_call(model_name, backend, prompt, kwargs, operation)
+        
+        primary = asyncio.ensure_future(self._timed_call(model_name, backend, prompt, kwargs, operation))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.scheduler.try_acquire(estimated_tokens):
+                self.hedges_skipped += 1
+                return await primary
+            
+            hedge_model_name = self.hedge_model_name or model_name
+            hedge = asyncio.ensure_future(self._timed_call(
+                hedge_model_name, self._backend_for(hedge_model_name), prompt, kwargs, operation, hedge=True
+            ))
+            hedge.add_done_callback(lambda _: self.scheduler.release())
+            self.hedges_sent += 1
+            
+            racers = {primary: model_name, hedge: hedge_model_name}
+            for name in racers.values():
+                self.model_stats.setdefault(name, ModelCallStats()).races += 1
+            
+            pending, error = set(racers), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (primary, hedge):
+                    if task not in done:
+                        continue
+                    if task.exception() is None:
+                        self.model_stats[racers[task]].wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    async def _generate_content(
+        self,
+        prompt: str,
+        operation: str,
+        priority: int = PRIORITY_PARTICIPANT,
+        expected_output_tokens: int = 200,
+        response_schema: Optional[dict] = None
+    ):
+        """
+        Call Gemini without blocking the event loop
+        
+        Uses the SDK's async API. Calls are admitted by the shared scheduler
+        (concurrency limit, per-minute request/token budgets, priority order),
+        go through the circuit breaker and are cut off at a deadline derived
+        from the operation's observed p95 latency. A 429 from the provider
+        puts the call back in the queue instead of failing it.
+        
+        Args:
+            prompt: Prompt to send
+            operation: Operation name used for latency tracking (e.g. "sentiment")
+            priority: Scheduling priority (PRIORITY_HOST, PRIORITY_PARTICIPANT, PRIORITY_BACKGROUND)
+            expected_output_tokens: Output size estimate charged to the token budget
+            response_schema: JSON schema the reply must follow (structured output)
+            
+        Returns:
+            The SDK response object
+            
+        Raises:
+            CircuitOpenError: If the breaker is open
+            asyncio.TimeoutError: If the call exceeds its deadline
+        """
+        estimated_tokens = len(prompt) // 4 + expected_output_tokens
+        kwargs = {}
+        if response_schema is not None:
+            kwargs["generation_config"] = self._generation_config(response_schema)
+        
+        for attempt in range(self.rate_limit_retries + 1):
+            await self.scheduler.acquire(priority, estimated_tokens)
+            # A half-open probe slot is held until an outcome is recorded or it is released
+            probe = False
+            try:
+                if not self.breaker.allow_request():
+                    ai_metrics.record_error(operation, "circuit_open")
+                    raise CircuitOpenError("Gemini circuit breaker is open")
+                probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+                
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        self._call_model(prompt, operation, kwargs, estimated_tokens),
+                        timeout=self.breaker.timeout_for(operation)
+                    )
+                except asyncio.TimeoutError:
+                    probe = False
+                    self.breaker.record_failure("timeout")
+                    ai_metrics.record_error(operation, "timeout")
+                    raise
+                except Exception as e:
+                    reason = self._failure_reason(e)
+                    ai_metrics.record_error(operation, reason)
+                    if reason == "rate_limited" and attempt < self.rate_limit_retries:
+                        # Not an outcome: give the probe slot back so the retry can take it again
+                        probe = False
+                        self.breaker.release_probe()
+                        self.scheduler.backoff(attempt)
+                        continue
+                    probe = False
+                    self.breaker.record_failure(reason)
+                    raise
+                
+                latency = time.perf_counter() - start
+                probe = False
+                self.breaker.record_success(operation, latency)
+                ai_metrics.record_call(operation, latency)
+                return response
+            finally:
+                # Cancelled mid-call: CancelledError is not an Exception, so nothing above saw it
+                if probe:
+                    self.breaker.release_probe()
+                self.scheduler.release()
+    
+    @staticmethod
+    def _failure_reason(error: Exception) -> str:
+        """Categorize a Gemini call failure"""
+        name = type(error).__name__
+        if name in ("ResourceExhausted", "TooManyRequests"):
+            return "rate_limited"
+        if name in ("ServiceUnavailable", "InternalServerError", "DeadlineExceeded"):
+            return "unavailable"
+        return "error"
+    
+    @staticmethod
+    def _parse_json_response(result_text: str):
+        """
+        Parse the JSON payload of a reply
+        
+        Structured output replies are plain JSON; code fences are only stripped
+        for backends that ignore the response schema.
+        """
+        result_text = result_text.strip()
+        if result_text.startswith("`"):
+            result_text = _CODE_FENCE.sub("", result_text)
+        return json.loads(result_text)
+    
+    def _generation_config(self, response_schema: dict) -> dict:
+        """Generation config requesting JSON that follows `response_schema`"""
+        return {"response_mime_type": "application/json", "response_schema": response_schema}
+    
+    def _record_output(self, operation: str, event: str, response=None):
+        """Count a parsed reply, parse failure or retry for an operation"""
+        stats = self.output_stats.setdefault(
+            operation, {"parsed": 0, "parse_failures": 0, "retries": 0, "output_tokens": 0}
+        )
+        stats[event] += 1
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None and event == "parsed":
+            stats["output_tokens"] += getattr(usage, "candidates_token_count", 0) or 0
+    
+    async def _generate_json(
+        self,
+        prompt: str,
+        operation: str,
+        schema: dict,
+        validate,
+        priority: int = PRIORITY_PARTICIPANT,
+        expected_output_tokens: int = 200
+    ):
+        """
+        Call Gemini for a JSON reply and validate it, retrying unparseable replies
+        
+        Args:
+            prompt: Prompt to send
+            operation: Operation name for latency and parse tracking
+            schema: Response schema (sent when structured output is enabled)
+            validate: Turns the parsed JSON into the result; raises ValueError if invalid
+            priority: Scheduling priority
+            expected_output_tokens: Output size estimate charged to the token budget
+            
+        Returns:
+            Whatever `validate` returns
+            
+        Raises:
+            ValueError: If no attempt produced a valid reply
+        """
+        for attempt in range(self.parse_retries + 1):
+            response = await self._generate_content(
+                prompt,
+                operation=operation,
+                priority=priority,
+                expected_output_tokens=expected_output_tokens,
+                response_schema=schema if self.structured_output else None
+            )
+            try:
+                result = validate(self._parse_json_response(response.text))
+            except (ValueError, TypeError, AttributeError) as e:
+                self._record_output(operation, "parse_failures")
+                ai_metrics.record_error(operation, "parse")
+                if attempt == self.parse_retries:
+                    raise ValueError(f"unparseable {operation} reply: {e}") from e
+                self._record_output(operation, "retries")
+                continue
+            
+            self._record_output(operation, "parsed", response)
+            return result
+    
+    @staticmethod
+    def _sentiment_from_data(data: dict) -> SentimentAnalysisResponse:
+        """Validate one sentiment object from the model"""
+        if not isinstance(data, dict):
+            raise ValueError(f"expected an object, got {type(data).__name__}")
+        sentiment = data.get("sentiment")
+        if sentiment not in ("positive", "negative", "neutral"):
+            raise ValueError(f"invalid sentiment {sentiment!r}")
+        return SentimentAnalysisResponse(
+            sentiment=sentiment,
+            score=max(-1.0, min(1.0, float(data.get("score", 0.0)))),
+            confidence=max(0.0, min(1.0, float(data.get("confidence", 0.5))))
+        )
+    
+    async def analyze_sentiment(
+        self,
+        text: str,
+        priority: int = PRIORITY_PARTICIPANT
+    ) -> SentimentAnalysisResponse:
         """
         Analyze sentiment of a text using Gemini
         
+        Results are served from the sentiment cache when possible, then from the
+        local classifier when it is confident enough. Remaining texts are
+        micro-batched into a single prompt when GEMINI_SENTIMENT_BATCH_SIZE > 1.
+        
         Args:
             text: The text to analyze
+            priority: Scheduling priority for the Gemini call
             
         Returns:
             SentimentAnalysisResponse with sentiment, score, and confidence
         """
-        prompt = f"""
-        Analyze the sentiment of the following text and respond ONLY with a JSON object (no markdown, no backticks):
+        cached = await self.sentiment_cache.get(text)
+        if cached is not None:
+            ai_metrics.record_result("sentiment", "cache")
+            return cached
         
-        {{
-            "sentiment": "positive" | "negative" | "neutral",
-            "score": <float between -1.0 and 1.0>,
-            "confidence": <float between 0.0 and 1.0>
-        }}
+        local = self.sentiment_classifier.classify(text)
+        if local is not None:
+            ai_metrics.record_result("sentiment", local.source)
+            return local
         
-        Text to analyze: "{text}"
+        # Gemini is known to be down: don't wait for a batch window or a timeout
+        if self.breaker.is_open:
+            self.breaker.short_circuited += 1
+            ai_metrics.record_error("sentiment", "circuit_open")
+            result = self._degraded_sentiment(text)
+            ai_metrics.record_result("sentiment", result.source)
+            return result
         
-        Rules:
-        - sentiment: "positive" if enthusiastic, happy, constructive
-        - sentiment: "negative" if critical, unhappy, frustrated  
-        - sentiment: "neutral" if balanced or informational
-        - score: -1.0 (very negative) to 1.0 (very positive)
-        - confidence: how confident you are in this analysis
+        if self.sentiment_batcher.max_batch_size > 1:
+            result = await self.sentiment_batcher.submit(text, priority)
+        else:
+            result = await self._analyze_sentiment_single(text, priority)
+        ai_metrics.record_result("sentiment", result.source)
         
-        Respond with ONLY the JSON object, nothing else.
-        """
+        # Classifier and keyword fallback results are never cached as if they were authoritative
+        await self.sentiment_cache.set(text, result)
+        return result
+    
+    async def _analyze_sentiment_single(
+        self,
+        text: str,
+        priority: int = PRIORITY_PARTICIPANT
+    ) -> SentimentAnalysisResponse:
+        """Analyze one text with its own Gemini prompt"""
+        prompt = self._sentiment_prompt(text)
         
         try:
             print(f"🤖 Gemini - Analyzing sentiment for: {text[:80]}...")
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            print(f"✅ Gemini - Raw response: {result_text}")
-            
-            # Clean up markdown code blocks if present
-            result_text = re.sub(r'^```json\s*', '', result_text)
-            result_text = re.sub(r'^```\s*', '', result_text)
-            result_text = re.sub(r'\s*```$', '', result_text)
-            result_text = result_text.strip()
-            
-            # Parse JSON response
-            import json
-            data = json.loads(result_text)
-            
-            sentiment_result = SentimentAnalysisResponse(
-                sentiment=data.get("sentiment", "neutral"),
-                score=float(data.get("score", 0.0)),
-                confidence=float(data.get("confidence", 0.5))
+            sentiment_result = await self._generate_json(
+                prompt,
+                operation="sentiment",
+                schema=SENTIMENT_SCHEMA,
+                validate=self._sentiment_from_data,
+                priority=priority,
+                expected_output_tokens=30
             )
             
             print(f"📊 Sentiment: {sentiment_result.sentiment} (score: {sentiment_result.score:.2f}, confidence: {sentiment_result.confidence:.2f})")
             
             return sentiment_result
+        except CircuitOpenError:
+            return self._degraded_sentiment(text)
         except Exception as e:
-            print(f"❌ Error analyzing sentiment: {e}")
-            import traceback
-            traceback.print_exc()
-            # Fallback to basic keyword analysis
-            print("⚠️ Using fallback sentiment analysis based on keywords")
-            return self._fallback_sentiment_analysis(text)
+            print(f"❌ Error analyzing sentiment: {type(e).__name__}: {e}")
+            print("⚠️ Using fallback sentiment analysis")
+            return self._degraded_sentiment(text)
     
-    def _fallback_sentiment_analysis(self, text: str) -> SentimentAnalysisResponse:
-        """Fallback sentiment analysis using keyword matching"""
-        positive_words = [
-            'excelente', 'genial', 'bueno', 'útil', 'claro', 'interesante', 
-            'me encanta', 'definitivamente', 'sí', 'perfecto', 'increíble',
-            'fantástico', 'maravilloso', 'great', 'excellent', 'amazing'
-        ]
-        negative_words = [
-            'confuso', 'difícil', 'no entendí', 'malo', 'aburrido', 'no', 
-            'complicado', 'terrible', 'horrible', 'bad', 'difficult', 'boring'
-        ]
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if positive_count > negative_count:
-            sentiment = "positive"
-            score = min(0.7, 0.3 + (positive_count * 0.1))
-        elif negative_count > positive_count:
-            sentiment = "negative"
-            score = max(-0.7, -0.3 - (negative_count * 0.1))
-        else:
-            sentiment = "neutral"
-            score = 0.0
+    def _sentiment_prompt(self, text: str) -> str:
+        """Single-text sentiment prompt (the JSON shape is only spelled out without structured output)"""
+        prompt = f"Classify the sentiment of this event feedback. {SENTIMENT_RULES}\nText to analyze: {json.dumps(text, ensure_ascii=False)}"
+        if not self.structured_output:
+            prompt += '\nRespond ONLY with JSON: {"sentiment": "positive"|"negative"|"neutral", "score": <float>, "confidence": <float>}'
+        return prompt
+    
+    async def _analyze_sentiment_batch(
+        self,
+        texts: List[str],
+        priority: int = PRIORITY_PARTICIPANT
+    ) -> List[SentimentAnalysisResponse]:
+        """
+        Analyze several texts with a single Gemini prompt
         
-        return SentimentAnalysisResponse(
-            sentiment=sentiment,
-            score=score,
-            confidence=0.6
+        Args:
+            texts: Texts to analyze
+            priority: Scheduling priority for the Gemini call
+            
+        Returns:
+            One SentimentAnalysisResponse per text, in the same order
+            
+        Raises:
+            ValueError: If the model output cannot be matched to the inputs
+        """
+        numbered = "\n".join(
+            f"{index}. {json.dumps(text, ensure_ascii=False)}" for index, text in enumerate(texts)
+        )
+        
+        prompt = (
+            f"Classify the sentiment of each of these {len(texts)} event feedback texts, "
+            f"one result per text with its index. {SENTIMENT_RULES}\nTexts to analyze:\n{numbered}"
+        )
+        if not self.structured_output:
+            prompt += ('\nRespond ONLY with a JSON array: [{"index": <int>, "sentiment": '
+                       '"positive"|"negative"|"neutral", "score": <float>, "confidence": <float>}]')
+        
+        def validate(data) -> List[SentimentAnalysisResponse]:
+            if not isinstance(data, list) or len(data) != len(texts):
+                raise ValueError(f"expected {len(texts)} results, got {len(data) if isinstance(data, list) else type(data).__name__}")
+            
+            results: List[Optional[SentimentAnalysisResponse]] = [None] * len(texts)
+            for position, item in enumerate(data):
+                index = int(item.get("index", position))
+                if not 0 <= index < len(texts) or results[index] is not None:
+                    raise ValueError(f"invalid or duplicate index {index}")
+                results[index] = self._sentiment_from_data(item)
+            return results
+        
+        print(f"🤖 Gemini - Analyzing sentiment for a batch of {len(texts)} texts")
+        return await self._generate_json(
+            prompt,
+            operation="sentiment_batch",
+            schema=SENTIMENT_BATCH_SCHEMA,
+            validate=validate,
+            priority=priority,
+            expected_output_tokens=30 * len(texts)
         )
     
+    def _degraded_sentiment(self, text: str) -> SentimentAnalysisResponse:
+        """Best answer without Gemini: the classifier's guess if a model is loaded, else keywords"""
+        result = self.sentiment_classifier.classify_degraded(text)
+        if result is not None:
+            return result
+        return self._fallback_sentiment_analysis(text)
+    
+    def _degraded_sentiment_batch(self, texts: List[str]) -> List[SentimentAnalysisResponse]:
+        """_degraded_sentiment for many texts (keywords are matched in one pass)"""
+        if not self.sentiment_classifier.available:
+            return keyword_sentiment.analyze_batch(texts)
+        results = [self.sentiment_classifier.classify_degraded(text) for text in texts]
+        unknown = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(unknown, keyword_sentiment.analyze_batch([texts[i] for i in unknown])):
+            results[i] = result
+        return results
+    
+    def _fallback_sentiment_analysis(self, text: str) -> SentimentAnalysisResponse:
+        """Fallback sentiment analysis using keyword matching"""
+        return keyword_sentiment.analyze(text)
+    
     async def calculate_quality_score(self, text: str, question_text: str) -> float:
         """
         Calculate quality score of a response using Gemini
@@ -129,91 +956,317 @@ class GeminiService:
         Returns:
             Quality score between 0.0 and 1.0
         """
-        # Length bonus
-        length_score = min(1.0, len(text) / 100)
-        
-        # Complexity bonus (simple heuristic)
-        words = text.split()
-        complexity_score = min(1.0, len(words) / 20)
+        return heuristic_quality_score(text)
+    
+    def _build_question_prompt(
+        self,
+        context: str,
+        previous_questions: List[str] = None,
+        question_type: str = "open"
+    ) -> str:
+        """Build the question generation prompt shared by the plain and streaming paths"""
+        previous_q = "\n".join([f"- {q}" for q in (previous_questions or [])])
         
-        # Combined score
-        quality = (length_score * 0.5) + (complexity_score * 0.5)
+        prompt = (
+            "Write one engaging, thought-provoking question in Spanish for the Nybble Argentina "
+            "audience of this event, relevant to its context and not repeating earlier questions. "
+            "Add a short reasoning for why it is valuable.\n"
+            f"Context: {context}\n"
+            f"Question type: {question_type} (options only for quick_options or multiple_choice)\n"
+            f"Previous questions:\n{previous_q if previous_q else 'None yet'}"
+        )
+        if not self.structured_output:
+            prompt += ('\nRespond ONLY with JSON: {"text": <question>, "question_type": '
+                       f'"{question_type}", "options": [<option>, ...] or null, "reasoning": <why>}}')
+        return prompt
+    
+    @staticmethod
+    def _question_from_data(data: dict, question_type: str) -> GenerateQuestionResponse:
+        """Validate Gemini's question JSON"""
+        if not isinstance(data, dict) or not str(data.get("text") or "").strip():
+            raise ValueError("reply has no question text")
         
-        return round(quality, 2)
+        return GenerateQuestionResponse(
+            text=data["text"].strip(),
+            question_type=data.get("question_type") or question_type,
+            options=data.get("options") or None,
+            reasoning=data.get("reasoning") or "Generated question"
+        )
+    
+    @staticmethod
+    def _fallback_question() -> GenerateQuestionResponse:
+        return fallback_question()
     
     async def generate_question(
         self, 
         context: str, 
         previous_questions: List[str] = None,
-        question_type: str = "open"
+        question_type: str = "open",
+        priority: int = PRIORITY_HOST,
+        force_fresh: bool = False
     ) -> GenerateQuestionResponse:
         """
         Generate a contextual question using Gemini
         
+        The same inputs within QUESTION_CACHE_TTL_SECONDS return the question
+        generated last time unless `force_fresh` is set.
+        
         Args:
             context: Context about the event (e.g., "Tech Night about AI in Production")
             previous_questions: List of already asked questions to avoid repetition
             question_type: Type of question to generate
+            priority: Scheduling priority (host requests by default, pool refills run in the background)
+            force_fresh: Skip the question cache and always call Gemini
             
         Returns:
             GenerateQuestionResponse with generated question
         """
-        previous_q = "\n".join([f"- {q}" for q in (previous_questions or [])])
-        
-        prompt = f"""
-        Generate a thoughtful, engaging question for an event with this context:
-        Context: {context}
-        
-        Previous questions already asked (avoid similar topics):
-        {previous_q if previous_q else "None yet"}
+        previous_questions = self.question_cache.previous_questions(previous_questions)
+        key = question_fingerprint(context, previous_questions, question_type)
+        if force_fresh:
+            self.question_cache.bypassed += 1
+        else:
+            cached = self.question_cache.get(key)
+            if cached is not None:
+                ai_metrics.record_result("question", "cache")
+                return cached
         
-        Question type: {question_type}
+        prompt = self._build_question_prompt(context, previous_questions, question_type)
         
-        Respond ONLY with a JSON object (no markdown, no backticks):
-        {{
-            "text": "<the question text in Spanish>",
-            "question_type": "{question_type}",
-            "options": ["Option 1", "Option 2", ...] (only if question_type is "quick_options" or "multiple_choice"),
-            "reasoning": "<why this question is valuable>"
-        }}
+        try:
+            question = await self._generate_json(
+                prompt,
+                operation="question",
+                schema=QUESTION_SCHEMA,
+                validate=lambda data: self._question_from_data(data, question_type),
+                priority=priority,
+                expected_output_tokens=150
+            )
+            ai_metrics.record_result("question", "gemini")
+            self.question_cache.set(key, question)
+            return question
+        except Exception as e:
+            print(f"Error generating question: {type(e).__name__}: {e}")
+            ai_metrics.record_result("question", "fallback")
+            # Fallback question
+            return self._fallback_question()
+    
+    async def generate_question_stream(
+        self,
+        context: str,
+        previous_questions: List[str] = None,
+        question_type: str = "open"
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Generate a question, yielding Gemini's output as it arrives
         
-        Make the question:
-        - Relevant to the event context
-        - Engaging and thought-provoking
-        - In Spanish (for Nybble Argentina audience)
-        - Not repetitive of previous questions
+        The call is admitted by the scheduler at host priority and holds its slot
+        until the stream ends. Each chunk must arrive within the operation's
+        breaker deadline. Streams always call Gemini; the result replaces the
+        cached question for the same inputs.
         
-        Respond with ONLY the JSON object.
+        Args:
+            context: Context about the event
+            previous_questions: List of already asked questions to avoid repetition
+            question_type: Type of question to generate
+            
+        Yields:
+            ("token", str) for each chunk of raw output, then exactly one
+            ("question", GenerateQuestionResponse) with the validated result
+            (the fallback question if the stream failed or could not be parsed)
         """
+        previous_questions = self.question_cache.previous_questions(previous_questions)
+        prompt = self._build_question_prompt(context, previous_questions, question_type)
+        chunks = []
+        kwargs = {"stream": True}
+        if self.structured_output:
+            kwargs["generation_config"] = self._generation_config(QUESTION_SCHEMA)
         
+        await self.scheduler.acquire(PRIORITY_HOST, len(prompt) // 4 + 150)
+        # The probe slot and scheduler slot are held across yields, so the consumer may
+        # close this generator (client disconnect) before an outcome is recorded
+        probe = False
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Clean up markdown
-            result_text = re.sub(r'^```json\s*', '', result_text)
-            result_text = re.sub(r'^```\s*', '', result_text)
-            result_text = re.sub(r'\s*```$', '', result_text)
-            result_text = result_text.strip()
-            
-            import json
-            data = json.loads(result_text)
-            
-            return GenerateQuestionResponse(
-                text=data.get("text", "¿Qué te pareció el evento?"),
-                question_type=data.get("question_type", question_type),
-                options=data.get("options"),
-                reasoning=data.get("reasoning", "Generated question")
-            )
+            if not self.breaker.allow_request():
+                ai_metrics.record_error("question_stream", "circuit_open")
+                raise CircuitOpenError("Gemini circuit breaker is open")
+            probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+            
+            model_name, backend = self._model_for("question_stream")
+            stats = self.model_stats.setdefault(model_name, ModelCallStats())
+            stats.requests += 1
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    backend.generate_content_async(prompt, **kwargs),
+                    timeout=self.breaker.timeout_for("question")
+                )
+                stream = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            stream.__anext__(),
+                            timeout=self.breaker.timeout_for("question")
+                        )
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        chunks.append(chunk.text)
+                        yield "token", chunk.text
+            except asyncio.TimeoutError:
+                probe = False
+                self.breaker.record_failure("timeout")
+                stats.failures += 1
+                ai_metrics.record_error("question_stream", "timeout")
+                raise
+            except Exception as e:
+                reason = self._failure_reason(e)
+                probe = False
+                self.breaker.record_failure(reason)
+                stats.failures += 1
+                ai_metrics.record_error("question_stream", reason)
+                raise
+            
+            latency = time.perf_counter() - start
+            input_tokens, output_tokens = len(prompt) // 4, len("".join(chunks)) // 4
+            probe = False
+            self.breaker.record_success("question", latency)
+            stats.record(latency, input_tokens, output_tokens)
+            ai_metrics.record_call("question_stream", latency)
+            ai_metrics.record_tokens("question_stream", input_tokens, output_tokens)
+            try:
+                question = self._question_from_data(self._parse_json_response("".join(chunks)), question_type)
+            except (ValueError, TypeError, AttributeError):
+                self._record_output("question_stream", "parse_failures")
+                ai_metrics.record_error("question_stream", "parse")
+                raise
+            self._record_output("question_stream", "parsed")
+            ai_metrics.record_result("question_stream", "gemini")
+            self.question_cache.set(question_fingerprint(context, previous_questions, question_type), question)
         except Exception as e:
-            print(f"Error generating question: {e}")
-            # Fallback question
-            return GenerateQuestionResponse(
-                text="¿Qué aspecto del evento te resultó más interesante?",
-                question_type="open",
-                options=None,
-                reasoning="Fallback question"
-            )
+            print(f"Error streaming question: {type(e).__name__}: {e}")
+            ai_metrics.record_result("question_stream", "fallback")
+            question = self._fallback_question()
+        finally:
+            # Also runs on GeneratorExit / CancelledError, which skip the handlers above
+            if probe:
+                self.breaker.release_probe()
+            self.scheduler.release()
+        
+        yield "question", question
+    
+    async def _summarize(self, prompt: str, priority: int) -> str:
+        """Plain-text summary call shared by the map and reduce steps"""
+        response = await self._generate_content(
+            prompt,
+            operation="summary",
+            priority=priority,
+            expected_output_tokens=400
+        )
+        summary = (response.text or "").strip()
+        if not summary:
+            ai_metrics.record_error("summary", "parse")
+            raise ValueError("empty summary reply")
+        ai_metrics.record_result("summary", "gemini")
+        return summary
+    
+    async def summarize_responses(
+        self,
+        event_title: str,
+        responses: str,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> str:
+        """
+        Summarize a chunk of an event's responses
+        
+        There is no fallback: a canned text would be stored as if it were the
+        event's summary, so failures propagate to the caller.
+        
+        Args:
+            event_title: Title of the event
+            responses: Responses grouped under their questions, one per line
+            priority: Scheduling priority
+            
+        Returns:
+            Summary text in Spanish
+        """
+        prompt = (
+            f"These are audience answers from the Nybble Argentina event \"{event_title}\", grouped by "
+            "question and tagged with their sentiment. Write a concise summary in Spanish (at most 200 words) "
+            "of the main opinions, recurring themes, praise and criticism, and concrete suggestions. "
+            "Plain text, no preamble.\n"
+            f"{responses}"
+        )
+        return await self._summarize(prompt, priority)
+    
+    async def merge_summaries(
+        self,
+        event_title: str,
+        summaries: List[str],
+        priority: int = PRIORITY_BACKGROUND
+    ) -> str:
+        """
+        Merge partial summaries of an event's responses into one
+        
+        Args:
+            event_title: Title of the event
+            summaries: Summaries of disjoint sets of responses
+            priority: Scheduling priority
+            
+        Returns:
+            Summary text in Spanish
+        """
+        numbered = "\n\n".join(f"Resumen {index}:\n{summary}" for index, summary in enumerate(summaries, start=1))
+        prompt = (
+            f"These are partial summaries of the audience answers from the Nybble Argentina event \"{event_title}\", "
+            "each covering different answers. Merge them into one summary in Spanish (at most 250 words) of the "
+            "main opinions, recurring themes, praise and criticism, and concrete suggestions, weighting themes "
+            "by how often they appear. Plain text, no preamble.\n"
+            f"{numbered}"
+        )
+        return await self._summarize(prompt, priority)
+    
+    def get_stats(self) -> dict:
+        """Get Gemini call and batching metrics"""
+        backend = {"name": getattr(self.model, "name", type(self.model).__name__)}
+        if hasattr(self.model, "get_stats"):
+            backend.update(self.model.get_stats())
+        
+        return {
+            "backend": backend,
+            "models": {
+                "default": self.model_name,
+                "routes": dict(self.operation_models),
+                "by_model": {name: stats.get_stats() for name, stats in self.model_stats.items()},
+            },
+            "hedging": {
+                "enabled": self.hedge_enabled,
+                "percentile": self.hedge_percentile,
+                "hedge_model": self.hedge_model_name,
+                "sent": self.hedges_sent,
+                "skipped_no_capacity": self.hedges_skipped,
+            },
+            "scheduler": self.scheduler.get_stats(),
+            "sentiment_batching": self.sentiment_batcher.get_stats(),
+            "sentiment_cache": self.sentiment_cache.get_stats(),
+            "question_cache": self.question_cache.get_stats(),
+            "sentiment_classifier": self.sentiment_classifier.get_stats(),
+            "circuit_breaker": self.breaker.get_stats(),
+            "structured_output": {
+                "enabled": self.structured_output,
+                "by_operation": {
+                    operation: {
+                        **stats,
+                        "parse_failure_rate": round(
+                            stats["parse_failures"] / (stats["parsed"] + stats["parse_failures"]), 3
+                        ) if stats["parsed"] + stats["parse_failures"] else None,
+                        "avg_output_tokens": round(stats["output_tokens"] / stats["parsed"], 1)
+                        if stats["parsed"] and stats["output_tokens"] else None,
+                    }
+                    for operation, stats in self.output_stats.items()
+                },
+            },
+        }
     
     async def extract_mentions(self, text: str) -> List[str]:
         """
@@ -230,6 +1283,20 @@ class GeminiService:
         return mentions
 
 
-# Singleton instance
-gemini_service = GeminiService()
+# Singleton instance, constructed on first use so that importing this module
+# (app boot, Alembic, scripts) neither loads the SDK nor requires an API key
+_gemini_service: Optional[GeminiService] = None
+
+
+def get_gemini_service() -> GeminiService:
+    """
+    Get the shared GeminiService, creating it on first call
+    
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set
+    """
+    global _gemini_service
+    if _gemini_service is None:
+        _gemini_service = GeminiService()
+    return _gemini_service
 
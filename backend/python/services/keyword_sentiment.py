@@ -0,0 +1,135 @@
+"""
+Keyword sentiment used when neither Gemini nor the local classifier can answer
+
+All keywords are compiled into one regular expression over accent-folded text
+(a prefix trie anchored on word boundaries), so a text is scanned
+once instead of once per keyword, "no" no longer matches inside "bueno", and
+"util" matches "útil". analyze_batch() scores many texts at once, scanning
+repeated answers ("Sí", "Excelente") only once.
+
+Folding uses two regex substitutions instead of normalize_text()'s
+per-character filter, which alone took longer than the old substring scan.
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+from schemas import SentimentAnalysisResponse
+from services.sentiment_cache import normalize_text
+
+
+POSITIVE_KEYWORDS = (
+    'excelente', 'genial', 'bueno', 'útil', 'claro', 'interesante',
+    'me encanta', 'definitivamente', 'sí', 'perfecto', 'increíble',
+    'fantástico', 'maravilloso', 'great', 'excellent', 'amazing'
+)
+NEGATIVE_KEYWORDS = (
+    'confuso', 'difícil', 'no entendí', 'malo', 'aburrido', 'no',
+    'complicado', 'terrible', 'horrible', 'bad', 'difficult', 'boring'
+)
+
+
+# Combining mark blocks (what NFKD splits accents into) and everything else non-ASCII
+_COMBINING_MARKS = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents; other non-ASCII characters become spaces"""
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered
+    # "—", "…", "¿"... become spaces so the words around them stay apart
+    return _NON_ASCII.sub(" ", _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", lowered)))
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Regex alternation built from a prefix trie of the keywords
+
+    re tries alternatives one by one, so shared prefixes are factored out
+    ("no|no entendi" becomes "no(?:[ \\t]+entendi)?"); greedy optional
+    suffixes make the longest keyword win at any position.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            (r"[ \t]+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordSentimentMatcher:
+    """Single-pass, word-boundary keyword matcher over accent-folded text"""
+
+    def __init__(self, positive: Iterable[str] = POSITIVE_KEYWORDS, negative: Iterable[str] = NEGATIVE_KEYWORDS):
+        self.polarity: Dict[str, int] = {}
+        for keyword in positive:
+            self.polarity[normalize_text(keyword)] = 1
+        for keyword in negative:
+            self.polarity[normalize_text(keyword)] = -1
+
+        self.pattern = re.compile(r"(?<!\w)" + _trie_pattern(self.polarity) + r"(?!\w)")
+
+    def count(self, text: str) -> Tuple[int, int]:
+        """(positive, negative) keyword matches in a text"""
+        positive = negative = 0
+        for match in self.pattern.finditer(fold(text)):
+            if self._polarity_of(match.group()) > 0:
+                positive += 1
+            else:
+                negative += 1
+        return positive, negative
+
+    def count_batch(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """(positive, negative) matches for each text; repeated texts are scanned once"""
+        counts = {text: self.count(text) for text in dict.fromkeys(texts)}
+        return [counts[text] for text in texts]
+
+    def _polarity_of(self, matched: str) -> int:
+        polarity = self.polarity.get(matched)
+        if polarity is None:
+            # A multi-word keyword matched with extra whitespace
+            polarity = self.polarity[" ".join(matched.split())]
+        return polarity
+
+    @staticmethod
+    def _result(positive: int, negative: int) -> SentimentAnalysisResponse:
+        if positive > negative:
+            sentiment = "positive"
+            score = min(0.7, 0.3 + (positive * 0.1))
+        elif negative > positive:
+            sentiment = "negative"
+            score = max(-0.7, -0.3 - (negative * 0.1))
+        else:
+            sentiment = "neutral"
+            score = 0.0
+
+        return SentimentAnalysisResponse(
+            sentiment=sentiment,
+            score=score,
+            confidence=0.6,
+            source="fallback"
+        )
+
+    def analyze(self, text: str) -> SentimentAnalysisResponse:
+        """Keyword sentiment of one text"""
+        return self._result(*self.count(text))
+
+    def analyze_batch(self, texts: List[str]) -> List[SentimentAnalysisResponse]:
+        """Keyword sentiment of many texts, in order"""
+        return [self._result(*counts) for counts in self.count_batch(texts)]
+
+
+keyword_sentiment = KeywordSentimentMatcher()
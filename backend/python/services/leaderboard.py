@@ -0,0 +1,292 @@
+"""
+Leaderboard Service for incremental per-event rankings
+
+Each event's participants are kept in memory as a list sorted by
+(-points, participant id), maintained with bisect: a points change moves one
+entry instead of re-ranking the whole event, and a participant's position is
+one binary search away. Boards are loaded from the database the first time an
+event is touched (live events are loaded at startup).
+
+`rank_position` in the database is persisted lazily: every
+LEADERBOARD_FLUSH_SECONDS the positions that changed since the last flush are
+written in one bulk UPDATE. Reads that need an exact position ask
+the board.
+
+Equal points are positioned like RANKING_TIES does for the window functions
+used by the rankings pages: `row_number` (default) breaks ties by participant
+id (earlier joiners first), `rank` gives 1, 2, 2, 4 and `dense` 1, 2, 2, 3.
+Boards live in one process; with several workers, use RANKING_STRATEGY=window
+(or full).
+"""
+import asyncio
+import os
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Event, Participant
+
+
+PRELOADED_EVENT_STATUSES = ("live",)
+
+# Core executemany: participants deleted since the snapshot are skipped instead
+# of failing the batch like an ORM bulk UPDATE by primary key would
+_UPDATE_RANK = update(Participant.__table__).where(
+    Participant.__table__.c.id == bindparam("participant_id")
+).values(rank_position=bindparam("position"))
+
+
+TIE_MODES = ("row_number", "rank", "dense")
+
+
+class EventLeaderboard:
+    """Participants of one event sorted by points (highest first)"""
+
+    def __init__(self, entries: Iterable[Tuple[int, int]] = (), ties: str = "row_number"):
+        """
+        Args:
+            entries: (participant id, points) pairs
+            ties: How equal points are positioned ("row_number", "rank" or "dense")
+        """
+        if ties not in TIE_MODES:
+            raise ValueError(f"ties must be one of: {', '.join(TIE_MODES)}")
+        self.ties = ties
+        self._points: Dict[int, int] = dict(entries)
+        self._keys: List[Tuple[int, int]] = sorted((-points, pid) for pid, points in self._points.items())
+        # Distinct scores (negated, sorted) and how many participants have each, for dense positions
+        self._score_counts: Dict[int, int] = {}
+        for points in self._points.values():
+            self._score_counts[-points] = self._score_counts.get(-points, 0) + 1
+        self._scores: List[int] = sorted(self._score_counts)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, participant_id: int) -> bool:
+        return participant_id in self._points
+
+    def set(self, participant_id: int, points: int):
+        """Add a participant or move them to their new score"""
+        old = self._points.get(participant_id)
+        if old == points:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, participant_id))]
+            self._score_counts[-old] -= 1
+            if not self._score_counts[-old]:
+                del self._score_counts[-old]
+                del self._scores[bisect_left(self._scores, -old)]
+        self._points[participant_id] = points
+        insort(self._keys, (-points, participant_id))
+        if -points not in self._score_counts:
+            self._score_counts[-points] = 0
+            insort(self._scores, -points)
+        self._score_counts[-points] += 1
+
+    def _position(self, neg_points: int, participant_id: int) -> int:
+        if self.ties == "rank":
+            # (-points,) sorts before every (-points, id): the first participant with this score
+            return bisect_left(self._keys, (neg_points,)) + 1
+        if self.ties == "dense":
+            return bisect_left(self._scores, neg_points) + 1
+        return bisect_left(self._keys, (neg_points, participant_id)) + 1
+
+    def rank(self, participant_id: int) -> Optional[int]:
+        """1-based position of a participant, or None if not on the board"""
+        points = self._points.get(participant_id)
+        if points is None:
+            return None
+        return self._position(-points, participant_id)
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, int, int]]:
+        """(position, participant id, points) of a page of the board"""
+        return [
+            (self._position(neg_points, pid), pid, -neg_points)
+            for neg_points, pid in self._keys[offset:offset + limit]
+        ]
+
+    def positions(self) -> Dict[int, int]:
+        """Position of every participant"""
+        positions, position, previous = {}, 0, None
+        for index, (neg_points, pid) in enumerate(self._keys, start=1):
+            if self.ties == "row_number":
+                position = index
+            elif neg_points != previous:
+                position = index if self.ties == "rank" else position + 1
+            previous = neg_points
+            positions[pid] = position
+        return positions
+
+
+class LeaderboardService:
+    """In-memory leaderboards per event with lazy, batched rank persistence"""
+
+    def __init__(self):
+        self.flush_interval = float(os.getenv("LEADERBOARD_FLUSH_SECONDS", "2"))
+        self.ties = os.getenv("RANKING_TIES", "row_number")
+
+        self._boards: Dict[int, EventLeaderboard] = {}
+        self._persisted: Dict[int, Dict[int, Optional[int]]] = {}  # event -> participant -> stored rank_position
+        self._dirty: Set[int] = set()
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.loads = 0
+        self.updates = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+        self.last_flush_seconds: Optional[float] = None
+
+    async def start(self):
+        """Load live events and start the background rank writer"""
+        if self._flusher is not None or SessionLocal is None:
+            return
+        await asyncio.to_thread(self._preload)
+        self._flusher = asyncio.create_task(self._flush_loop())
+        print(f"✅ Leaderboards loaded for {len(self._boards)} live events")
+
+    async def stop(self):
+        """Stop the writer and persist outstanding positions"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if SessionLocal is not None:
+            await self.flush()
+
+    def _preload(self):
+        db = SessionLocal()
+        try:
+            event_ids = db.execute(select(Event.id).where(Event.status.in_(PRELOADED_EVENT_STATUSES))).scalars().all()
+            for event_id in event_ids:
+                self.board(db, event_id)
+        finally:
+            db.close()
+
+    def board(self, db: Session, event_id: int) -> EventLeaderboard:
+        """An event's leaderboard, loaded from the database on first use"""
+        board = self._boards.get(event_id)
+        if board is None:
+            rows = db.execute(
+                select(Participant.id, Participant.points, Participant.rank_position).where(Participant.event_id == event_id)
+            ).all()
+            board = EventLeaderboard(((pid, points) for pid, points, _ in rows), ties=self.ties)
+            self._boards[event_id] = board
+            self._persisted[event_id] = {pid: rank for pid, _, rank in rows}
+            self.loads += 1
+            # Positions stored by an older process may not match
+            if board.positions() != self._persisted[event_id]:
+                self._dirty.add(event_id)
+        return board
+
+    def update(self, db: Session, participant: Participant):
+        """
+        Record a participant's (committed) points
+
+        Args:
+            db: Database session, used to load the board and, when the background
+                writer is not running (scripts, tests), to persist positions right away
+            participant: Participant whose points changed, or who just joined
+        """
+        self.board(db, participant.event_id).set(participant.id, participant.points)
+        self._dirty.add(participant.event_id)
+        self.updates += 1
+        if self._flusher is None:
+            self._flush_event(db, participant.event_id)
+
+    def rank(self, db: Session, participant: Participant) -> Optional[int]:
+        """Current position of a participant"""
+        return self.board(db, participant.event_id).rank(participant.id)
+
+    def invalidate(self, event_id: int):
+        """Forget an event's board (it is reloaded on next use), e.g. after a bulk change"""
+        self._boards.pop(event_id, None)
+        self._persisted.pop(event_id, None)
+        self._dirty.discard(event_id)
+
+    def _changed_positions(self, event_id: int) -> List[dict]:
+        persisted = self._persisted.get(event_id, {})
+        return [
+            {"participant_id": pid, "position": position}
+            for pid, position in self._boards[event_id].positions().items()
+            if persisted.get(pid) != position
+        ]
+
+    def _mark_persisted(self, event_id: int, rows: List[dict]):
+        persisted = self._persisted.get(event_id)
+        if persisted is not None:
+            persisted.update((row["participant_id"], row["position"]) for row in rows)
+        self.rows_written += len(rows)
+
+    def _flush_event(self, db: Session, event_id: int):
+        """Write an event's changed positions with the caller's session and commit"""
+        self._dirty.discard(event_id)
+        changed = self._changed_positions(event_id)
+        if changed:
+            db.execute(_UPDATE_RANK, changed)
+            db.commit()
+            self._mark_persisted(event_id, changed)
+        self.flushes += 1
+
+    @staticmethod
+    def _write(rows: List[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(_UPDATE_RANK, rows)
+            db.commit()
+        finally:
+            db.close()
+
+    async def flush(self):
+        """Persist the changed positions of every dirty event in one bulk UPDATE"""
+        # Snapshot on the event loop; only the write runs in a thread
+        changes = {
+            event_id: self._changed_positions(event_id)
+            for event_id in self._dirty if event_id in self._boards
+        }
+        self._dirty.clear()
+        rows = [row for event_rows in changes.values() for row in event_rows]
+        if not rows:
+            return
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception:
+            self._dirty.update(changes)
+            raise
+        for event_id, event_rows in changes.items():
+            self._mark_persisted(event_id, event_rows)
+        self.flushes += 1
+        self.last_flush_seconds = time.perf_counter() - start
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.flush_errors += 1
+                print(f"⚠️ Leaderboard flush failed: {e}")
+
+    def get_stats(self) -> dict:
+        """Get board sizes and persistence counters"""
+        return {
+            "events_loaded": len(self._boards),
+            "participants": sum(len(board) for board in self._boards.values()),
+            "dirty_events": len(self._dirty),
+            "flush_interval_seconds": self.flush_interval,
+            "loads": self.loads,
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 1) if self.last_flush_seconds is not None else None,
+        }
+
+
+# Singleton instance
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,121 @@
+"""
+Memoization of generated questions
+
+A host clicking "generate" twice for the same event state gets the same
+question instead of paying for a second Gemini call. Entries are keyed by a
+fingerprint of the normalized inputs (context, question type and the previous
+questions that actually go into the prompt) and expire after a TTL.
+
+Previous questions are deduplicated and trimmed before both fingerprinting and
+prompting: near-duplicates (word-set Jaccard similarity at or above
+QUESTION_DEDUPE_SIMILARITY) are dropped and only the most recent
+QUESTION_PROMPT_MAX_PREVIOUS distinct questions are kept, so the prompt stays
+bounded as an event accumulates questions.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import List, Optional
+from schemas import GenerateQuestionResponse
+from services.cache import LRUCache
+from services.sentiment_cache import normalize_text
+
+
+_WORD = re.compile(r"\w+")
+
+
+def word_set(text: str) -> frozenset:
+    """Distinct words of a text, normalized (case, accents, punctuation ignored)"""
+    return frozenset(_WORD.findall(normalize_text(text)))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def select_previous_questions(questions: List[str], max_questions: int, similarity: float) -> List[str]:
+    """
+    Most recent distinct previous questions, oldest first
+
+    Walks the list from the newest question back, skipping any that is a
+    near-duplicate of one already kept, until `max_questions` are kept.
+
+    Args:
+        questions: Previous questions, oldest first
+        max_questions: How many to keep (0 keeps none)
+        similarity: Jaccard similarity at or above which two questions count as duplicates
+
+    Returns:
+        The kept questions in their original order
+    """
+    kept, kept_words = [], []
+    for question in reversed(questions or []):
+        if len(kept) >= max_questions:
+            break
+        words = word_set(question)
+        if not words or any(jaccard(words, other) >= similarity for other in kept_words):
+            continue
+        kept.append(question.strip())
+        kept_words.append(words)
+    kept.reverse()
+    return kept
+
+
+def question_fingerprint(context: str, previous_questions: List[str], question_type: str) -> str:
+    """Key of a question request: SHA-256 of its normalized inputs (previous questions order-insensitive)"""
+    payload = json.dumps(
+        [normalize_text(context or ""), question_type, sorted(normalize_text(q) for q in previous_questions)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class QuestionCache:
+    """Bounded, expiring memo of generated questions"""
+
+    def __init__(self):
+        self.memory = LRUCache(
+            max_size=int(os.getenv("QUESTION_CACHE_SIZE", "500")),
+            ttl_seconds=float(os.getenv("QUESTION_CACHE_TTL_SECONDS", "900"))
+        )
+        self.max_previous = int(os.getenv("QUESTION_PROMPT_MAX_PREVIOUS", "15"))
+        self.similarity = float(os.getenv("QUESTION_DEDUPE_SIMILARITY", "0.7"))
+
+        # Metrics
+        self.bypassed = 0
+        self.previous_questions_in = 0
+        self.previous_questions_kept = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.max_size > 0
+
+    def previous_questions(self, questions: Optional[List[str]]) -> List[str]:
+        """Previous questions that go into the prompt (deduplicated and trimmed)"""
+        kept = select_previous_questions(questions or [], self.max_previous, self.similarity)
+        self.previous_questions_in += len(questions or [])
+        self.previous_questions_kept += len(kept)
+        return kept
+
+    def get(self, key: str) -> Optional[GenerateQuestionResponse]:
+        if not self.enabled:
+            return None
+        return self.memory.get(key)
+
+    def set(self, key: str, question: GenerateQuestionResponse):
+        """Remember a generated question (callers must not store fallback questions)"""
+        self.memory.set(key, question)
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters and how much previous-question trimming saves"""
+        return {
+            **self.memory.get_stats(),
+            "bypassed": self.bypassed,
+            "max_previous_questions": self.max_previous,
+            "dedupe_similarity": self.similarity,
+            "previous_questions_in": self.previous_questions_in,
+            "previous_questions_kept": self.previous_questions_kept,
+        }
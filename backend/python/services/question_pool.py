@@ -0,0 +1,250 @@
+"""
+Question Pool Service for instant AI question suggestions
+
+A background producer keeps a few pre-generated candidate questions ready for
+every live or upcoming event, built from the event title and the questions the
+event already has. POST /api/questions/generate then serves a candidate from
+the pool without waiting on Gemini, and the pool is topped up asynchronously.
+Pools are invalidated whenever a question is added to or deleted from the event.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from database import SessionLocal
+from models import Event, Question
+from schemas import GenerateQuestionResponse
+from services.ai_metrics import ai_metrics, set_event
+from services.gemini_service import FALLBACK_QUESTION_REASONING, PRIORITY_BACKGROUND, get_gemini_service
+from services.sentiment_cache import normalize_text
+
+
+POOLED_EVENT_STATUSES = ("live", "upcoming")
+
+
+class QuestionPoolService:
+    """Per-event pools of pre-generated questions with a background producer"""
+
+    def __init__(self):
+        self.pool_size = int(os.getenv("QUESTION_POOL_SIZE", "3"))  # 0 disables the pool
+        self.scan_interval = float(os.getenv("QUESTION_POOL_SCAN_SECONDS", "30"))
+
+        self._pools: Dict[int, Deque[GenerateQuestionResponse]] = {}
+        self._versions: Dict[int, int] = {}
+        self._refilling: Dict[int, asyncio.Task] = {}
+        self._producer: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.discarded_stale = 0
+        self.last_refill_seconds: Optional[float] = None
+        self.max_refill_seconds = 0.0
+        self._refill_seconds_sum = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.pool_size > 0
+
+    async def start(self):
+        """Start the background producer (no-op when the pool is disabled)"""
+        if not self.enabled or self._producer is not None or SessionLocal is None:
+            return
+        self._producer = asyncio.create_task(self._producer_loop())
+        print(f"✅ Question pool producer started ({self.pool_size} questions per event)")
+
+    async def stop(self):
+        """Cancel the producer and any refills in progress"""
+        tasks = list(self._refilling.values())
+        if self._producer is not None:
+            tasks.append(self._producer)
+            self._producer = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refilling = {}
+
+    def take(self, event: Event, context: str, previous_questions: List[str]) -> Optional[GenerateQuestionResponse]:
+        """
+        Pop a pooled question for an event and schedule a refill
+
+        Only requests for the event's own context (empty or the event title) can be
+        served from the pool; candidates matching a previous question are skipped.
+
+        Args:
+            event: Event the question is for
+            context: Context requested by the host
+            previous_questions: Questions the host wants to avoid repeating
+
+        Returns:
+            A pooled question, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        if context and context.strip() != event.title.strip():
+            self.misses += 1
+            return None
+
+        pool = self._pools.get(event.id)
+        avoid = {normalize_text(q) for q in previous_questions or []}
+        question = None
+        while pool:
+            candidate = pool.popleft()
+            if normalize_text(candidate.text) not in avoid:
+                question = candidate
+                break
+            self.discarded_stale += 1
+
+        if question is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            ai_metrics.record_result("question", "pool")
+
+        self.schedule_refill(event.id)
+        return question
+
+    def invalidate(self, event_id: int):
+        """Drop an event's pool (its questions changed) and regenerate it"""
+        if not self.enabled:
+            return
+        self.invalidations += 1
+        self._pools.pop(event_id, None)
+        # Results of a refill already in flight were built from the old questions
+        self._versions[event_id] = self._versions.get(event_id, 0) + 1
+        refill = self._refilling.pop(event_id, None)
+        if refill is not None:
+            refill.cancel()
+        self.schedule_refill(event_id)
+
+    def schedule_refill(self, event_id: int):
+        """Top an event's pool up in the background unless a refill is already running"""
+        if not self.enabled or event_id in self._refilling:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._refill(event_id))
+        except RuntimeError:
+            return  # No running loop (e.g. called from a script)
+        self._refilling[event_id] = task
+        task.add_done_callback(lambda done: self._refill_done(event_id, done))
+
+    def _refill_done(self, event_id: int, task: asyncio.Task):
+        # An invalidation may already have replaced this refill with a new one
+        if self._refilling.get(event_id) is task:
+            del self._refilling[event_id]
+
+    async def _refill(self, event_id: int):
+        """Generate questions until the event's pool is full"""
+        version = self._versions.get(event_id, 0)
+        set_event(event_id)
+        event_title, existing_questions = await asyncio.to_thread(self._load_event, event_id)
+        if event_title is None:
+            self._pools.pop(event_id, None)
+            return
+
+        pool = self._pools.setdefault(event_id, deque())
+        missing = self.pool_size - len(pool)
+        if missing <= 0:
+            return
+
+        start = time.perf_counter()
+        try:
+            for _ in range(missing):
+                generated = await get_gemini_service().generate_question(
+                    context=event_title,
+                    previous_questions=existing_questions + [q.text for q in pool],
+                    question_type="open",
+                    priority=PRIORITY_BACKGROUND,
+                    # Every pooled candidate must be a new question
+                    force_fresh=True
+                )
+                if self._versions.get(event_id, 0) != version:
+                    return  # Invalidated while we were generating
+                if generated.reasoning == FALLBACK_QUESTION_REASONING:
+                    self.refill_errors += 1
+                    return  # Gemini unavailable; try again on the next scan
+                pool.append(generated)
+        except Exception as e:
+            self.refill_errors += 1
+            print(f"⚠️ Question pool refill failed for event {event_id}: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            self.refills += 1
+            self.last_refill_seconds = elapsed
+            self.max_refill_seconds = max(self.max_refill_seconds, elapsed)
+            self._refill_seconds_sum += elapsed
+
+    @staticmethod
+    def _load_event(event_id: int):
+        """Get the title and existing question texts of a pooled event"""
+        db = SessionLocal()
+        try:
+            event = db.query(Event).filter(
+                Event.id == event_id,
+                Event.status.in_(POOLED_EVENT_STATUSES)
+            ).first()
+            if not event:
+                return None, []
+            questions = db.query(Question.text).filter(
+                Question.event_id == event_id
+            ).order_by(Question.order).all()
+            return event.title, [text for (text,) in questions]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _pooled_event_ids() -> List[int]:
+        db = SessionLocal()
+        try:
+            rows = db.query(Event.id).filter(Event.status.in_(POOLED_EVENT_STATUSES)).all()
+            return [event_id for (event_id,) in rows]
+        finally:
+            db.close()
+
+    async def _producer_loop(self):
+        """Keep a pool for every live/upcoming event and drop the others"""
+        while True:
+            try:
+                event_ids = await asyncio.to_thread(self._pooled_event_ids)
+                for event_id in set(self._pools) - set(event_ids):
+                    del self._pools[event_id]
+                for event_id in event_ids:
+                    if len(self._pools.get(event_id, ())) < self.pool_size:
+                        self.schedule_refill(event_id)
+            except Exception as e:
+                print(f"⚠️ Question pool scan failed: {e}")
+            await asyncio.sleep(self.scan_interval)
+
+    def get_stats(self) -> dict:
+        """
+        Get pool hit rate and refill latency
+
+        Returns:
+            Dict with hit/miss counters, refill timings and pool sizes per event
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "pool_size": self.pool_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+            "discarded_stale": self.discarded_stale,
+            "refills": self.refills,
+            "refill_errors": self.refill_errors,
+            "refills_in_progress": len(self._refilling),
+            "last_refill_seconds": self.last_refill_seconds,
+            "avg_refill_seconds": self._refill_seconds_sum / self.refills if self.refills else None,
+            "max_refill_seconds": self.max_refill_seconds,
+            "pooled_questions": {event_id: len(pool) for event_id, pool in self._pools.items()},
+        }
+
+
+# Singleton instance
+question_pool_service = QuestionPoolService()
@@ -0,0 +1,155 @@
+"""
+Sentiment and quality scoring for participant responses
+
+Quick-option answers are looked up in the per-question option analysis that is
+computed once when the question is created, and rating answers map
+deterministically from the star rating. Only free-text answers reach Gemini;
+without a configured Gemini service they get keyword sentiment instead.
+"""
+import asyncio
+from typing import List, Optional, Tuple
+from models import Question
+from schemas import SentimentAnalysisResponse
+from services.gemini_service import (
+    PRIORITY_HOST, PRIORITY_PARTICIPANT, get_gemini_service, heuristic_quality_score
+)
+from services.keyword_sentiment import keyword_sentiment
+
+
+OPTION_QUESTION_TYPES = ("quick_options", "multiple_choice")
+
+
+def rating_sentiment(rating: int) -> SentimentAnalysisResponse:
+    """Map a 1-5 star rating to a sentiment (1-2 negative, 3 neutral, 4-5 positive)"""
+    if rating >= 4:
+        sentiment = "positive"
+    elif rating <= 2:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+
+    return SentimentAnalysisResponse(
+        sentiment=sentiment,
+        score=(rating - 3) / 2,
+        confidence=1.0,
+        source="rating"
+    )
+
+
+def lookup_option_analysis(question: Question, text: str) -> Optional[dict]:
+    """Get the precomputed analysis for a quick-option answer, if any"""
+    if not question.option_analysis:
+        return None
+    return question.option_analysis.get(text.strip())
+
+
+def has_precomputed_analysis(
+    question: Question,
+    text: str,
+    rating: Optional[int],
+    is_quick_option: bool
+) -> bool:
+    """Whether a response can be scored without calling Gemini"""
+    if rating is not None:
+        return True
+    return is_quick_option and lookup_option_analysis(question, text) is not None
+
+
+async def analyze_response(
+    question: Question,
+    text: str,
+    rating: Optional[int],
+    is_quick_option: bool,
+    priority: int = PRIORITY_PARTICIPANT
+) -> Tuple[SentimentAnalysisResponse, float]:
+    """
+    Score a response's sentiment and quality
+
+    Args:
+        question: Question being answered
+        text: Response text
+        rating: Star rating for rating questions
+        is_quick_option: Whether the text is one of the question's options
+        priority: Scheduling priority for any Gemini call
+
+    Returns:
+        Tuple of (sentiment analysis, quality score)
+    """
+    if is_quick_option:
+        option = lookup_option_analysis(question, text)
+        if option is not None:
+            sentiment = SentimentAnalysisResponse(
+                sentiment=option["sentiment"],
+                score=option["score"],
+                confidence=option["confidence"],
+                source="option"
+            )
+            return sentiment, option["quality_score"]
+
+    if rating is not None:
+        return rating_sentiment(rating), heuristic_quality_score(text)
+
+    try:
+        gemini_service = get_gemini_service()
+    except ValueError:
+        # Gemini is not configured: score like an open breaker would
+        return keyword_sentiment.analyze(text), heuristic_quality_score(text)
+
+    quality = gemini_service.calculate_quality_score(
+        text=text,
+        question_text=question.text
+    )
+
+    # Sentiment and quality are independent: score them concurrently
+    sentiment, quality_score = await asyncio.gather(
+        gemini_service.analyze_sentiment(text, priority=priority),
+        quality
+    )
+
+    return sentiment, quality_score
+
+
+async def analyze_question_options(question_text: str, options: List[str]) -> Optional[dict]:
+    """
+    Precompute sentiment and quality for every option of a question
+
+    Options are analyzed concurrently, so they share a single batched Gemini
+    prompt, scheduled ahead of participant traffic since the host is waiting
+    on it. Options that only got a fallback result are left out and will be
+    analyzed normally when answered.
+
+    Args:
+        question_text: The question text
+        options: The question's fixed options
+
+    Returns:
+        Dict mapping option text to its sentiment, score, confidence and quality
+        score, or None if Gemini is not configured (answers are scored normally)
+    """
+    options = list(dict.fromkeys(option.strip() for option in options if option and option.strip()))
+    try:
+        gemini_service = get_gemini_service()
+    except ValueError as e:
+        print(f"⚠️  Skipping option analysis: {e}")
+        return None
+
+    sentiments, quality_scores = await asyncio.gather(
+        asyncio.gather(*(gemini_service.analyze_sentiment(option, priority=PRIORITY_HOST) for option in options)),
+        asyncio.gather(*(
+            gemini_service.calculate_quality_score(text=option, question_text=question_text)
+            for option in options
+        ))
+    )
+
+    analysis = {}
+    for option, sentiment, quality_score in zip(options, sentiments, quality_scores):
+        if sentiment.source not in ("gemini", "classifier"):
+            continue
+        analysis[option] = {
+            "sentiment": sentiment.sentiment,
+            "score": sentiment.score,
+            "confidence": sentiment.confidence,
+            "quality_score": quality_score,
+        }
+
+    return analysis
@@ -0,0 +1,218 @@
+"""
+Content-addressed cache for sentiment analysis results
+
+Texts are normalized (lowercased, accent-folded, whitespace-collapsed) and
+hashed, so "Excelente  charla" and "excelente charla" share one entry. A
+per-process LRU tier sits in front of an optional persistent tier (SQLite file
+or Postgres table) that survives restarts and is shared across workers.
+
+Only authoritative results (source == "gemini") should be stored here; keyword
+fallback results are never cached.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from schemas import SentimentAnalysisResponse
+from services.cache import LRUCache
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", folded).strip()
+
+
+def cache_key(text: str) -> str:
+    """Content address of a text: SHA-256 of its normalized form"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class SqliteSentimentStore:
+    """Persistent tier backed by a local SQLite file"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                key TEXT PRIMARY KEY,
+                sentiment TEXT NOT NULL,
+                score REAL NOT NULL,
+                confidence REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sentiment, score, confidence FROM sentiment_cache WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"sentiment": row[0], "score": row[1], "confidence": row[2]}
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sentiment_cache (key, sentiment, score, confidence, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value["sentiment"], value["score"], value["confidence"], time.time()),
+            )
+            self._conn.commit()
+
+
+class PostgresSentimentStore:
+    """Persistent tier backed by the sentiment_cache table in the app database"""
+
+    name = "postgres"
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[dict]:
+        from database import SessionLocal
+        from models import SentimentCacheEntry
+
+        db = SessionLocal()
+        try:
+            entry = db.query(SentimentCacheEntry).filter(
+                SentimentCacheEntry.key == key,
+                SentimentCacheEntry.created_at > datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+            ).first()
+            if entry is None:
+                return None
+            return {"sentiment": entry.sentiment, "score": entry.score, "confidence": entry.confidence}
+        finally:
+            db.close()
+
+    def set(self, key: str, value: dict):
+        from sqlalchemy.dialects.postgresql import insert
+        from database import SessionLocal
+        from models import SentimentCacheEntry
+
+        db = SessionLocal()
+        try:
+            statement = insert(SentimentCacheEntry).values(key=key, **value)
+            statement = statement.on_conflict_do_update(
+                index_elements=[SentimentCacheEntry.key],
+                set_={
+                    "sentiment": statement.excluded.sentiment,
+                    "score": statement.excluded.score,
+                    "confidence": statement.excluded.confidence,
+                    "created_at": datetime.now(timezone.utc),
+                },
+            )
+            db.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+
+class SentimentCache:
+    """Two-tier (memory LRU + optional persistent store) sentiment cache"""
+
+    def __init__(self):
+        ttl_seconds = float(os.getenv("SENTIMENT_CACHE_TTL_SECONDS", "86400"))
+        self.memory = LRUCache(
+            max_size=int(os.getenv("SENTIMENT_CACHE_SIZE", "10000")),
+            ttl_seconds=ttl_seconds
+        )
+
+        backend = os.getenv("SENTIMENT_CACHE_BACKEND", "memory")  # memory, sqlite, postgres
+        self.store = None
+        if backend == "sqlite":
+            self.store = SqliteSentimentStore(
+                path=os.getenv("SENTIMENT_CACHE_SQLITE_PATH", "sentiment_cache.sqlite3"),
+                ttl_seconds=ttl_seconds
+            )
+        elif backend == "postgres":
+            self.store = PostgresSentimentStore(ttl_seconds=ttl_seconds)
+
+        # Metrics
+        self.store_hits = 0
+        self.store_errors = 0
+        self.writes = 0
+        self.rejected_non_authoritative = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.max_size > 0
+
+    async def get(self, text: str) -> Optional[SentimentAnalysisResponse]:
+        """Look a text up in memory, then in the persistent store"""
+        if not self.enabled:
+            return None
+
+        key = cache_key(text)
+        value = self.memory.get(key)
+        if value is None and self.store is not None:
+            try:
+                value = await asyncio.to_thread(self.store.get, key)
+            except Exception as e:
+                self.store_errors += 1
+                print(f"⚠️ Sentiment cache store read failed: {e}")
+            if value is not None:
+                self.store_hits += 1
+                self.memory.set(key, value)
+
+        if value is None:
+            return None
+        return SentimentAnalysisResponse(source="gemini", **value)
+
+    async def set(self, text: str, result: SentimentAnalysisResponse):
+        """Store an authoritative Gemini result (fallback results are rejected)"""
+        if not self.enabled:
+            return
+        if result.source != "gemini":
+            self.rejected_non_authoritative += 1
+            return
+
+        key = cache_key(text)
+        value = {"sentiment": result.sentiment, "score": result.score, "confidence": result.confidence}
+        self.memory.set(key, value)
+        self.writes += 1
+
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.set, key, value)
+            except Exception as e:
+                self.store_errors += 1
+                print(f"⚠️ Sentiment cache store write failed: {e}")
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters for both tiers"""
+        memory_stats = self.memory.get_stats()
+        hits = memory_stats["hits"] + self.store_hits
+        lookups = memory_stats["hits"] + memory_stats["misses"]
+        return {
+            "backend": self.store.name if self.store else "memory",
+            "memory": memory_stats,
+            "store_hits": self.store_hits,
+            "store_errors": self.store_errors,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "writes": self.writes,
+            "rejected_non_authoritative": self.rejected_non_authoritative,
+        }
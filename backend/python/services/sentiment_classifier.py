@@ -0,0 +1,244 @@
+"""
+Local sentiment classifier served in-process as the first sentiment tier
+
+A multinomial naive Bayes model over accent-folded Spanish unigrams and
+bigrams, trained offline (train_sentiment_classifier.py) from the sentiment
+labels Gemini already produced for past free-text responses. Texts it
+classifies with at least SENTIMENT_CLASSIFIER_THRESHOLD confidence never reach
+Gemini; the rest escalate as before, as do texts with fewer than
+SENTIMENT_CLASSIFIER_MIN_TOKENS tokens seen in training, whose "prediction"
+would only be the label distribution of the training data.
+"""
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from schemas import SentimentAnalysisResponse
+from services.sentiment_cache import normalize_text
+
+
+LABELS = ("positive", "negative", "neutral")
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Accent-folded unigrams plus bigrams (bigrams keep "no me gustó" apart from "me gustó")"""
+    words = _TOKEN.findall(normalize_text(text))
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesSentimentClassifier:
+    """Multinomial naive Bayes with Laplace smoothing"""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.doc_counts: Dict[str, int] = {label: 0 for label in LABELS}
+        self.token_counts: Dict[str, Counter] = {label: Counter() for label in LABELS}
+        self.token_totals: Dict[str, int] = {label: 0 for label in LABELS}
+        self.vocabulary: set = set()
+        self.trained_at: Optional[float] = None
+
+    @property
+    def samples(self) -> int:
+        return sum(self.doc_counts.values())
+
+    def train(self, samples: Iterable[Tuple[str, str]]) -> "NaiveBayesSentimentClassifier":
+        """Fit on (text, label) pairs; labels outside LABELS are ignored"""
+        for text, label in samples:
+            if label not in self.doc_counts:
+                continue
+            tokens = tokenize(text)
+            self.doc_counts[label] += 1
+            self.token_counts[label].update(tokens)
+            self.token_totals[label] += len(tokens)
+            self.vocabulary.update(tokens)
+        self.trained_at = time.time()
+        return self
+
+    def known_tokens(self, text: str) -> int:
+        """How many of a text's tokens were seen in training (the evidence behind a prediction)"""
+        return sum(1 for token in tokenize(text) if token in self.vocabulary)
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """Posterior probability of each label (just the class prior if no token is known)"""
+        tokens = [token for token in tokenize(text) if token in self.vocabulary]
+        total_docs = self.samples
+        vocabulary_size = len(self.vocabulary)
+
+        log_scores = {}
+        for label in LABELS:
+            if not self.doc_counts[label]:
+                continue
+            denominator = self.token_totals[label] + self.alpha * vocabulary_size
+            counts = self.token_counts[label]
+            log_scores[label] = math.log(self.doc_counts[label] / total_docs) + sum(
+                math.log((counts[token] + self.alpha) / denominator) for token in tokens
+            )
+
+        if not log_scores:
+            return {label: 1 / len(LABELS) for label in LABELS}
+
+        top = max(log_scores.values())
+        exp_scores = {label: math.exp(score - top) for label, score in log_scores.items()}
+        norm = sum(exp_scores.values())
+        return {label: exp_scores.get(label, 0.0) / norm for label in LABELS}
+
+    def predict(self, text: str) -> SentimentAnalysisResponse:
+        """Classify a text; score is P(positive) - P(negative)"""
+        proba = self.predict_proba(text)
+        sentiment = max(proba, key=proba.get)
+        return SentimentAnalysisResponse(
+            sentiment=sentiment,
+            score=round(proba["positive"] - proba["negative"], 3),
+            confidence=round(proba[sentiment], 3),
+            source="classifier"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "doc_counts": self.doc_counts,
+            "token_counts": {label: dict(counts) for label, counts in self.token_counts.items()},
+            "trained_at": self.trained_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NaiveBayesSentimentClassifier":
+        model = cls(alpha=data.get("alpha", 1.0))
+        model.trained_at = data.get("trained_at")
+        for label in LABELS:
+            model.doc_counts[label] = data["doc_counts"].get(label, 0)
+            model.token_counts[label] = Counter(data["token_counts"].get(label, {}))
+            model.token_totals[label] = sum(model.token_counts[label].values())
+            model.vocabulary.update(model.token_counts[label])
+        return model
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesSentimentClassifier":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_labeled_responses(db) -> List[Tuple[str, str]]:
+    """
+    Free-text responses with a sentiment label, for training and evaluation
+
+    Ratings and quick options are left out: their labels come from the rating
+    mapping and the option precompute, not from reading the text.
+    """
+    from models import Response
+
+    rows = db.query(Response.text, Response.sentiment).filter(
+        Response.sentiment.in_(LABELS),
+        Response.rating.is_(None),
+        Response.is_quick_option.is_(False)
+    ).order_by(Response.id).all()
+    return [(text, sentiment) for text, sentiment in rows if text and text.strip()]
+
+
+def split_holdout(samples: List[Tuple[str, str]], holdout: float, seed: int = 42) -> Tuple[list, list]:
+    """Deterministic train/holdout split"""
+    shuffled = list(samples)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - holdout))
+    return shuffled[:cut], shuffled[cut:]
+
+
+class SentimentClassifierTier:
+    """Serves the trained model in-process and decides when to escalate to Gemini"""
+
+    def __init__(self):
+        self.path = os.getenv("SENTIMENT_CLASSIFIER_PATH", "sentiment_classifier.json")
+        self.threshold = float(os.getenv("SENTIMENT_CLASSIFIER_THRESHOLD", "0.9"))
+        # With skewed training labels the prior alone can clear the threshold, so
+        # texts with too few known tokens are never answered locally
+        self.min_known_tokens = max(1, int(os.getenv("SENTIMENT_CLASSIFIER_MIN_TOKENS", "1")))
+        self.enabled = os.getenv("SENTIMENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+        self.model: Optional[NaiveBayesSentimentClassifier] = None
+        self._loaded_mtime: Optional[float] = None
+
+        # Metrics
+        self.served = 0
+        self.escalated = 0
+        self.degraded = 0
+
+        self.reload()
+
+    def reload(self):
+        """(Re)load the model file if it exists and changed since the last load"""
+        if not self.enabled or not os.path.exists(self.path):
+            return
+        mtime = os.path.getmtime(self.path)
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            self.model = NaiveBayesSentimentClassifier.load(self.path)
+            self._loaded_mtime = mtime
+            print(f"✅ Sentiment classifier loaded ({self.model.samples} training samples, "
+                  f"threshold {self.threshold:g})")
+        except Exception as e:
+            print(f"⚠️ Could not load sentiment classifier from {self.path}: {e}")
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and self.model is not None
+
+    def has_evidence(self, text: str) -> bool:
+        """Whether enough of the text's tokens are known for a prediction to mean anything"""
+        return self.model.known_tokens(text) >= self.min_known_tokens
+
+    def classify(self, text: str) -> Optional[SentimentAnalysisResponse]:
+        """Confident local prediction, or None if the text should go to Gemini"""
+        if not self.available:
+            return None
+        if not self.has_evidence(text):
+            self.escalated += 1
+            return None
+        result = self.model.predict(text)
+        if result.confidence >= self.threshold:
+            self.served += 1
+            return result
+        self.escalated += 1
+        return None
+
+    def classify_degraded(self, text: str) -> Optional[SentimentAnalysisResponse]:
+        """
+        Best local guess regardless of confidence, for when Gemini is unavailable
+
+        Reported with source "fallback" like the keyword fallback, since it may
+        be below the confidence threshold. None when the model knows too few of
+        the text's tokens (use the keyword fallback instead).
+        """
+        if not self.available or not self.has_evidence(text):
+            return None
+        self.degraded += 1
+        result = self.model.predict(text)
+        result.source = "fallback"
+        return result
+
+    def get_stats(self) -> dict:
+        """Get how many texts were answered locally vs escalated"""
+        decided = self.served + self.escalated
+        return {
+            "enabled": self.enabled,
+            "loaded": self.model is not None,
+            "path": self.path,
+            "threshold": self.threshold,
+            "min_known_tokens": self.min_known_tokens,
+            "training_samples": self.model.samples if self.model else None,
+            "served": self.served,
+            "escalated": self.escalated,
+            "degraded": self.degraded,
+            "calls_avoided_rate": round(self.served / decided, 3) if decided else None,
+        }
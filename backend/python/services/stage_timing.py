@@ -0,0 +1,85 @@
+"""
+Per-request stage timings for multi-step request pipelines
+
+A StageTimer records how long each stage of one request took (stages may
+overlap when they run concurrently) and renders them as a Server-Timing
+header. PipelineMetrics aggregates the timers of many requests into rolling
+per-stage percentiles for the metrics endpoint.
+"""
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, TypeVar
+from services.circuit_breaker import LatencyTracker
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Stage durations of a single request"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of code as stage `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, timing it as stage `name` (usable inside a task)"""
+        with self.stage(name):
+            return await awaitable
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._start
+
+    def server_timing(self) -> str:
+        """Render the stages as a Server-Timing header value (milliseconds)"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+class PipelineMetrics:
+    """Rolling per-stage latency percentiles across requests"""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.requests = 0
+        self.stages: Dict[str, LatencyTracker] = {}
+        self.totals = LatencyTracker(window)
+
+    def record(self, timer: StageTimer):
+        self.requests += 1
+        self.totals.add(timer.total)
+        for name, seconds in timer.stages.items():
+            self.stages.setdefault(name, LatencyTracker(self.window)).add(seconds)
+
+    @staticmethod
+    def _summary(tracker: LatencyTracker) -> dict:
+        return {
+            "count": len(tracker.samples),
+            "p50_ms": round(tracker.percentile(50) * 1000, 1),
+            "p95_ms": round(tracker.percentile(95) * 1000, 1),
+            "max_ms": round(max(tracker.samples) * 1000, 1),
+        }
+
+    def get_stats(self) -> dict:
+        """Get p50/p95/max per stage and for the whole request"""
+        if not self.requests:
+            return {"requests": 0, "stages": {}, "total": None}
+        return {
+            "requests": self.requests,
+            "stages": {name: self._summary(tracker) for name, tracker in self.stages.items()},
+            "total": self._summary(self.totals),
+        }
+
+
+# Response submission (POST /api/responses) pipeline
+response_pipeline_metrics = PipelineMetrics()
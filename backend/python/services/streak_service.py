@@ -0,0 +1,199 @@
+"""
+Streak Service for consecutive-event attendance
+
+A participant's streak is the number of consecutive events, up to and including
+the one they joined, that the same user_id attended. Events are taken in
+(event_date, id) order; cancelled events are skipped, so they neither count
+nor break a streak.
+
+Joining computes the streak incrementally: the user's streak at the previous
+event plus one if they attended it, else 1. The (event, streak) of each user's
+most recent join is cached, as is each event's predecessor, so a user whose
+cached join is the previous event joins without a query; anyone else is
+looked up (joins need not happen in event order). Creating, rescheduling,
+cancelling or deleting an event drops both caches. Joins handled by other
+processes can make a cached entry stale; completing an event settles its
+attendees' streaks from the database before badges are awarded.
+
+The bulk job recomputes streaks with one gaps-and-islands window query: events
+are numbered in order, each user's attended events are numbered in order, and
+the difference between the two numbers is constant within a run of consecutive
+events; the streak is the position within that run. Only rows whose stored
+streak differs are returned and written, in one bulk UPDATE.
+"""
+import os
+import time
+from typing import Iterable, Optional
+from sqlalchemy import bindparam, func, or_, and_, select, update
+from sqlalchemy.orm import Session
+from models import Event, Participant
+from services.cache import LRUCache
+
+
+SKIPPED_EVENT_STATUSES = ("cancelled",)
+
+_UPDATE_STREAK = update(Participant.__table__).where(
+    Participant.__table__.c.id == bindparam("participant_id")
+).values(streak=bindparam("new_streak"))
+
+
+def streak_query(user_ids: Optional[Iterable[str]] = None):
+    """
+    (participant id, user id, event id, stored streak, streak, event position) of every participation
+
+    Args:
+        user_ids: Only these users, as values or a subquery (all of their events are still considered)
+    """
+    events = select(
+        Event.id.label("event_id"),
+        func.row_number().over(order_by=(Event.event_date, Event.id)).label("seq")
+    ).where(Event.status.notin_(SKIPPED_EVENT_STATUSES)).subquery()
+
+    attended = select(
+        Participant.id.label("participant_id"),
+        Participant.user_id,
+        Participant.event_id,
+        Participant.streak.label("stored"),
+        events.c.seq,
+        (events.c.seq - func.row_number().over(
+            partition_by=Participant.user_id, order_by=events.c.seq
+        )).label("island")
+    ).join(events, events.c.event_id == Participant.event_id)
+    if user_ids is not None:
+        attended = attended.where(Participant.user_id.in_(user_ids))
+    attended = attended.subquery()
+
+    return select(
+        attended.c.participant_id,
+        attended.c.user_id,
+        attended.c.event_id,
+        attended.c.stored,
+        func.row_number().over(
+            partition_by=(attended.c.user_id, attended.c.island), order_by=attended.c.seq
+        ).label("streak"),
+        attended.c.seq
+    )
+
+
+class StreakService:
+    """Consecutive-event streaks per user, incremental on join and bulk on completion"""
+
+    def __init__(self):
+        # user_id -> (event id, streak at that event) of the user's most recent join
+        ttl_seconds = float(os.getenv("STREAK_CACHE_TTL_SECONDS", "3600"))
+        self.cache = LRUCache(max_size=int(os.getenv("STREAK_CACHE_SIZE", "10000")), ttl_seconds=ttl_seconds)
+        # event id -> previous counted event id (None when it is the first)
+        self.previous_events = LRUCache(max_size=1000, ttl_seconds=ttl_seconds)
+
+        # Metrics
+        self.joins = 0
+        self.refreshes = 0
+        self.rows_updated = 0
+        self.last_refresh_seconds: Optional[float] = None
+
+    def previous_event_id(self, db: Session, event: Event) -> Optional[int]:
+        """The counted event right before this one in (event_date, id) order"""
+        cached = self.previous_events.get(event.id)
+        if cached is not None:
+            return cached or None
+        previous_id = db.execute(
+            select(Event.id).where(
+                Event.status.notin_(SKIPPED_EVENT_STATUSES),
+                or_(
+                    Event.event_date < event.event_date,
+                    and_(Event.event_date == event.event_date, Event.id < event.id)
+                )
+            ).order_by(Event.event_date.desc(), Event.id.desc()).limit(1)
+        ).scalar()
+        self.previous_events.set(event.id, previous_id or 0)
+        return previous_id
+
+    def streak_on_join(self, db: Session, event: Event, user_id: str) -> int:
+        """
+        Streak of a user joining an event
+
+        Args:
+            db: Database session
+            event: Event being joined
+            user_id: External user ID
+
+        Returns:
+            Streak to store on the new participant
+        """
+        self.joins += 1
+        streak = 1
+        previous_id = self.previous_event_id(db, event)
+        if previous_id is not None:
+            cached = self.cache.get(user_id)
+            if cached is not None and cached[0] == previous_id:
+                streak = cached[1] + 1
+            else:
+                # Not cached, or the cached join was another event (possibly a later one)
+                previous_streak = db.execute(
+                    select(Participant.streak).where(
+                        Participant.event_id == previous_id, Participant.user_id == user_id
+                    )
+                ).scalar()
+                if previous_streak is not None:
+                    streak = previous_streak + 1
+
+        self.cache.set(user_id, (event.id, streak))
+        return streak
+
+    def invalidate_event_order(self):
+        """Drop cached predecessors and streaks after events were added, moved, cancelled or deleted"""
+        self.previous_events.clear()
+        self.cache.clear()
+
+    def refresh(self, db: Session, event_id: Optional[int] = None) -> int:
+        """
+        Recompute streaks in one window query and write the ones that changed
+
+        Args:
+            db: Database session (committed when rows change)
+            event_id: Only the users who attended this event (None = every user)
+
+        Returns:
+            Number of participants whose streak changed
+        """
+        start = time.perf_counter()
+        user_ids = None
+        if event_id is not None:
+            user_ids = select(Participant.user_id).where(Participant.event_id == event_id)
+
+        # Only rows whose streak changed leave the database
+        streaks = streak_query(user_ids).subquery()
+        rows = db.execute(
+            select(streaks.c.participant_id, streaks.c.user_id, streaks.c.streak).where(
+                streaks.c.stored != streaks.c.streak
+            )
+        ).all()
+
+        if rows:
+            db.execute(_UPDATE_STREAK, [
+                {"participant_id": participant_id, "new_streak": streak}
+                for participant_id, _, streak in rows
+            ])
+            db.commit()
+        # Cached streaks of these users may be stale; they are re-read on their next join
+        for user_id in {user_id for _, user_id, _ in rows}:
+            self.cache.delete(user_id)
+
+        self.refreshes += 1
+        self.rows_updated += len(rows)
+        self.last_refresh_seconds = time.perf_counter() - start
+        return len(rows)
+
+    def get_stats(self) -> dict:
+        """Get cache hit rate and refresh counters"""
+        return {
+            "cache": self.cache.get_stats(),
+            "joins": self.joins,
+            "refreshes": self.refreshes,
+            "rows_updated": self.rows_updated,
+            "last_refresh_ms": round(self.last_refresh_seconds * 1000, 1) if self.last_refresh_seconds is not None else None,
+        }
+
+
+# Singleton instance
+streak_service = StreakService()
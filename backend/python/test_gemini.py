@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Quick test script to verify Gemini API is working correctly
+
+Runs offline against a cassette with GEMINI_BACKEND=replay (record one first
+with GEMINI_BACKEND=record), or against the local stand-in with
+GEMINI_BACKEND=standin.
 """
 import asyncio
 import os
@@ -11,15 +15,19 @@ load_dotenv()
 
 async def test_gemini():
     """Test Gemini sentiment analysis"""
-    from services.gemini_service import gemini_service
+    from services.gemini_service import get_gemini_service
     
     print("=" * 60)
     print("🧪 Testing Gemini API")
     print("=" * 60)
     
-    # Check API key
+    backend = os.getenv("GEMINI_BACKEND", "sdk")
+    
+    # Check API key (only the live SDK and recording need one)
     api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if backend not in ("sdk", "record"):
+        print(f"🧪 Using offline backend: {backend}")
+    elif not api_key:
         print("❌ ERROR: GEMINI_API_KEY not found in .env")
         print("\n🔧 How to fix:")
         print("1. Go to https://makersuite.google.com/app/apikey")
@@ -27,8 +35,8 @@ async def test_gemini():
         print("3. Add to backend/python/.env:")
         print('   GEMINI_API_KEY=your_api_key_here')
         return
-    
-    print(f"✅ API Key found: {api_key[:10]}...{api_key[-5:]}")
+    else:
+        print(f"✅ API Key found: {api_key[:10]}...{api_key[-5:]}")
     print()
     
     # Test cases
@@ -53,7 +61,7 @@ async def test_gemini():
         print()
         
         try:
-            result = await gemini_service.analyze_sentiment(test_case['text'])
+            result = await get_gemini_service().analyze_sentiment(test_case['text'])
             
             # Check if sentiment matches expected
             if result.sentiment == test_case['expected']:
@@ -0,0 +1,188 @@
+"""
+Shared test setup: a throwaway SQLite database and a scripted Gemini model
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Configure before any backend module reads the environment
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ["GEMINI_RATE_LIMIT_BACKOFF_SECONDS"] = "0"
+os.environ["QUESTION_POOL_SIZE"] = "0"
+os.environ["SENTIMENT_CLASSIFIER_ENABLED"] = "false"
+os.environ["LEADERBOARD_FLUSH_SECONDS"] = "0.05"
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Stand-in for the Gemini SDK model
+
+    Each call pops the next scripted step: an exception is raised, a dict is
+    returned as its JSON text. With no steps left it answers `default`.
+    `latency` seconds pass before every answer.
+    """
+
+    def __init__(self, steps=None, default=None, latency: float = 0.0):
+        self.steps = list(steps or [])
+        self.default = default if default is not None else {"sentiment": "positive", "score": 0.8, "confidence": 0.9}
+        self.latency = latency
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        step = self.steps.pop(0) if self.steps else self.default
+        if isinstance(step, BaseException):
+            raise step
+        return FakeResponse(json.dumps(step))
+
+
+class ResourceExhausted(Exception):
+    """Named like the SDK's 429 error, which the service classifies by name"""
+
+
+def trip_to_half_open(breaker):
+    """Open the breaker and let its cooldown pass so the next call is a probe"""
+    breaker._trip()
+    breaker._opened_at -= breaker.reset_seconds
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """The shared GeminiService, replaced by one wired to a FakeModel for the test"""
+    from services import gemini_service
+
+    service = gemini_service.GeminiService(model=FakeModel())
+    monkeypatch.setattr(gemini_service, "_gemini_service", service)
+    return service
+
+
+@pytest.fixture
+def no_gemini(monkeypatch):
+    """No GEMINI_API_KEY: get_gemini_service() raises ValueError"""
+    from services import gemini_service
+
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setenv("GEMINI_BACKEND", "sdk")
+    monkeypatch.setattr(gemini_service, "_gemini_service", None)
+
+
+@pytest.fixture(scope="session")
+def schema():
+    from database import Base, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+@pytest.fixture
+def fresh_database(schema):
+    """Empty tables, and no in-process state cached from an earlier test's rows"""
+    from database import Base, engine
+    from services.badge_catalog import badge_catalog
+    from services.leaderboard import leaderboard_service
+    from services.streak_service import streak_service
+
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    for event_id in list(leaderboard_service._boards):
+        leaderboard_service.invalidate(event_id)
+    streak_service.invalidate_event_order()
+    badge_catalog.invalidate()
+
+
+@pytest.fixture
+def db(fresh_database):
+    """Session on a fresh database"""
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(fresh_database):
+    """API client on a fresh database (startup and shutdown hooks run)"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def live_event(client):
+    """(event id, open question id, participant id) of a live event"""
+    from datetime import datetime
+    from database import SessionLocal
+    from models import Event, Participant, Question
+
+    db = SessionLocal()
+    try:
+        event = Event(title="Tech Night", event_date=datetime.now(), status="live")
+        db.add(event)
+        db.flush()
+        question = Question(event_id=event.id, text="What did you learn?", question_type="open", order=1)
+        participant = Participant(event_id=event.id, user_id="u-1", name="Ada", email="ada@example.com")
+        db.add_all([question, participant])
+        db.commit()
+        return event.id, question.id, participant.id
+    finally:
+        db.close()
+
+
+def add_question(event_id: int, question_type: str, options=None, option_analysis=None) -> int:
+    """Add a question to an event directly in the database; returns its id"""
+    from database import SessionLocal
+    from models import Question
+
+    db = SessionLocal()
+    try:
+        question = Question(
+            event_id=event_id, text=f"A {question_type} question", question_type=question_type,
+            order=2, options=options, option_analysis=option_analysis
+        )
+        db.add(question)
+        db.commit()
+        return question.id
+    finally:
+        db.close()
+
+
+def add_event(db, day: int, status: str = "completed", title: str = None):
+    """Add an event `day` days into 2024"""
+    from datetime import datetime, timedelta
+    from models import Event
+
+    event = Event(title=title or f"Night {day}", event_date=datetime(2024, 1, 1) + timedelta(days=day), status=status)
+    db.add(event)
+    db.commit()
+    return event
+
+
+def add_participant(db, event, user_id: str, points: int = 0, streak: int = 0):
+    from models import Participant
+
+    participant = Participant(
+        event_id=event.id, user_id=user_id, name=f"User {user_id}",
+        email=f"{user_id}@example.com", points=points, streak=streak
+    )
+    db.add(participant)
+    db.commit()
+    return participant
@@ -0,0 +1,85 @@
+"""
+Badge evaluation from the trigger-indexed catalog
+"""
+import asyncio
+
+from conftest import add_event, add_participant
+from models import Badge, ParticipantBadge
+from services.badge_catalog import (
+    TRIGGER_EVENT_COMPLETED, TRIGGER_POINTS_CHANGED, TRIGGER_RESPONSE_ANALYZED, BadgeCatalog
+)
+from services.gamification_service import gamification_service
+
+
+DEFINITIONS = gamification_service.BADGE_DEFINITIONS
+
+
+def names(badges):
+    return {badge.name for badge in badges}
+
+
+def test_catalog_creates_missing_definitions_once(db):
+    catalog = BadgeCatalog()
+    catalog.ensure_loaded(db, DEFINITIONS)
+    catalog.ensure_loaded(db, DEFINITIONS)
+
+    assert catalog.loads == 1
+    assert db.query(Badge).count() == len(DEFINITIONS)
+
+    catalog.invalidate()
+    catalog.ensure_loaded(db, DEFINITIONS)
+    assert catalog.loads == 2
+    assert db.query(Badge).count() == len(DEFINITIONS)
+
+
+def test_catalog_indexes_badges_by_trigger(db):
+    catalog = BadgeCatalog()
+    catalog.load(db, DEFINITIONS)
+
+    assert names(catalog.for_triggers([TRIGGER_POINTS_CHANGED])) == {"community_leader"}
+    assert names(catalog.for_triggers([TRIGGER_EVENT_COMPLETED])) == {"on_fire", "perfectionist"}
+    assert names(catalog.for_triggers([TRIGGER_RESPONSE_ANALYZED])) == {"insight_master", "positive_vibes"}
+    # Each badge once, even when several triggers can affect it
+    both = catalog.for_triggers([TRIGGER_EVENT_COMPLETED, TRIGGER_EVENT_COMPLETED, TRIGGER_POINTS_CHANGED])
+    assert sorted(names(both)) == ["community_leader", "on_fire", "perfectionist"]
+    assert len(both) == 3
+
+
+def test_only_triggered_badges_are_evaluated(db):
+    event = add_event(db, 1, "live")
+    participant = add_participant(db, event, "ada", points=1000, streak=5)
+
+    awarded = asyncio.run(gamification_service.check_and_award_badges(db, participant, triggers=[TRIGGER_POINTS_CHANGED]))
+
+    # The streak qualifies too, but only an event completion evaluates it
+    assert names(awarded) == {"community_leader"}
+
+
+def test_badges_are_awarded_once(db):
+    event = add_event(db, 1, "live")
+    participant = add_participant(db, event, "ada", points=1000)
+
+    for _ in range(2):
+        asyncio.run(gamification_service.check_and_award_badges(db, participant, triggers=[TRIGGER_POINTS_CHANGED]))
+
+    assert db.query(ParticipantBadge).filter_by(participant_id=participant.id).count() == 1
+
+
+def test_event_completion_awards_streak_and_completion_badges(db):
+    event = add_event(db, 1, "live")
+    event.questions_count = 2
+    veteran = add_participant(db, event, "ada", streak=5)
+    finisher = add_participant(db, event, "bob", streak=1)
+    finisher.answered_questions_count = 2
+    newcomer = add_participant(db, event, "cyd", streak=1)
+    db.commit()
+
+    awarded = asyncio.run(gamification_service.award_event_badges(db, event.id))
+
+    assert awarded == 2
+    owned = {
+        (participant_id, name) for participant_id, name in
+        db.query(ParticipantBadge.participant_id, Badge.name).join(Badge)
+    }
+    assert owned == {(veteran.id, "on_fire"), (finisher.id, "perfectionist")}
+    assert newcomer.id not in {participant_id for participant_id, _ in owned}
@@ -0,0 +1,109 @@
+"""
+Circuit breaker probe slots are always given back
+"""
+import asyncio
+
+import pytest
+
+from conftest import FakeModel, FakeResponse, ResourceExhausted, trip_to_half_open
+from services.circuit_breaker import CircuitBreaker
+
+
+def test_cancelled_probe_frees_its_slot(gemini):
+    gemini.model = FakeModel(latency=5)
+    trip_to_half_open(gemini.breaker)
+
+    async def cancel_mid_call():
+        call = asyncio.ensure_future(gemini._generate_content("How was it?", "sentiment"))
+        await asyncio.sleep(0.05)
+        assert gemini.breaker._half_open_in_flight == 1
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    asyncio.run(cancel_mid_call())
+
+    assert gemini.breaker.state == CircuitBreaker.HALF_OPEN
+    assert gemini.breaker._half_open_in_flight == 0
+    assert gemini.breaker.allow_request()
+
+
+def test_release_probe_outside_half_open_is_a_no_op():
+    breaker = CircuitBreaker()
+    breaker.release_probe()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker._half_open_in_flight == 0
+
+
+def test_rate_limited_probe_retries_instead_of_wedging(gemini):
+    gemini.model = FakeModel(steps=[ResourceExhausted("429")])
+    trip_to_half_open(gemini.breaker)
+
+    response = asyncio.run(gemini._generate_content("How was it?", "sentiment"))
+
+    assert response.text
+    assert gemini.model.calls == 2
+    assert gemini.breaker.state == CircuitBreaker.CLOSED
+    assert gemini.breaker._half_open_in_flight == 0
+
+
+def test_probe_rate_limited_on_every_attempt_reopens_the_breaker(gemini):
+    gemini.model = FakeModel(steps=[ResourceExhausted("429")] * (gemini.rate_limit_retries + 1))
+    trip_to_half_open(gemini.breaker)
+
+    with pytest.raises(ResourceExhausted):
+        asyncio.run(gemini._generate_content("How was it?", "sentiment"))
+
+    assert gemini.breaker.state == CircuitBreaker.OPEN
+    assert gemini.breaker._half_open_in_flight == 0
+
+
+class StreamingModel:
+    """Streams a question one word per chunk, `latency` seconds apart"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def generate_content_async(self, prompt, **kwargs):
+        async def chunks():
+            for word in ('{"text": "What ', 'did you ', 'learn?", "question_type": "open"}'):
+                await asyncio.sleep(self.latency)
+                yield FakeResponse(word)
+        return chunks()
+
+
+def test_closed_question_stream_frees_probe_and_scheduler_slot(gemini):
+    gemini.model = StreamingModel()
+    trip_to_half_open(gemini.breaker)
+
+    async def disconnect_after_first_token():
+        stream = gemini.generate_question_stream("Tech Night")
+        kind, _ = await stream.__anext__()
+        assert kind == "token"
+        assert gemini.breaker._half_open_in_flight == 1
+        await stream.aclose()
+
+    asyncio.run(disconnect_after_first_token())
+
+    assert gemini.scheduler.in_flight == 0
+    assert gemini.breaker._half_open_in_flight == 0
+    assert gemini.breaker.allow_request()
+
+
+def test_cancelled_question_stream_frees_probe_and_scheduler_slot(gemini):
+    gemini.model = StreamingModel(latency=5)
+    trip_to_half_open(gemini.breaker)
+
+    async def cancel_while_waiting_for_a_chunk():
+        async def consume():
+            async for _ in gemini.generate_question_stream("Tech Night"):
+                pass
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(cancel_while_waiting_for_a_chunk())
+
+    assert gemini.scheduler.in_flight == 0
+    assert gemini.breaker._half_open_in_flight == 0
+    assert gemini.breaker.allow_request()
@@ -0,0 +1,55 @@
+"""
+Compiled keyword sentiment matcher
+"""
+import pytest
+
+from services.keyword_sentiment import KeywordSentimentMatcher, fold, keyword_sentiment
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("Útil y CLARO", "util y claro"),
+    ("malo—bueno", "malo bueno"),
+    ("¿Bueno?", " bueno?"),
+    ("muy malo…", "muy malo..."),  # NFKD turns the ellipsis into three dots
+])
+def test_fold_strips_accents_and_keeps_punctuation_as_separators(text, folded):
+    assert fold(text) == folded
+
+
+@pytest.mark.parametrize("text", ["malo—bueno", "malo…bueno", "¿malo?¡bueno!"])
+def test_non_ascii_punctuation_separates_keywords(text):
+    assert keyword_sentiment.count(text) == (1, 1)
+
+
+def test_keywords_match_whole_words_only():
+    assert keyword_sentiment.count("bueno") == (1, 0)  # "no" inside "bueno" is not a match
+    assert keyword_sentiment.count("nota") == (0, 0)
+
+
+def test_accented_keywords_match_unaccented_text_and_back():
+    assert keyword_sentiment.count("muy util") == (1, 0)
+    assert keyword_sentiment.count("muy útil") == (1, 0)
+
+
+def test_longest_keyword_wins():
+    # "no entendí" is one negative match, not "no" plus a leftover
+    assert keyword_sentiment.count("no   entendí nada") == (0, 1)
+
+
+def test_analyze_scores_by_majority():
+    assert keyword_sentiment.analyze("excelente y genial, algo confuso").sentiment == "positive"
+    assert keyword_sentiment.analyze("aburrido y malo").sentiment == "negative"
+    result = keyword_sentiment.analyze("sin opinión")
+    assert (result.sentiment, result.score, result.source) == ("neutral", 0.0, "fallback")
+
+
+def test_batch_matches_one_by_one():
+    texts = ["Sí", "malo—bueno", "Sí", "no entendí", "nada"]
+
+    assert keyword_sentiment.analyze_batch(texts) == [keyword_sentiment.analyze(text) for text in texts]
+
+
+def test_custom_keyword_lists():
+    matcher = KeywordSentimentMatcher(positive=["súper"], negative=["lento", "muy lento"])
+
+    assert matcher.count("Súper, aunque muy lento y lento") == (1, 2)
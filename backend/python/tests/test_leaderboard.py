@@ -0,0 +1,163 @@
+"""
+Leaderboard positions: in-memory boards, stored rank_position and window functions
+"""
+import asyncio
+import random
+import time
+
+import pytest
+
+from conftest import add_event, add_participant
+from models import Participant
+from services.gamification_service import gamification_service
+from services.leaderboard import EventLeaderboard, leaderboard_service
+
+
+@pytest.fixture
+def ranking(monkeypatch):
+    """Switch RANKING_STRATEGY / RANKING_TIES for one test"""
+    def configure(strategy: str, ties: str = "row_number"):
+        monkeypatch.setattr(gamification_service, "ranking_strategy", strategy)
+        monkeypatch.setattr(gamification_service, "ranking_ties", ties)
+        monkeypatch.setattr(leaderboard_service, "ties", ties)
+    return configure
+
+
+@pytest.mark.parametrize("ties, expected", [
+    ("row_number", {1: 1, 2: 2, 3: 3, 4: 4}),
+    ("rank", {1: 1, 2: 2, 3: 2, 4: 4}),
+    ("dense", {1: 1, 2: 2, 3: 2, 4: 3}),
+])
+def test_board_positions_tied_points(ties, expected):
+    board = EventLeaderboard([(3, 20), (1, 30), (4, 10), (2, 20)], ties=ties)
+
+    assert board.positions() == expected
+    assert {pid: board.rank(pid) for pid in expected} == expected
+    assert [(position, pid) for position, pid, _ in board.top(limit=2, offset=1)] == [
+        (expected[2], 2), (expected[3], 3)
+    ]
+
+
+@pytest.mark.parametrize("ties", ["row_number", "rank", "dense"])
+def test_board_stays_consistent_through_moves(ties):
+    rng = random.Random(7)
+    board = EventLeaderboard([(pid, rng.randrange(5)) for pid in range(50)], ties=ties)
+    points = dict(board._points)
+    for _ in range(300):
+        pid, new_points = rng.randrange(60), rng.randrange(8)
+        board.set(pid, new_points)
+        points[pid] = new_points
+
+    assert board.positions() == EventLeaderboard(points.items(), ties=ties).positions()
+    assert all(board.rank(pid) == position for pid, position in board.positions().items())
+
+
+def test_unknown_tie_mode_is_rejected():
+    with pytest.raises(ValueError):
+        EventLeaderboard([], ties="olympic")
+
+
+@pytest.mark.parametrize("strategy", ["incremental", "full", "window"])
+@pytest.mark.parametrize("ties", ["row_number", "rank", "dense"])
+def test_participant_rank_matches_rankings_page(db, ranking, strategy, ties):
+    ranking(strategy, ties)
+    event = add_event(db, 1, "live")
+    participants = [add_participant(db, event, f"u{i}", points=points) for i, points in enumerate((30, 20, 20, 10, 20))]
+    for participant in participants:
+        asyncio.run(gamification_service.update_rankings(db, participant))
+
+    page = {p.id: position for position, p in gamification_service.get_leaderboard(db, event.id, limit=10)}
+
+    assert {p.id: gamification_service.get_rank(db, p) for p in participants} == page
+
+
+def test_reset_clears_stored_position_under_window(client, db, ranking):
+    ranking("window")
+    event = add_event(db, 1, "live")
+    participant = add_participant(db, event, "ada", points=40)
+    participant.rank_position = 1
+    db.commit()
+
+    assert client.post(f"/api/participants/{participant.id}/reset").status_code == 200
+
+    db.expire_all()
+    assert db.get(Participant, participant.id).rank_position is None
+
+
+def test_reset_stores_new_position_under_incremental(client, db, ranking):
+    ranking("incremental")
+    event = add_event(db, 1, "live")
+    leader, other = add_participant(db, event, "ada", points=40), add_participant(db, event, "bob", points=10)
+    for participant in (leader, other):
+        leaderboard_service.update(db, participant)
+
+    assert client.post(f"/api/participants/{leader.id}/reset").status_code == 200
+    time.sleep(0.2)  # the background writer persists positions
+
+    db.expire_all()
+    assert db.get(Participant, leader.id).rank_position == 2
+    assert gamification_service.get_rank(db, db.get(Participant, leader.id)) == 2
+
+
+def seed_tied_event(db):
+    """Points 30, 20, 20, 10 (the 20s joined in id order)"""
+    event = add_event(db, 1, "live")
+    return event, [add_participant(db, event, f"u{i}", points=points) for i, points in enumerate((30, 20, 20, 10))]
+
+
+@pytest.mark.parametrize("ties, expected", [
+    ("row_number", [1, 2, 3, 4]),
+    ("rank", [1, 2, 2, 4]),
+    ("dense", [1, 2, 2, 3]),
+])
+def test_window_positions_for_tied_points(db, ties, expected):
+    event, participants = seed_tied_event(db)
+
+    page = gamification_service.get_leaderboard(db, event.id, limit=10, ties=ties)
+
+    assert [position for position, _ in page] == expected
+    assert [p.id for _, p in page] == [p.id for p in participants]
+
+
+def test_window_page_positions_count_the_skipped_rows(db):
+    event, participants = seed_tied_event(db)
+
+    page = gamification_service.get_leaderboard(db, event.id, limit=2, offset=2, ties="rank")
+
+    assert [(position, p.id) for position, p in page] == [(2, participants[2].id), (4, participants[3].id)]
+
+
+def test_positions_rank_whole_events_across_events(db):
+    event, participants = seed_tied_event(db)
+    other = add_event(db, 2, "live")
+    elsewhere = add_participant(db, other, "u3", points=5)
+
+    positions = gamification_service.get_positions(db, [participants[3], elsewhere], ties="row_number")
+
+    # Ranked against everyone in their event, not just the participants asked about
+    assert positions == {participants[3].id: 4, elsewhere.id: 1}
+
+
+def test_rankings_route_ties_and_paging(client, db):
+    event, participants = seed_tied_event(db)
+
+    response = client.get(f"/api/events/{event.id}/rankings", params={"ties": "dense", "offset": 1, "limit": 2})
+
+    assert response.status_code == 200
+    assert [(r["position"], r["participant"]["id"]) for r in response.json()] == [
+        (2, participants[1].id), (2, participants[2].id)
+    ]
+    assert client.get(f"/api/events/{event.id}/rankings", params={"ties": "olympic"}).status_code == 400
+    assert client.get(f"/api/events/{event.id}/rankings", params={"limit": 0}).status_code == 400
+
+
+def test_participant_stats_rank_history(client, db):
+    event, participants = seed_tied_event(db)
+    later = add_event(db, 2, "live")
+    add_participant(db, later, "someone", points=50)
+    again = add_participant(db, later, "u3", points=40)
+
+    response = client.get(f"/api/participants/{again.id}/stats")
+
+    assert response.status_code == 200
+    assert sorted((h["event_id"], h["rank"]) for h in response.json()["rank_history"]) == [(event.id, 4), (later.id, 2)]
@@ -0,0 +1,10 @@
+"""
+Metrics endpoints
+"""
+
+
+def test_scheduler_metrics_report_unconfigured_without_gemini_key(client, no_gemini):
+    response = client.get("/api/metrics/gemini/scheduler")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "unconfigured"
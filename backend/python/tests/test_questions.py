@@ -0,0 +1,51 @@
+"""
+Question creation
+"""
+import json
+
+from database import SessionLocal
+from models import Question
+from services.gemini_service import FALLBACK_QUESTION_REASONING
+
+
+def test_quick_options_question_is_created_without_gemini_key(client, live_event, no_gemini):
+    event_id, _, _ = live_event
+
+    response = client.post("/api/questions", json={
+        "event_id": event_id,
+        "text": "How was the talk?",
+        "question_type": "quick_options",
+        "options": ["Great", "Okay", "Boring"],
+    })
+
+    assert response.status_code == 201
+
+    db = SessionLocal()
+    try:
+        question = db.get(Question, response.json()["id"])
+        assert question.options == ["Great", "Okay", "Boring"]
+        assert question.option_analysis is None
+    finally:
+        db.close()
+
+
+def test_generate_serves_fallback_question_without_gemini_key(client, live_event, no_gemini):
+    event_id, _, _ = live_event
+
+    response = client.post("/api/questions/generate", json={"event_id": event_id, "context": "Tech Night"})
+
+    assert response.status_code == 200
+    assert response.json()["reasoning"] == FALLBACK_QUESTION_REASONING
+
+
+def test_generate_stream_serves_fallback_question_without_gemini_key(client, live_event, no_gemini):
+    event_id, _, _ = live_event
+
+    response = client.post("/api/questions/generate/stream", json={"event_id": event_id, "context": "Tech Night"})
+
+    assert response.status_code == 200
+    events = [block for block in response.text.split("\n\n") if block]
+    assert len(events) == 1
+    kind, data = events[0].split("\n")
+    assert kind == "event: question"
+    assert json.loads(data.removeprefix("data: "))["reasoning"] == FALLBACK_QUESTION_REASONING
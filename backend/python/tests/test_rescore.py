@@ -0,0 +1,52 @@
+"""
+Historical response re-scoring
+"""
+import argparse
+import asyncio
+
+from conftest import add_event, add_participant
+from models import Question, Response
+from rescore_responses import rescore
+
+
+def seed_response(db, text: str) -> Response:
+    event = add_event(db, 1)
+    participant = add_participant(db, event, "ada")
+    question = Question(event_id=event.id, text="What did you learn?", question_type="open", order=1)
+    db.add(question)
+    db.commit()
+    response = Response(
+        question_id=question.id, participant_id=participant.id, text=text,
+        sentiment="negative", sentiment_score=-0.8, quality_score=0.9, points_awarded=10
+    )
+    db.add(response)
+    db.commit()
+    return response
+
+
+def run_rescore(tmp_path):
+    asyncio.run(rescore(argparse.Namespace(
+        event_id=None, chunk_size=10, requests_per_minute=None,
+        checkpoint=str(tmp_path / "checkpoint.json"), fresh=False, restart=True
+    )))
+
+
+def test_fallback_results_do_not_overwrite_stored_scores(db, gemini, tmp_path):
+    response = seed_response(db, "Excelente, genial")  # keywords would say positive
+    gemini.breaker._trip()
+
+    run_rescore(tmp_path)
+
+    db.expire_all()
+    stored = db.get(Response, response.id)
+    assert (stored.sentiment, stored.sentiment_score, stored.quality_score) == ("negative", -0.8, 0.9)
+
+
+def test_gemini_results_are_written(db, gemini, tmp_path):
+    response = seed_response(db, "Excelente, genial")
+
+    run_rescore(tmp_path)
+
+    db.expire_all()
+    stored = db.get(Response, response.id)
+    assert (stored.sentiment, stored.sentiment_score) == ("positive", 0.8)
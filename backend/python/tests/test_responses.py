@@ -0,0 +1,64 @@
+"""
+Response submission
+"""
+import time
+
+from conftest import add_question, trip_to_half_open
+
+
+def test_duplicate_submit_during_probe_leaves_breaker_usable(client, gemini, live_event):
+    _, question_id, participant_id = live_event
+    gemini.sentiment_batcher.max_batch_size = 1  # the probe runs in the request's own analysis task
+    answer = {"question_id": question_id, "participant_id": participant_id, "text": "It was okay I guess"}
+    assert client.post("/api/responses", json=answer).status_code == 201
+
+    # The duplicate's analysis is the breaker's only probe, still waiting on Gemini
+    # when the duplicate check rejects the submit and cancels it
+    trip_to_half_open(gemini.breaker)
+    gemini.model.latency = 5
+    answer["text"] = "Actually it was pretty mixed"
+    calls = gemini.model.calls
+    response = client.post("/api/responses", json=answer)
+    assert response.status_code == 400
+    assert gemini.model.calls > calls
+
+    deadline = time.monotonic() + 2
+    while gemini.breaker._half_open_in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert gemini.breaker._half_open_in_flight == 0
+    assert gemini.breaker.allow_request()
+
+
+def test_rating_answer_is_scored_without_gemini_key(client, live_event, no_gemini):
+    event_id, _, participant_id = live_event
+    question_id = add_question(event_id, "rating")
+
+    response = client.post("/api/responses", json={
+        "question_id": question_id, "participant_id": participant_id, "text": "4", "rating": 4
+    })
+
+    assert response.status_code == 201
+    assert response.json()["sentiment"] == "positive"
+
+
+def test_quick_option_without_precomputed_analysis_is_scored_without_gemini_key(client, live_event, no_gemini):
+    event_id, _, participant_id = live_event
+    question_id = add_question(event_id, "quick_options", options=["Excelente", "Malo"])
+
+    response = client.post("/api/responses", json={
+        "question_id": question_id, "participant_id": participant_id, "text": "Malo", "is_quick_option": True
+    })
+
+    assert response.status_code == 201
+    assert response.json()["sentiment"] == "negative"
+
+
+def test_free_text_answer_gets_keyword_sentiment_without_gemini_key(client, live_event, no_gemini):
+    _, question_id, participant_id = live_event
+
+    response = client.post("/api/responses", json={
+        "question_id": question_id, "participant_id": participant_id, "text": "Excelente charla, muy útil"
+    })
+
+    assert response.status_code == 201
+    assert response.json()["sentiment"] == "positive"
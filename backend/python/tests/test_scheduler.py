@@ -0,0 +1,150 @@
+"""
+Outbound Gemini admission: token buckets and the priority queue
+"""
+import asyncio
+import time
+
+import pytest
+
+from services.gemini_service import (
+    PRIORITY_BACKGROUND, PRIORITY_HOST, PRIORITY_PARTICIPANT, GeminiScheduler, TokenBucket
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.monotonic, advanced by hand (only for tests without an event loop)"""
+    from services import gemini_service
+
+    now = [1000.0]
+    monkeypatch.setattr(gemini_service.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_refills_continuously_up_to_its_budget(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.consume(60)
+    assert bucket.seconds_until(1) == pytest.approx(1.0)
+
+    clock[0] += 30
+    assert bucket.seconds_until(30) == 0.0
+    assert bucket.seconds_until(31) == pytest.approx(1.0)
+
+    clock[0] += 3600
+    bucket.consume(0)
+    assert bucket.tokens == 60
+
+
+def test_request_larger_than_the_budget_waits_for_a_full_bucket(clock):
+    bucket = TokenBucket(per_minute=600)
+    bucket.consume(100)
+
+    # Never admissible if measured against the whole amount; capped at the capacity instead
+    assert bucket.seconds_until(10_000) == pytest.approx(10.0)
+    bucket.consume(10_000)
+    assert bucket.tokens == -100
+
+
+def test_drain_empties_the_bucket_without_forgiving_debt(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.drain()
+    assert bucket.tokens == 0
+    bucket.consume(5)
+    bucket.drain()
+    assert bucket.tokens == -5
+
+
+def test_higher_priority_callers_are_admitted_first():
+    scheduler = GeminiScheduler(max_concurrency=1, requests_per_minute=0, tokens_per_minute=0)
+    admitted = []
+
+    async def call(name: str, priority: int):
+        await scheduler.acquire(priority, tokens=10)
+        admitted.append(name)
+        await asyncio.sleep(0)
+        scheduler.release()
+
+    async def run():
+        await scheduler.acquire(PRIORITY_HOST, tokens=10)  # holds the only slot while the rest queue
+        calls = [
+            asyncio.ensure_future(call(name, priority)) for name, priority in (
+                ("rescore-1", PRIORITY_BACKGROUND), ("answer-1", PRIORITY_PARTICIPANT),
+                ("question", PRIORITY_HOST), ("rescore-2", PRIORITY_BACKGROUND), ("answer-2", PRIORITY_PARTICIPANT),
+            )
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["queued_by_priority"] == {"host": 1, "participant": 2, "background": 2}
+        scheduler.release()
+        await asyncio.gather(*calls)
+
+    asyncio.run(run())
+
+    assert admitted == ["question", "answer-1", "answer-2", "rescore-1", "rescore-2"]
+    assert scheduler.in_flight == 0
+
+
+def test_concurrency_limit_is_never_exceeded():
+    scheduler = GeminiScheduler(max_concurrency=2, requests_per_minute=0, tokens_per_minute=0)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        await scheduler.acquire(PRIORITY_PARTICIPANT, tokens=10)
+        peak = max(peak, scheduler.in_flight)
+        await asyncio.sleep(0.01)
+        scheduler.release()
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert peak == 2
+    assert scheduler.get_stats()["granted_by_priority"]["participant"] == 6
+
+
+def test_exhausted_request_budget_queues_instead_of_failing():
+    scheduler = GeminiScheduler(max_concurrency=8, requests_per_minute=600, tokens_per_minute=0)
+    scheduler.request_bucket.consume(600)
+
+    async def run():
+        start = time.monotonic()
+        await scheduler.acquire(PRIORITY_HOST, tokens=10)
+        scheduler.release()
+        return time.monotonic() - start
+
+    waited = asyncio.run(run())
+
+    # 600 requests per minute refill one every 0.1 s
+    assert 0.05 < waited < 1
+    assert scheduler.throttled >= 1
+
+
+def test_token_budget_holds_back_a_large_call():
+    scheduler = GeminiScheduler(max_concurrency=8, requests_per_minute=0, tokens_per_minute=60_000)
+    assert scheduler.try_acquire(tokens=60_000)
+    scheduler.release()
+
+    # The bucket is empty: optional calls are refused rather than queued
+    assert not scheduler.try_acquire(tokens=100)
+    assert scheduler.in_flight == 0
+
+
+def test_cancelled_waiter_does_not_keep_a_slot():
+    scheduler = GeminiScheduler(max_concurrency=1, requests_per_minute=0, tokens_per_minute=0)
+
+    async def run():
+        await scheduler.acquire(PRIORITY_HOST, tokens=10)
+        waiter = asyncio.ensure_future(scheduler.acquire(PRIORITY_BACKGROUND, tokens=10))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+
+        await asyncio.wait_for(scheduler.acquire(PRIORITY_PARTICIPANT, tokens=10), timeout=1)
+        scheduler.release()
+
+    asyncio.run(run())
+
+    assert scheduler.in_flight == 0
+    assert scheduler.get_stats()["queue_depth"] == 0
@@ -0,0 +1,115 @@
+"""
+Sentiment micro-batching: one prompt per window, results fanned back out in order
+"""
+import asyncio
+import json
+import re
+
+from conftest import FakeResponse
+
+SENTIMENTS = {
+    "Great talk": {"sentiment": "positive", "score": 0.9, "confidence": 0.9},
+    "Too long": {"sentiment": "negative", "score": -0.6, "confidence": 0.8},
+    "It was ok": {"sentiment": "neutral", "score": 0.0, "confidence": 0.7},
+    "Loved it": {"sentiment": "positive", "score": 0.8, "confidence": 0.9},
+    "Boring": {"sentiment": "negative", "score": -0.7, "confidence": 0.9},
+}
+
+_NUMBERED = re.compile(r"^(\d+)\. (.*)$", re.MULTILINE)
+
+
+class ScriptedSentimentModel:
+    """
+    Answers single and batch sentiment prompts from SENTIMENTS (batches in reverse index order)
+
+    `broken_batches` drops one result from every batch reply; `failing_batches` makes batch calls raise.
+    """
+
+    def __init__(self, broken_batches: bool = False, failing_batches: bool = False):
+        self.broken_batches = broken_batches
+        self.failing_batches = failing_batches
+        self.batch_sizes = []
+        self.single_calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        if "Texts to analyze:" in prompt:
+            texts = [json.loads(text) for _, text in _NUMBERED.findall(prompt)]
+            self.batch_sizes.append(len(texts))
+            if self.failing_batches:
+                raise ConnectionError("connection reset")
+            reply = [{"index": index, **SENTIMENTS[text]} for index, text in reversed(list(enumerate(texts)))]
+            if self.broken_batches:
+                reply = reply[1:]
+        else:
+            self.single_calls += 1
+            reply = SENTIMENTS[json.loads(prompt.split("Text to analyze: ", 1)[1])]
+        return FakeResponse(json.dumps(reply))
+
+
+def analyze_all(service, texts):
+    async def run():
+        return await asyncio.gather(*(service.analyze_sentiment(text) for text in texts))
+
+    return asyncio.run(run())
+
+
+def test_concurrent_texts_share_one_prompt(gemini):
+    gemini.model = ScriptedSentimentModel()
+    texts = ["Great talk", "Too long", "It was ok"]
+
+    results = analyze_all(gemini, texts)
+
+    assert [result.sentiment for result in results] == ["positive", "negative", "neutral"]
+    assert all(result.source == "gemini" for result in results)
+    assert gemini.model.batch_sizes == [3]
+    assert gemini.model.single_calls == 0
+    assert gemini.sentiment_batcher.get_stats()["items_batched"] == 3
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window(gemini):
+    gemini.model = ScriptedSentimentModel()
+    gemini.sentiment_batcher.max_batch_size = 2
+    texts = ["Great talk", "Too long", "It was ok", "Loved it", "Boring"]
+
+    results = analyze_all(gemini, texts)
+
+    assert [result.sentiment for result in results] == [SENTIMENTS[text]["sentiment"] for text in texts]
+    # Two full batches, then the leftover text alone once the window closes
+    assert gemini.model.batch_sizes == [2, 2]
+    assert gemini.model.single_calls == 1
+    assert gemini.sentiment_batcher.batches_sent == 2
+
+
+def test_identical_texts_are_analyzed_once(gemini):
+    gemini.model = ScriptedSentimentModel()
+
+    results = analyze_all(gemini, ["Boring", "Loved it", "Boring"])
+
+    assert [result.sentiment for result in results] == ["negative", "positive", "negative"]
+    assert gemini.model.batch_sizes == [2]
+
+
+def test_unparseable_batch_falls_back_to_one_call_per_text(gemini):
+    gemini.model = ScriptedSentimentModel(broken_batches=True)
+    texts = ["Great talk", "Too long", "It was ok"]
+
+    results = analyze_all(gemini, texts)
+
+    assert [result.sentiment for result in results] == ["positive", "negative", "neutral"]
+    assert all(result.source == "gemini" for result in results)
+    assert gemini.model.batch_sizes == [3] * (gemini.parse_retries + 1)
+    assert gemini.model.single_calls == 3
+    assert gemini.sentiment_batcher.batch_failures == 1
+    assert gemini.sentiment_batcher.batches_sent == 0
+
+
+def test_failed_batch_degrades_without_retries_once_the_breaker_is_open(gemini):
+    gemini.model = ScriptedSentimentModel(failing_batches=True)
+    gemini.breaker.failure_threshold = 1
+
+    results = analyze_all(gemini, ["Great talk", "Boring"])
+
+    assert [result.sentiment for result in results] == ["positive", "negative"]
+    assert [result.source for result in results] == ["fallback", "fallback"]
+    assert gemini.model.single_calls == 0
+    assert gemini.sentiment_batcher.batch_failures == 1
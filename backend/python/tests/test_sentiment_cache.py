@@ -0,0 +1,103 @@
+"""
+Sentiment cache: LRU eviction, TTL expiry, normalized keys and the SQLite tier
+"""
+import asyncio
+
+import pytest
+
+from schemas import SentimentAnalysisResponse
+from services.cache import LRUCache
+from services.sentiment_cache import SentimentCache, normalize_text
+
+
+class Clock:
+    """Stand-in for time.monotonic/time.time that only moves when told to"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from services import cache, sentiment_cache
+
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    monkeypatch.setattr(sentiment_cache.time, "time", clock)
+    return clock
+
+
+def result(sentiment: str = "positive", source: str = "gemini") -> SentimentAnalysisResponse:
+    return SentimentAnalysisResponse(sentiment=sentiment, score=0.5, confidence=0.9, source=source)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = LRUCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl_seconds=5)
+
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 55
+    assert cache.get("default") is None
+    assert len(cache) == 0
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_zero_size_disables_the_cache(clock):
+    cache = LRUCache(max_size=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_normalized_texts_share_an_entry(clock):
+    cache = SentimentCache()
+    assert normalize_text("  Excelente   CHARLA ") == normalize_text("excelente charla")
+    assert normalize_text("Sí") == "si"
+
+    asyncio.run(cache.set("Excelente charla", result()))
+
+    assert asyncio.run(cache.get("  excelente   charlá")).sentiment == "positive"
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_fallback_results_are_not_cached(clock):
+    cache = SentimentCache()
+
+    asyncio.run(cache.set("Meh", result("neutral", source="fallback")))
+
+    assert asyncio.run(cache.get("Meh")) is None
+    assert cache.get_stats()["rejected_non_authoritative"] == 1
+
+
+def test_sqlite_tier_outlives_the_process_cache(monkeypatch, tmp_path, clock):
+    monkeypatch.setenv("SENTIMENT_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("SENTIMENT_CACHE_SQLITE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("SENTIMENT_CACHE_TTL_SECONDS", "60")
+    asyncio.run(SentimentCache().set("Great talk", result()))
+
+    # A restarted worker starts with an empty memory tier
+    restarted = SentimentCache()
+    assert asyncio.run(restarted.get("great talk")).sentiment == "positive"
+    assert restarted.get_stats()["store_hits"] == 1
+
+    clock.now += 61
+    assert asyncio.run(SentimentCache().get("great talk")) is None
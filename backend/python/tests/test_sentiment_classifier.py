@@ -0,0 +1,72 @@
+"""
+Local sentiment classifier tier
+"""
+import pytest
+
+from services.sentiment_classifier import NaiveBayesSentimentClassifier, SentimentClassifierTier, tokenize
+
+
+# 95% positive: the class prior alone is above the default 0.9 threshold
+SKEWED_SAMPLES = [("excelente charla muy clara", "positive")] * 95 + [("aburrido y confuso", "negative")] * 5
+
+
+@pytest.fixture
+def tier(monkeypatch, tmp_path):
+    monkeypatch.setenv("SENTIMENT_CLASSIFIER_ENABLED", "true")
+    monkeypatch.setenv("SENTIMENT_CLASSIFIER_PATH", str(tmp_path / "missing.json"))
+    tier = SentimentClassifierTier()
+    tier.model = NaiveBayesSentimentClassifier().train(SKEWED_SAMPLES)
+    return tier
+
+
+def test_tokenize_adds_bigrams_over_folded_words():
+    assert tokenize("No me gustó") == ["no", "me", "gusto", "no me", "me gusto"]
+
+
+@pytest.mark.parametrize("text", ["zzz qqq", ""])
+def test_text_without_known_tokens_escalates(tier, text):
+    assert tier.model.predict(text).confidence >= tier.threshold  # only the prior speaks
+
+    assert tier.classify(text) is None
+    assert tier.escalated == 1
+    assert tier.served == 0
+
+
+def test_text_without_known_tokens_gets_no_degraded_guess(tier):
+    assert tier.classify_degraded("zzz qqq") is None
+
+
+def test_confident_known_text_is_served_locally(tier):
+    result = tier.classify("excelente charla")
+
+    assert result.sentiment == "positive"
+    assert result.source == "classifier"
+    assert tier.served == 1
+
+
+def test_min_known_tokens_requires_more_evidence(tier):
+    tier.min_known_tokens = 3
+
+    assert tier.classify("excelente zzz") is None
+    assert tier.classify("excelente charla") is not None  # two words plus their bigram
+
+
+def test_round_trip_keeps_predictions(tmp_path):
+    model = NaiveBayesSentimentClassifier().train(SKEWED_SAMPLES)
+    path = str(tmp_path / "model.json")
+    model.save(path)
+
+    loaded = NaiveBayesSentimentClassifier.load(path)
+
+    assert loaded.vocabulary == model.vocabulary
+    assert loaded.predict_proba("aburrido") == model.predict_proba("aburrido")
+
+
+def test_degraded_batch_uses_keywords_for_texts_the_model_cannot_judge(gemini, tier):
+    gemini.sentiment_classifier = tier
+
+    known, unknown = gemini._degraded_sentiment_batch(["excelente charla", "malo"])
+
+    assert known.sentiment == "positive"
+    assert unknown.sentiment == "negative"  # the prior would have said positive
+    assert tier.degraded == 1
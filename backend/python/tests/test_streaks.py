@@ -0,0 +1,117 @@
+"""
+Consecutive-event streaks
+"""
+from datetime import datetime
+
+from conftest import add_event, add_participant
+from services.streak_service import StreakService, streak_service
+
+
+def join(service, db, event, user_id):
+    """Join through the incremental path and store the streak it computed"""
+    return add_participant(db, event, user_id, streak=service.streak_on_join(db, event, user_id))
+
+
+def test_joining_an_earlier_event_after_a_later_one_checks_the_database(db):
+    first, second, third = add_event(db, 1), add_event(db, 2, "upcoming"), add_event(db, 3, "upcoming")
+    service = StreakService()
+    join(service, db, first, "ada")
+
+    assert join(service, db, third, "ada").streak == 1  # skipped the second event (so far)
+    # The cached join is now the third event, not the second one's predecessor
+    assert join(service, db, second, "ada").streak == 2
+
+
+def test_cached_join_of_the_previous_event_needs_no_lookup(db):
+    first, second = add_event(db, 1), add_event(db, 2, "upcoming")
+    service = StreakService()
+    db.delete(join(service, db, first, "ada"))
+    db.commit()
+
+    # Answered from the cache: the row it would have looked up is gone
+    assert service.streak_on_join(db, second, "ada") == 2
+
+
+def test_created_event_resets_cached_predecessors(client, db):
+    first, third = add_event(db, 1), add_event(db, 3, "upcoming")
+    assert streak_service.previous_event_id(db, third) == first.id
+
+    response = client.post("/api/events", json={"title": "Night 2", "event_date": datetime(2024, 1, 3).isoformat()})
+    assert response.status_code == 201
+
+    assert streak_service.previous_event_id(db, third) == response.json()["id"]
+
+
+def test_cancelled_event_resets_cached_predecessors(client, db):
+    first, second, third = add_event(db, 1), add_event(db, 2), add_event(db, 3, "upcoming")
+    assert streak_service.previous_event_id(db, third) == second.id
+
+    response = client.patch(f"/api/events/{second.id}", json={"status": "cancelled"})
+    assert response.status_code == 200
+
+    assert streak_service.previous_event_id(db, third) == first.id
+
+
+def streaks(db, *participants):
+    for participant in participants:
+        db.refresh(participant)
+    return [participant.streak for participant in participants]
+
+
+def test_refresh_carries_a_streak_across_a_cancelled_event(db):
+    first, cancelled, third = add_event(db, 1), add_event(db, 2, "cancelled"), add_event(db, 3)
+    rows = [add_participant(db, first, "ada"), add_participant(db, cancelled, "ada"), add_participant(db, third, "ada")]
+
+    assert StreakService().refresh(db) == 2
+
+    # The cancelled event's own row is not counted (it keeps what it had)
+    assert streaks(db, *rows) == [1, 0, 2]
+
+
+def test_refresh_restarts_a_streak_after_a_missed_event(db):
+    events = [add_event(db, day) for day in range(1, 6)]
+    ada = [add_participant(db, events[i], "ada") for i in (0, 1, 3, 4)]
+    bob = [add_participant(db, events[i], "bob") for i in (1, 2, 3)]
+
+    StreakService().refresh(db)
+
+    assert streaks(db, *ada) == [1, 2, 1, 2]
+    assert streaks(db, *bob) == [1, 2, 3]
+
+
+def test_refresh_writes_only_changed_streaks(db):
+    first, second, third = add_event(db, 1), add_event(db, 2), add_event(db, 3)
+    add_participant(db, first, "ada", streak=1)
+    add_participant(db, second, "ada", streak=2)
+    stale = add_participant(db, third, "ada", streak=7)
+    add_participant(db, third, "bob", streak=1)
+    service = StreakService()
+
+    assert service.refresh(db) == 1
+    assert streaks(db, stale) == [3]
+    assert service.refresh(db) == 0
+    assert service.rows_updated == 1
+
+
+def test_refresh_of_one_event_covers_only_its_attendees(db):
+    first, second = add_event(db, 1), add_event(db, 2)
+    ada = [add_participant(db, first, "ada"), add_participant(db, second, "ada")]
+    bob = add_participant(db, first, "bob")
+
+    StreakService().refresh(db, second.id)
+
+    # Ada's earlier event is recomputed too; Bob did not attend the second event
+    assert streaks(db, *ada, bob) == [1, 2, 0]
+
+
+def test_refresh_drops_cached_streaks_it_corrected(db):
+    first, second, third = add_event(db, 1), add_event(db, 2), add_event(db, 3, "upcoming")
+    service = StreakService()
+    join(service, db, first, "ada")
+    stale = add_participant(db, second, "ada", streak=5)  # joined through another process
+    service.cache.set("ada", (second.id, 5))
+
+    service.refresh(db)
+
+    assert streaks(db, stale) == [2]
+    assert join(service, db, third, "ada").streak == 3
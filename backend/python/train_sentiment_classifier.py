@@ -0,0 +1,65 @@
+"""
+Train the local sentiment classifier from sentiment labels stored in the database
+
+Uses every free-text response that already has a Gemini sentiment label,
+holds out a share of them to report accuracy, then fits the final model on all
+of them and writes it where GeminiService loads it (SENTIMENT_CLASSIFIER_PATH).
+
+Usage:
+    python train_sentiment_classifier.py [--output sentiment_classifier.json] [--holdout 0.2] [--min-samples 200]
+"""
+import argparse
+import os
+from collections import Counter
+from database import SessionLocal
+from services.sentiment_classifier import (
+    LABELS,
+    NaiveBayesSentimentClassifier,
+    load_labeled_responses,
+    split_holdout,
+)
+
+
+def train(output: str, holdout: float, min_samples: int, alpha: float):
+    """Train, evaluate on a holdout split and save the classifier"""
+    if SessionLocal is None:
+        print("❌ DATABASE_URL is not set")
+        return False
+
+    db = SessionLocal()
+    try:
+        samples = load_labeled_responses(db)
+    finally:
+        db.close()
+
+    counts = Counter(label for _, label in samples)
+    print(f"📚 {len(samples)} labeled responses: " + ", ".join(f"{label} {counts[label]}" for label in LABELS))
+
+    if len(samples) < min_samples:
+        print(f"⚠️  Need at least {min_samples} labeled responses to train, not saving a model")
+        return False
+
+    if holdout > 0:
+        train_set, test_set = split_holdout(samples, holdout)
+        model = NaiveBayesSentimentClassifier(alpha=alpha).train(train_set)
+        correct = sum(model.predict(text).sentiment == label for text, label in test_set)
+        print(f"🎯 Holdout accuracy: {correct / len(test_set):.1%} ({correct}/{len(test_set)})")
+
+    model = NaiveBayesSentimentClassifier(alpha=alpha).train(samples)
+    model.save(output)
+    print(f"✅ Saved classifier ({len(model.vocabulary)} features) to {output}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=os.getenv("SENTIMENT_CLASSIFIER_PATH", "sentiment_classifier.json"))
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of samples used only for evaluation")
+    parser.add_argument("--min-samples", type=int, default=200, help="refuse to train on fewer labeled responses")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Laplace smoothing")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Sentiment classifier training")
+    print("=" * 50)
+    train(args.output, args.holdout, args.min_samples, args.alpha)
@@ -67,7 +67,7 @@ export function EventHub() {
     }
   };
 
-  const handleSendMessage = async (text: string, isQuickOption: boolean = false) => {
+  const handleSendMessage = async (text: string, isQuickOption: boolean = false, rating?: number) => {
     if (!participant || !currentQuestion || sending) return;
 
     try {
@@ -103,6 +103,7 @@ export function EventHub() {
         question_id: questionToAnswer.id,
         participant_id: participant.id,
         text: text,
+        rating: rating,
         is_quick_option: isQuickOption
       });
 
@@ -195,7 +196,7 @@ export function EventHub() {
   };
 
   const handleRating = async (rating: number) => {
-    await handleSendMessage(`⭐ ${rating} de 5`, false);
+    await handleSendMessage(`⭐ ${rating} de 5`, false, rating);
   };
 
   const handleReset = async () => {